@@ -0,0 +1,69 @@
+"""Benchmark the TTS chunk planner on large generated stories.
+
+For each text size this prints the planning throughput (flat across sizes,
+since planning is linear), the number of synthesize_speech requests
+planned against the lower bound of total bytes over the budget, and the
+largest chunk in bytes, for plain text and for SSML:
+
+    python benchmark_chunk_planner.py --sizes 10000 100000 1000000 10000000
+"""
+import argparse
+import math
+import random
+import time
+
+from mlb_storyteller.services.tts_chunk_planner import plan_chunks
+
+SENTENCES = [
+    "The pitcher dealt from the stretch and the runner broke for second on the pitch.",
+    "Acuña lined a 3-2 fastball into the gap!",
+    "Did Rodríguez really catch that?",
+    '"He is gone," shouted the announcer as J.D. Martinez rounded the bases.',
+    "The St. Louis bullpen stirred… the closer was already loose.",
+    "外野手がフェンス際で捕球した。",
+]
+
+
+def make_story(size: int, seed: int = 7) -> str:
+    """Roughly size characters of story text, in paragraphs of a few sentences."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 8)))
+        parts.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def measure(text: str, max_bytes: int, ssml_break_ms: int, repeat: int):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = plan_chunks(text, max_bytes, ssml_break_ms)
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--max-bytes", type=int, default=5000)
+    parser.add_argument("--ssml-break-ms", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':>5} {'chars':>10} {'MB/s':>7} {'chunks':>7} {'bound':>7} {'largest':>8}")
+    for ssml_break_ms in (0, args.ssml_break_ms):
+        mode = "ssml" if ssml_break_ms else "text"
+        for size in args.sizes:
+            text = make_story(size)
+            elapsed, chunks = measure(text, args.max_bytes, ssml_break_ms, args.repeat)
+            text_bytes = len(text.encode('utf-8'))
+            bound = math.ceil(sum(len(chunk.encode('utf-8')) for chunk in chunks) / args.max_bytes)
+            largest = max(len(chunk.encode('utf-8')) for chunk in chunks)
+            assert largest <= args.max_bytes, "a chunk is over the byte limit"
+            print(f"{mode:>5} {len(text):>10} {text_bytes / elapsed / 1e6:>7.1f} {len(chunks):>7} {bound:>7} {largest:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark long-narration synthesis against a local stand-in for Google TTS.
+
+The stand-in sleeps for a configurable latency per synthesize_speech call
+(and can fail a fraction of calls with ServiceUnavailable to exercise the
+per-chunk retry), so wall-clock time can be compared across concurrency
+caps without credentials or quota. Quota pacing is off unless
+--quota-rps or --quota-cpm is given:
+
+    python benchmark_tts.py --chunks 8 --latency-ms 400 --concurrency 1 2 4 8
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+from google.api_core import exceptions
+
+import mlb_storyteller.services.text_to_speech_service as tts_module
+from mlb_storyteller.services.text_to_speech_service import TextToSpeechService
+from mlb_storyteller.services.tts_scheduler import InMemoryTokenBuckets, TTSScheduler
+
+
+class FakeTTSClient:
+    """Answers synthesize_speech after a fixed latency with audio that encodes the input text."""
+
+    def __init__(self, latency_ms: float, failure_rate: float = 0.0, seed: int = 7):
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize_speech(self, input, voice, audio_config):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.failure_rate:
+                self.failures += 1
+                raise exceptions.ServiceUnavailable("injected failure")
+
+        class Response:
+            audio_content = (input.text or input.ssml).encode('utf-8')
+
+        return Response()
+
+
+def make_service(client: FakeTTSClient) -> TextToSpeechService:
+    # Skip __init__, which needs Google credentials
+    service = TextToSpeechService.__new__(TextToSpeechService)
+    service.client = client
+    return service
+
+
+def make_text(chunks: int) -> str:
+    """Story text that chunk_text splits into roughly the given number of chunks."""
+    sentence = "The pitcher dealt from the stretch and the runner broke for second on the pitch. "
+    return sentence * (chunks * 4900 // len(sentence))
+
+
+async def run(concurrency: int, text: str, latency_ms: float, failure_rate: float, quota_rps: float, quota_cpm: int):
+    # Measure synthesis itself, not audio cache hits from the previous run
+    tts_module.get_audio_cache = lambda: None
+    scheduler = TTSScheduler(InMemoryTokenBuckets(), requests_per_second=quota_rps, characters_per_minute=quota_cpm)
+    tts_module.get_tts_scheduler = lambda: scheduler
+    tts_module.TTS_MAX_CONCURRENCY = concurrency
+    tts_module.get_synthesis_slots.cache_clear()
+    tts_module.get_synthesis_executor.cache_clear()
+    client = FakeTTSClient(latency_ms, failure_rate)
+    service = make_service(client)
+    expected = "".join(TextToSpeechService.chunk_text(text)).encode('utf-8')
+
+    start = time.perf_counter()
+    audio = await service.generate_long_audio(text, "en-US-Neural2-D")
+    elapsed = time.perf_counter() - start
+
+    assert audio == expected, "chunks were reassembled out of order"
+    return elapsed, client.calls, client.failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--quota-rps", type=float, default=0)
+    parser.add_argument("--quota-cpm", type=int, default=0)
+    args = parser.parse_args()
+
+    text = make_text(args.chunks)
+    chunk_count = len(TextToSpeechService.chunk_text(text))
+    print(f"{chunk_count} chunks, {args.latency_ms:.0f} ms per call, failure rate {args.failure_rate:.0%}")
+    print(f"{'concurrency':>11} {'wall (s)':>9} {'speedup':>8} {'calls':>6} {'retried':>8}")
+
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed, calls, failures = await run(
+            concurrency, text, args.latency_ms, args.failure_rate, args.quota_rps, args.quota_cpm
+        )
+        baseline = baseline or elapsed
+        print(f"{concurrency:>11} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x {calls:>6} {failures:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -715,11 +715,19 @@ async function generateAudio() {
             throw new Error('Failed to generate audio');
         }
         
-        const audioBlob = await response.blob();
-        const audioUrl = URL.createObjectURL(audioBlob);
+        // The server streams the MP3 chunk by chunk; play it as it arrives
+        // where the browser supports it, otherwise wait for the whole file
+        let audioBlob;
+        if (response.body && window.MediaSource && MediaSource.isTypeSupported('audio/mpeg')) {
+            elements.audioPlayer.classList.remove('hidden');
+            hideLoading();
+            audioBlob = await playAudioStream(response, elements.storyAudio);
+        } else {
+            audioBlob = await response.blob();
+            elements.storyAudio.src = URL.createObjectURL(audioBlob);
+        }
         
-        elements.storyAudio.src = audioUrl;
-        elements.downloadLink.href = audioUrl;
+        elements.downloadLink.href = URL.createObjectURL(audioBlob);
         elements.downloadLink.classList.remove('hidden');
         elements.shareAudioBtn.classList.remove('hidden');
         elements.audioPlayer.classList.remove('hidden');
@@ -737,6 +745,38 @@ async function generateAudio() {
     }
 }
 
+// Play a streamed MP3 response through MediaSource as its chunks arrive.
+// Resolves with the complete audio as a Blob for the download link.
+async function playAudioStream(response, audioElement) {
+    const mediaSource = new MediaSource();
+    audioElement.src = URL.createObjectURL(mediaSource);
+    await new Promise(resolve => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+    
+    const sourceBuffer = mediaSource.addSourceBuffer('audio/mpeg');
+    const reader = response.body.getReader();
+    const parts = [];
+    let started = false;
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        parts.push(value);
+        sourceBuffer.appendBuffer(value);
+        await new Promise(resolve => sourceBuffer.addEventListener('updateend', resolve, { once: true }));
+        if (!started) {
+            started = true;
+            audioElement.play().catch(() => {
+                // Autoplay can be blocked; the user can still press play
+            });
+        }
+    }
+    
+    if (mediaSource.readyState === 'open') {
+        mediaSource.endOfStream();
+    }
+    return new Blob(parts, { type: 'audio/mpeg' });
+}
+
 // Copy story text to clipboard
 async function copyStoryText() {
     try {
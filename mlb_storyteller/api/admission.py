@@ -0,0 +1,216 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional, Pattern, Tuple
+
+from mlb_storyteller.config import (
+    ADMISSION_STORY_CONCURRENCY,
+    ADMISSION_QUIZ_CONCURRENCY,
+    ADMISSION_AUDIO_CONCURRENCY,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_MAX_QUEUED_PER_USER,
+    ADMISSION_MAX_WAIT_SECONDS,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+
+metrics.describe("admission_requests_total", "Requests to admission-controlled endpoints by outcome")
+metrics.describe("admission_wait_seconds", "Time admitted requests waited for a slot")
+metrics.describe("admission_active", "Requests holding an admission slot")
+metrics.describe("admission_queued", "Requests waiting for an admission slot")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted in time."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Server busy ({reason}), retry in {retry_after}s")
+
+
+class AdmissionGate:
+    """Concurrency cap with a bounded, per-user fair wait queue for one endpoint group.
+
+    Up to ``max_concurrency`` requests run at once. Others wait, but only up
+    to ``max_queue`` in total and ``max_per_user`` per user, and freed slots
+    go to waiting users in round-robin order so one heavy client cannot
+    crowd out everyone else. A request is rejected straight away when the
+    queue is full or when the expected wait (from the average service time)
+    already exceeds ``max_wait``; otherwise it gives up after waiting
+    ``max_wait`` seconds.
+    """
+
+    # Weight of the newest sample in the average service time
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int = ADMISSION_QUEUE_SIZE,
+        max_per_user: int = ADMISSION_MAX_QUEUED_PER_USER,
+        max_wait: float = ADMISSION_MAX_WAIT_SECONDS
+    ):
+        """Initialize the gate."""
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.max_wait = max_wait
+        self.active = 0
+        self.queued = 0
+        self.avg_service_seconds: Optional[float] = None
+        # user -> their waiting requests, in the order users get the next slot
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    async def acquire(self, user: str) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            user: Fair-share key for the caller (user ID or client address)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            AdmissionRejected: If the request cannot get a slot within max_wait
+        """
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self._update_gauges()
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            raise AdmissionRejected("queue full", self._retry_after(self.queued))
+        user_waiters = self._waiters.get(user)
+        if user_waiters and len(user_waiters) >= self.max_per_user:
+            raise AdmissionRejected("too many queued requests for this user", self._retry_after(self.queued))
+        expected_wait = self._expected_wait(self.queued + 1)
+        if expected_wait is not None and expected_wait > self.max_wait:
+            raise AdmissionRejected("queue deadline cannot be met", self._retry_after(self.queued + 1))
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user, deque()).append(future)
+        self.queued += 1
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if not (future.done() and not future.cancelled()):
+                future.cancel()
+                self._remove_waiter(user, future)
+                raise AdmissionRejected("timed out waiting for a slot", self._retry_after(self.queued))
+            # The slot was handed over just as the wait ran out; keep it
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The client went away after being handed a slot; pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._remove_waiter(user, future)
+            raise
+        return time.perf_counter() - start
+
+    def release(self, service_seconds: Optional[float] = None):
+        """Free a slot, handing it straight to the next waiting user if there is one."""
+        if service_seconds is not None:
+            if self.avg_service_seconds is None:
+                self.avg_service_seconds = service_seconds
+            else:
+                self.avg_service_seconds += self.EWMA_ALPHA * (service_seconds - self.avg_service_seconds)
+
+        while self._waiters:
+            user, user_waiters = next(iter(self._waiters.items()))
+            future = user_waiters.popleft()
+            self.queued -= 1
+            if user_waiters:
+                # Round-robin: this user's next request goes behind the other users
+                self._waiters.move_to_end(user)
+            else:
+                del self._waiters[user]
+            if not future.done():
+                # The slot moves to the waiter without active dropping, so it cannot be taken in between
+                future.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+    def _remove_waiter(self, user: str, future: asyncio.Future):
+        user_waiters = self._waiters.get(user)
+        if user_waiters and future in user_waiters:
+            user_waiters.remove(future)
+            self.queued -= 1
+            if not user_waiters:
+                del self._waiters[user]
+            self._update_gauges()
+
+    def _expected_wait(self, position: int) -> Optional[float]:
+        """Expected seconds until the request at this queue position gets a slot."""
+        if self.avg_service_seconds is None:
+            return None
+        return math.ceil(position / self.max_concurrency) * self.avg_service_seconds
+
+    def _retry_after(self, position: int) -> int:
+        expected_wait = self._expected_wait(max(1, position))
+        return max(1, math.ceil(expected_wait if expected_wait is not None else self.max_wait))
+
+    def _update_gauges(self):
+        metrics.set_gauge("admission_active", self.active, {"endpoint": self.name})
+        metrics.set_gauge("admission_queued", self.queued, {"endpoint": self.name})
+
+
+class AdmissionController:
+    """Map request paths to admission gates.
+
+    Only the LLM- and TTS-bound POST endpoints are gated; every other
+    request (schedule, rosters, static files) passes straight through, so
+    cheap endpoints stay fast during a generation backlog.
+    """
+
+    def __init__(self, rules: Optional[List[Tuple[str, Pattern, int]]] = None):
+        """
+        Initialize the controller.
+
+        Args:
+            rules: (gate name, path pattern, max concurrency) for each endpoint group
+        """
+        if rules is None:
+            rules = [
+                ("story", re.compile(r"^/generate-story(/batch|/live|/stream|/narrate)?$"), ADMISSION_STORY_CONCURRENCY),
+                ("quiz", re.compile(r"^/api/(game/[^/]+/quiz(/stream)?|quiz/batch)$"), ADMISSION_QUIZ_CONCURRENCY),
+                ("audio", re.compile(r"^/api/audio/generate-audio$"), ADMISSION_AUDIO_CONCURRENCY),
+            ]
+        self.rules = [(pattern, AdmissionGate(name, concurrency)) for name, pattern, concurrency in rules]
+
+    def gate_for(self, method: str, path: str) -> Optional[AdmissionGate]:
+        """Get the gate for a request, or None if it is not admission-controlled."""
+        if method != "POST":
+            return None
+        for pattern, gate in self.rules:
+            if pattern.match(path):
+                return gate
+        return None
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current load of each gate."""
+        return {
+            gate.name: {
+                'active': gate.active,
+                'queued': gate.queued,
+                'max_concurrency': gate.max_concurrency,
+                'avg_service_seconds': round(gate.avg_service_seconds, 3) if gate.avg_service_seconds is not None else None,
+            }
+            for _, gate in self.rules
+        }
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """Get the worker-wide admission controller."""
+    return AdmissionController()
@@ -5,8 +5,14 @@ from ..story_engine.story_generator import StoryGenerator
 from ..cache.redis_service import RedisService
 import os
 
+@lru_cache()
 def get_text_to_speech_service() -> TextToSpeechService:
-    """Get a new instance of TextToSpeechService with proper error handling."""
+    """Get the worker-wide TextToSpeechService, creating its client on first use.
+
+    Building the client reads credentials and verifies them with a
+    list_voices call, so it is done once per worker (at startup) rather than
+    per request. A failed attempt is not cached, so the next call retries.
+    """
     try:
         # Get credentials path from environment
         credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response, Header
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from ..dependencies import get_text_to_speech_service
-import io
+from mlb_storyteller.cache.audio_cache import get_audio_cache
+from mlb_storyteller.cache.idempotency import get_idempotency_store
+from mlb_storyteller.services.audio_assembly import AUDIO_FORMATS, DEFAULT_AUDIO_FORMAT, finalize_audio, media_type_for
+from mlb_storyteller.services.tts_scheduler import QuotaWaitExceeded
+import math
+import re
 from google.api_core import exceptions
 
 router = APIRouter(
@@ -27,18 +32,173 @@ class TextToSpeechRequest(BaseModel):
     language_code: Optional[str] = Field("en-US", description="The language code")
     speaking_rate: Optional[float] = Field(1.0, ge=0.25, le=4.0, description="Speaking rate (0.25 to 4.0)")
     pitch: Optional[float] = Field(0.0, ge=-20.0, le=20.0, description="Pitch adjustment (-20.0 to 20.0)")
+    audio_format: Optional[str] = Field(
+        None,
+        pattern="^(mp3|ogg_opus)$",
+        description="Output format: 'mp3' for compatibility or 'ogg_opus' for smaller files; negotiated from the Accept header if omitted"
+    )
+
+def negotiate_audio_format(accept: Optional[str]) -> str:
+    """
+    Pick the output format from an Accept header.
+
+    Ogg Opus is chosen only when the client prefers it to MP3 (audio/ogg or
+    audio/opus with a higher q-value); ties, wildcards and a missing header
+    get MP3, which every player supports.
+    """
+    if not accept:
+        return DEFAULT_AUDIO_FORMAT
+    quality = {}
+    for item in accept.split(","):
+        media_range, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_range = media_range.strip().lower()
+        quality[media_range] = max(q, quality.get(media_range, 0.0))
+    wildcard = max(quality.get("audio/*", 0.0), quality.get("*/*", 0.0))
+
+    def q_for(*media_types: str) -> float:
+        listed = [quality[media_type] for media_type in media_types if media_type in quality]
+        return max(listed) if listed else wildcard
+
+    return 'ogg_opus' if q_for("audio/ogg", "audio/opus") > q_for("audio/mpeg", "audio/mp3") else DEFAULT_AUDIO_FORMAT
 
 @router.post("/generate-audio")
-async def generate_audio(request: TextToSpeechRequest):
+async def generate_audio(
+    request: TextToSpeechRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Generate audio from text using Google Cloud Text-to-Speech.
-    Returns audio as a streaming response.
+    Streams the audio as each chunk is synthesized, so playback can start
+    after the first chunk. The format is MP3 unless audio_format or the
+    Accept header asks for Ogg Opus. Narrations already in the audio cache are served
+    from it with an ETag and Range support, and the X-Audio-Id header names
+    the cache entry for GET /api/audio/cached/{audio_id}.
+
+    A repeated Idempotency-Key replays the first response instead of
+    synthesizing the text again; those requests are sent as one buffered,
+    full-length response so it can be stored.
     """
+    if not request.audio_format:
+        request = request.model_copy(update={'audio_format': negotiate_audio_format(http_request.headers.get("accept"))})
+    if idempotency_key is None:
+        return await _generate_audio(request, stream=True, http_request=http_request)
+    return await get_idempotency_store().run(
+        "generate-audio",
+        idempotency_key,
+        request.model_dump(),
+        lambda: _generate_audio(request, stream=False)
+    )
+
+@router.get("/cached/{audio_id}")
+async def get_cached_audio(audio_id: str, http_request: Request):
+    """Serve a cached narration by its X-Audio-Id, with ETag and Range support for seeking."""
+    audio_cache = get_audio_cache()
+    if not audio_cache or not re.fullmatch(r"[0-9a-f]{64}", audio_id):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    audio_content = await audio_cache.get(audio_id)
+    if audio_content is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return _cached_audio_response(
+        audio_content,
+        audio_id,
+        http_request,
+        {"Cache-Control": "public, max-age=86400, immutable"}
+    )
+
+def _cached_audio_response(
+    audio_content: bytes,
+    audio_id: str,
+    http_request: Optional[Request],
+    headers: dict
+) -> Response:
+    """
+    Build the response for cached audio, honouring conditional and Range requests.
+
+    Args:
+        audio_content: The complete audio file
+        audio_id: Cache key, used as the strong ETag
+        http_request: Incoming request, or None to always send the full audio
+        headers: Extra response headers
+
+    Returns:
+        Response: 304, 206, 416 or 200 as appropriate
+    """
+    etag = f'"{audio_id}"'
+    headers = {**headers, "ETag": etag, "Accept-Ranges": "bytes", "X-Audio-Id": audio_id}
+    media_type = media_type_for(audio_content)
+    if http_request is None:
+        return Response(content=audio_content, media_type=media_type, headers=headers)
+
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    range_header = http_request.headers.get("range")
+    if_range = http_request.headers.get("if-range")
+    if not range_header or (if_range and if_range.strip() != etag):
+        return Response(content=audio_content, media_type=media_type, headers=headers)
+
+    # Only single byte ranges are supported; anything else gets the full audio
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header)
+    if not match or not (match.group(1) or match.group(2)):
+        return Response(content=audio_content, media_type=media_type, headers=headers)
+
+    size = len(audio_content)
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, size - int(match.group(2)))
+        end = size - 1
+    if start >= size or start > end:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    return Response(
+        content=audio_content[start:end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+async def _generate_audio(
+    request: TextToSpeechRequest,
+    stream: bool,
+    http_request: Optional[Request] = None
+) -> Response:
     try:
         # Validate input text
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Empty text provided")
 
+        audio_format = request.audio_format or DEFAULT_AUDIO_FORMAT
+        media_type = AUDIO_FORMATS[audio_format]['media_type']
+        headers = {
+            "Content-Disposition": f"attachment; filename=story_narration.{AUDIO_FORMATS[audio_format]['extension']}",
+            "Cache-Control": "no-cache",
+            "Vary": "Accept"
+        }
+
+        # Repeat plays of the same narration are served from the cache
+        audio_cache = get_audio_cache()
+        if audio_cache:
+            audio_id = audio_cache.key_for(
+                request.text, request.voice, request.language_code, request.speaking_rate, request.pitch, audio_format
+            )
+            cached = await audio_cache.get(audio_id)
+            if cached:
+                return _cached_audio_response(cached, audio_id, http_request, headers)
+            headers["X-Audio-Id"] = audio_id
+
         # Get TTS service
         try:
             tts_service = get_text_to_speech_service()
@@ -67,15 +227,22 @@ async def generate_audio(request: TextToSpeechRequest):
                     detail=f"Failed to initialize Text-to-Speech service: {error_msg}"
                 )
 
-        # Generate audio content
+        # Generate audio content. When streaming, wait only for the first
+        # chunk here so errors before any audio is sent still map to a status code
         try:
-            audio_content = await tts_service.generate_long_audio(
+            audio_chunks = tts_service.stream_long_audio(
                 text=request.text,
                 voice_id=request.voice,
                 language_code=request.language_code,
                 speaking_rate=request.speaking_rate,
                 pitch=request.pitch,
+                check_cache=False,
+                audio_format=audio_format,
             )
+            if stream:
+                audio_content = await audio_chunks.__anext__()
+            else:
+                audio_content = finalize_audio(b''.join([chunk async for chunk in audio_chunks]), audio_format)
         except exceptions.PermissionDenied as e:
             raise HTTPException(
                 status_code=403,
@@ -86,6 +253,8 @@ async def generate_audio(request: TextToSpeechRequest):
                 status_code=401,
                 detail=f"Authentication failed: {str(e)}"
             )
+        except QuotaWaitExceeded as e:
+            raise quota_exceeded_error(e)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -96,25 +265,41 @@ async def generate_audio(request: TextToSpeechRequest):
         if not audio_content:
             raise HTTPException(status_code=500, detail="No audio content generated")
 
-        # Create an in-memory bytes buffer
-        audio_buffer = io.BytesIO(audio_content)
-        audio_buffer.seek(0)
-        
-        # Return as streaming response with appropriate headers
+        if not stream:
+            return Response(content=audio_content, media_type=media_type, headers=headers)
+
+        # No Content-Length: the body is sent with chunked transfer encoding
+        # as the remaining chunks finish, in order
         return StreamingResponse(
-            audio_buffer,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": "attachment; filename=story_narration.mp3",
-                "Content-Length": str(len(audio_content)),
-                "Cache-Control": "no-cache"
-            }
+            stream_audio_chunks(audio_content, audio_chunks),
+            media_type=media_type,
+            headers=headers
         )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+def quota_exceeded_error(error: QuotaWaitExceeded) -> HTTPException:
+    """429 telling the client when the TTS quota will have room again."""
+    return HTTPException(
+        status_code=429,
+        detail=f"Text-to-speech is at its quota, please retry: {str(error)}",
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
+
+async def stream_audio_chunks(first_chunk: bytes, audio_chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Send the first chunk, then the rest as they are synthesized."""
+    try:
+        yield first_chunk
+        async for chunk in audio_chunks:
+            yield chunk
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated stream
+        print(f"Audio stream failed after it started: {str(e)}")
+    finally:
+        await audio_chunks.aclose()
+
 @router.get("/voices", response_model=VoiceListResponse)
 async def list_voices(language_code: str = "en-US"):
     """
@@ -0,0 +1,208 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+import uuid
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers may briefly evict more than needed
+    fcntl = None
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import (
+    AUDIO_CACHE_ENABLED,
+    AUDIO_CACHE_DIR,
+    AUDIO_CACHE_MAX_BYTES,
+    AUDIO_CACHE_REDIS_MAX_ITEM_BYTES,
+    AUDIO_CACHE_REDIS_TTL,
+    AUDIO_CACHE_RESCAN_SECONDS,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+
+metrics.describe("audio_cache_lookups_total", "Narration audio cache lookups by tier (redis, disk or miss)")
+metrics.describe("audio_cache_evictions_total", "Narration audio files evicted to stay within the disk budget")
+metrics.describe("audio_cache_bytes", "Bytes of narration audio held in the disk cache directory")
+
+
+class AudioCache:
+    """Content-addressed cache of synthesized narration audio.
+
+    Audio is keyed by a hash of the normalized text and every voice
+    parameter, so identical requests share one entry and the key doubles as
+    a strong ETag. Files live under ``directory`` within a ``max_bytes``
+    budget, evicting the least recently used by mtime (a hit refreshes it).
+    The budget covers the whole directory, so workers sharing it share one
+    budget: writes update a running byte total kept in a file next to the
+    audio, under a lock file. The directory is only scanned when that total
+    goes over budget (to pick what to evict) or is older than
+    ``rescan_seconds`` (to correct drift, e.g. files deleted by hand). Entries up to
+    ``redis_max_item_bytes`` are mirrored to Redis so other instances (which
+    do not share the disk) can serve them too.
+    """
+
+    # Share of the budget an eviction pass frees the directory down to
+    EVICT_TO = 0.9
+
+    def __init__(
+        self,
+        directory: str = AUDIO_CACHE_DIR,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+        redis_service: Optional[RedisService] = None,
+        redis_max_item_bytes: int = AUDIO_CACHE_REDIS_MAX_ITEM_BYTES,
+        rescan_seconds: float = AUDIO_CACHE_RESCAN_SECONDS
+    ):
+        """Initialize the cache."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.redis = redis_service or RedisService()
+        self.redis_max_item_bytes = redis_max_item_bytes
+        self.rescan_seconds = rescan_seconds
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(
+        text: str,
+        voice_id: str,
+        language_code: str,
+        speaking_rate: float,
+        pitch: float,
+        audio_format: str = "mp3"
+    ) -> str:
+        """Content address for the audio of this text and voice."""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        spec = {
+            'text': normalized,
+            'voice': voice_id,
+            'language_code': language_code,
+            'speaking_rate': round(float(speaking_rate), 2),
+            'pitch': round(float(pitch), 1),
+            'format': audio_format,
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached audio, or None on a miss."""
+        if self.redis.enabled and self.redis_max_item_bytes > 0:
+            try:
+                data = await self.redis.get(f"audio:{key}")
+                if data:
+                    metrics.inc("audio_cache_lookups_total", {"tier": "redis"})
+                    return base64.b64decode(data)
+            except Exception as e:
+                print(f"Audio cache read from Redis failed: {str(e)}")
+
+        data = await asyncio.to_thread(self._read, key)
+        metrics.inc("audio_cache_lookups_total", {"tier": "disk" if data is not None else "miss"})
+        return data
+
+    async def put(self, key: str, data: bytes):
+        """Store audio, evicting the least recently used files if over budget."""
+        if self.redis.enabled and 0 < len(data) <= self.redis_max_item_bytes:
+            try:
+                await self.redis.set(f"audio:{key}", base64.b64encode(data).decode('ascii'), expire=AUDIO_CACHE_REDIS_TTL)
+            except Exception as e:
+                print(f"Audio cache write to Redis failed: {str(e)}")
+        try:
+            await asyncio.to_thread(self._write, key, data)
+        except OSError as e:
+            print(f"Audio cache write failed for {key}: {str(e)}")
+
+    def _path(self, key: str) -> str:
+        # No extension: the key already covers the audio format
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan(self) -> list:
+        """(mtime, name, size) of every cached file, least recently used first."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp') or name.startswith('.'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size))
+        entries.sort()
+        return entries
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+
+        with self._lock, open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(temp_path, path)
+            total_bytes, scanned_at = self._read_total()
+            stale = total_bytes is None or time.time() - scanned_at > self.rescan_seconds
+            if not stale:
+                total_bytes += len(data) - replaced
+            if stale or total_bytes > self.max_bytes:
+                total_bytes, scanned_at = self._evict(), time.time()
+            self._write_total(total_bytes, scanned_at)
+            metrics.set_gauge("audio_cache_bytes", total_bytes)
+
+    def _read_total(self) -> Tuple[Optional[int], float]:
+        """Running byte total and when it was last checked against the directory, or None if unknown."""
+        try:
+            with open(os.path.join(self.directory, '.size')) as f:
+                total_bytes, scanned_at = f.read().split()
+            return int(total_bytes), float(scanned_at)
+        except (OSError, ValueError):
+            return None, 0.0
+
+    def _write_total(self, total_bytes: int, scanned_at: float):
+        with open(os.path.join(self.directory, '.size'), 'w') as f:
+            f.write(f"{total_bytes} {scanned_at}")
+
+    def _evict(self) -> int:
+        """Scan the directory and, if it is over budget, remove the least recently used files; returns its size."""
+        entries = self._scan()
+        total_bytes = sum(size for _, _, size in entries)
+        # Evicting below the budget leaves room for many writes before the next scan
+        target = self.max_bytes * self.EVICT_TO if total_bytes > self.max_bytes else self.max_bytes
+        # Always keep the most recently used file (normally the one just written)
+        for _, name, size in entries[:-1]:
+            if total_bytes <= target:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                continue
+            total_bytes -= size
+            metrics.inc("audio_cache_evictions_total")
+        return total_bytes
+
+
+@lru_cache()
+def get_audio_cache() -> Optional[AudioCache]:
+    """Get the worker-wide audio cache, or None when it is disabled."""
+    return AudioCache() if AUDIO_CACHE_ENABLED else None
@@ -0,0 +1,197 @@
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import (
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_LOCK_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+    IDEMPOTENCY_POLL_INTERVAL_MS,
+    IDEMPOTENCY_MAX_BODY_BYTES,
+)
+
+
+class IdempotencyStore:
+    """Replay the first response for a repeated ``Idempotency-Key``.
+
+    The first request with a key claims it and runs the handler; its
+    response is stored for IDEMPOTENCY_TTL_SECONDS. A retry with the same key
+    and the same request body gets the stored response instead of starting
+    the work again. A retry that arrives while the first request is still
+    running waits for it (up to IDEMPOTENCY_WAIT_SECONDS, then 409). Reusing
+    a key with a different body is rejected with 422.
+
+    Records live in Redis so retries landing on another worker are covered.
+    When Redis is disabled or unreachable, a per-worker in-memory store is
+    used instead. Only successful responses are stored; a failed request
+    releases its key so the client can retry.
+    """
+
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    MAX_KEY_LENGTH = 255
+    # Local records are swept for expiry once there are this many
+    LOCAL_PRUNE_THRESHOLD = 1024
+
+    def __init__(self, redis_service: Optional[RedisService] = None):
+        """Initialize the store."""
+        self.redis = redis_service or RedisService()
+        # Local fallback: storage key -> (record, expiry timestamp)
+        self._local: Dict[str, Tuple[Dict, float]] = {}
+
+    async def run(
+        self,
+        scope: str,
+        idempotency_key: str,
+        payload: Dict,
+        handler: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """
+        Run a request handler at most once per idempotency key.
+
+        Args:
+            scope: Endpoint name, so the same key can be used on different endpoints
+            idempotency_key: Client-supplied Idempotency-Key header value
+            payload: Request parameters that must match on a retry
+            handler: Produces the response when the key is new
+
+        Returns:
+            Response: The handler's response, or the stored one for a retry
+        """
+        if not idempotency_key or len(idempotency_key) > self.MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be 1-{self.MAX_KEY_LENGTH} characters"
+            )
+
+        key = f"idem:{scope}:{hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()}"
+        fingerprint = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            if await self._claim(key, fingerprint):
+                break
+            record = await self._get(key)
+            # With no record, the first request failed and released the key (or
+            # Redis could not be read); claim it again after the poll interval
+            if record is not None and record.get('fingerprint') != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if record is not None and record.get('state') == self.COMPLETED:
+                return self._to_response(record)
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": str(max(1, IDEMPOTENCY_WAIT_SECONDS // 2))}
+                )
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL_MS / 1000)
+
+        try:
+            response = await handler()
+        except BaseException:
+            await self._release(key)
+            raise
+
+        body = getattr(response, 'body', None)
+        if 200 <= response.status_code < 300 and body is not None and len(body) <= IDEMPOTENCY_MAX_BODY_BYTES:
+            await self._put(key, self._to_record(fingerprint, response), IDEMPOTENCY_TTL_SECONDS)
+        else:
+            await self._release(key)
+        return response
+
+    def _to_record(self, fingerprint: str, response: Response) -> Dict:
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in ('content-length', 'content-type')
+        }
+        return {
+            'state': self.COMPLETED,
+            'fingerprint': fingerprint,
+            'status_code': response.status_code,
+            'media_type': response.media_type,
+            'headers': headers,
+            'body': base64.b64encode(response.body).decode('ascii'),
+        }
+
+    @staticmethod
+    def _to_response(record: Dict) -> Response:
+        headers = dict(record.get('headers') or {})
+        headers['Idempotent-Replayed'] = 'true'
+        return Response(
+            content=base64.b64decode(record['body']),
+            status_code=record['status_code'],
+            media_type=record.get('media_type'),
+            headers=headers,
+        )
+
+    async def _claim(self, key: str, fingerprint: str) -> bool:
+        record = {'state': self.IN_PROGRESS, 'fingerprint': fingerprint}
+        if self.redis.enabled:
+            try:
+                return await self.redis.acquire_lock(key, json.dumps(record), IDEMPOTENCY_LOCK_TTL_SECONDS * 1000)
+            except Exception as e:
+                print(f"Idempotency store unavailable, using local store: {str(e)}")
+        if self._get_local(key) is not None:
+            return False
+        self._put_local(key, record, IDEMPOTENCY_LOCK_TTL_SECONDS)
+        return True
+
+    async def _get(self, key: str) -> Optional[Dict]:
+        if self.redis.enabled:
+            try:
+                return await self.redis.get(key)
+            except Exception as e:
+                print(f"Idempotency store unavailable, using local store: {str(e)}")
+        return self._get_local(key)
+
+    async def _put(self, key: str, record: Dict, ttl_seconds: int):
+        if self.redis.enabled:
+            try:
+                await self.redis.set(key, record, expire=ttl_seconds)
+                return
+            except Exception as e:
+                print(f"Idempotency store unavailable, using local store: {str(e)}")
+        self._put_local(key, record, ttl_seconds)
+
+    async def _release(self, key: str):
+        self._local.pop(key, None)
+        if self.redis.enabled:
+            try:
+                await self.redis.delete(key)
+            except Exception as e:
+                print(f"Failed to release idempotency key: {str(e)}")
+
+    def _put_local(self, key: str, record: Dict, ttl_seconds: int):
+        now = time.monotonic()
+        if len(self._local) >= self.LOCAL_PRUNE_THRESHOLD:
+            self._local = {k: v for k, v in self._local.items() if v[1] > now}
+        self._local[key] = (record, now + ttl_seconds)
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        record, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        return record
+
+
+@lru_cache()
+def get_idempotency_store() -> IdempotencyStore:
+    """Get the worker-wide idempotency store."""
+    return IdempotencyStore()
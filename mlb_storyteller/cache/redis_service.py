@@ -1,12 +1,20 @@
 import json
 from typing import Optional, Dict, Any, Union
 import redis
+import redis.asyncio
 from datetime import timedelta
 import os
 from mlb_storyteller.config import CACHE_ENABLED, CACHE_TTL
 
 class RedisService:
     """Redis caching service for MLB Storyteller."""
+
+    RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
     
     def __init__(self):
         """Initialize Redis connection."""
@@ -17,6 +25,12 @@ class RedisService:
             encoding='utf-8',
             decode_responses=True
         )
+        # For calls made per streamed chunk or poll, which must not block the event loop
+        self.async_redis = redis.asyncio.Redis.from_url(
+            os.getenv('REDIS_URL', 'redis://localhost:6379'),
+            encoding='utf-8',
+            decode_responses=True
+        )
     
     async def get(self, key: str) -> Optional[Any]:
         """Get cached data by key."""
@@ -49,15 +63,15 @@ class RedisService:
         data = self.redis.get(key)
         return json.loads(data) if data else None
         
-    async def set_game_data(self, game_id: str, data: Dict):
-        """Cache game data."""
+    async def set_game_data(self, game_id: str, data: Dict, expire: Optional[int] = None):
+        """Cache game data (for expire seconds, CACHE_TTL by default)."""
         if not self.enabled:
             return
             
         key = f"game:{game_id}"
         self.redis.setex(
             key,
-            timedelta(seconds=self.ttl),
+            timedelta(seconds=expire or self.ttl),
             json.dumps(data)
         )
         
@@ -70,15 +84,15 @@ class RedisService:
         data = self.redis.get(key)
         return json.loads(data) if data else None
         
-    async def set_popular_stats(self, stat_type: str, data: Dict):
-        """Cache popular statistics."""
+    async def set_popular_stats(self, stat_type: str, data: Dict, expire: Optional[int] = None):
+        """Cache popular statistics (for expire seconds, 1 hour by default)."""
         if not self.enabled:
             return
             
         key = f"stats:{stat_type}"
         self.redis.setex(
             key,
-            timedelta(hours=1),  # Stats cache for 1 hour
+            timedelta(seconds=expire) if expire else timedelta(hours=1),  # Stats cache for 1 hour
             json.dumps(data)
         )
         
@@ -99,6 +113,106 @@ class RedisService:
         if keys:
             self.redis.delete(*keys)
             
+    async def acquire_lock(self, key: str, token: str, ttl_ms: int) -> bool:
+        """Acquire a lock key if nobody holds it. Returns True on success."""
+        if not self.enabled:
+            return False
+            
+        return bool(self.redis.set(key, token, nx=True, px=ttl_ms))
+        
+    async def release_lock(self, key: str, token: str):
+        """Release a lock key, but only if it is still held with our token."""
+        if not self.enabled:
+            return
+            
+        # Compare and delete in one step, so a lock that expired and was taken
+        # by another worker in between is never deleted
+        await self.eval_script(self.RELEASE_LOCK_SCRIPT, [key], [token])
+            
+    async def expire(self, key: str, ttl_ms: int):
+        """Set a key's time-to-live in milliseconds."""
+        if not self.enabled:
+            return
+            
+        await self.async_redis.pexpire(key, ttl_ms)
+        
+    async def exists(self, key: str) -> bool:
+        """Check whether a key exists."""
+        if not self.enabled:
+            return False
+            
+        return bool(await self.async_redis.exists(key))
+        
+    async def delete(self, *keys: str):
+        """Delete one or more keys."""
+        if not self.enabled or not keys:
+            return
+            
+        self.redis.delete(*keys)
+        
+    async def stream_append(self, key: str, fields: Dict[str, str], ttl_ms: Optional[int] = None) -> Optional[str]:
+        """Append an entry to a Redis stream, optionally resetting its TTL in the same round trip, and return its ID."""
+        if not self.enabled:
+            return None
+            
+        async with self.async_redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, fields)
+            if ttl_ms:
+                pipe.pexpire(key, ttl_ms)
+            results = await pipe.execute()
+        return results[0]
+        
+    async def stream_read(self, key: str, last_id: str = "0", count: int = 100) -> list:
+        """Read stream entries after last_id as a list of (entry_id, fields)."""
+        if not self.enabled:
+            return []
+            
+        result = await self.async_redis.xread({key: last_id}, count=count)
+        return result[0][1] if result else []
+        
+    async def sorted_set_add(self, key: str, member: str, score: float):
+        """Add a member to a sorted set with the given score."""
+        if not self.enabled:
+            return
+            
+        self.redis.zadd(key, {member: score})
+        
+    async def sorted_set_pop_min(self, key: str) -> Optional[str]:
+        """Atomically remove and return the lowest-scored member of a sorted set."""
+        if not self.enabled:
+            return None
+            
+        result = self.redis.zpopmin(key)
+        return result[0][0] if result else None
+        
+    async def sorted_set_remove(self, key: str, member: str) -> bool:
+        """Remove a member from a sorted set; True if this call removed it."""
+        if not self.enabled:
+            return False
+            
+        return bool(self.redis.zrem(key, member))
+        
+    async def sorted_set_range_by_score(self, key: str, max_score: float) -> list:
+        """Members of a sorted set scored at or below max_score, lowest first."""
+        if not self.enabled:
+            return []
+            
+        return self.redis.zrangebyscore(key, '-inf', max_score)
+        
+    async def sorted_set_count(self, key: str) -> int:
+        """Number of members in a sorted set."""
+        if not self.enabled:
+            return 0
+            
+        return self.redis.zcard(key)
+        
+    async def eval_script(self, script: str, keys: list, args: list) -> Any:
+        """Run a Lua script atomically on the server and return its result."""
+        if not self.enabled:
+            return None
+            
+        return self.redis.eval(script, len(keys), *keys, *args)
+        
     async def health_check(self) -> bool:
         """Check Redis connection health."""
         try:
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,12 +15,134 @@ MLB_STATS_API_VERSION = "v1"
 # MongoDB Configuration
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
 MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'mlb_storyteller')
+MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))  # Connections in the worker's shared client pool
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))  # Fail fast when MongoDB is unreachable
 
 # Redis Configuration
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
 CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
 CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))  # Default 1 hour
 
+# LLM Backend Configuration
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini').lower()  # 'gemini' or 'stub'
+GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-1.5-flash')
+
+# Stub LLM backend (load testing without Gemini quota)
+STUB_LLM_LATENCY_DISTRIBUTION = os.getenv('STUB_LLM_LATENCY_DISTRIBUTION', 'lognormal').lower()  # fixed, uniform, normal, lognormal, exponential
+STUB_LLM_LATENCY_MS = float(os.getenv('STUB_LLM_LATENCY_MS', '800'))  # Median time to first chunk
+STUB_LLM_LATENCY_SPREAD_MS = float(os.getenv('STUB_LLM_LATENCY_SPREAD_MS', '400'))
+STUB_LLM_CHUNK_CHARS = int(os.getenv('STUB_LLM_CHUNK_CHARS', '60'))
+STUB_LLM_CHUNK_INTERVAL_MS = float(os.getenv('STUB_LLM_CHUNK_INTERVAL_MS', '40'))
+STUB_LLM_STORY_PARAGRAPHS = int(os.getenv('STUB_LLM_STORY_PARAGRAPHS', '4'))
+STUB_LLM_SEED = int(os.getenv('STUB_LLM_SEED')) if os.getenv('STUB_LLM_SEED') else None
+
+# In-flight LLM request deduplication
+LLM_DEDUP_ENABLED = os.getenv('LLM_DEDUP_ENABLED', 'True').lower() == 'true'
+LLM_DEDUP_LOCK_TTL_SECONDS = int(os.getenv('LLM_DEDUP_LOCK_TTL_SECONDS', '120'))  # Upper bound on one generation
+LLM_DEDUP_RESULT_TTL_SECONDS = int(os.getenv('LLM_DEDUP_RESULT_TTL_SECONDS', '30'))  # Reuse window after completion
+LLM_DEDUP_POLL_INTERVAL_MS = int(os.getenv('LLM_DEDUP_POLL_INTERVAL_MS', '50'))
+
+# LLM concurrency and template fallback
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))  # Concurrent LLM calls per worker
+STORY_FALLBACK_ENABLED = os.getenv('STORY_FALLBACK_ENABLED', 'True').lower() == 'true'
+STORY_FALLBACK_QUEUE_WAIT_MS = int(os.getenv('STORY_FALLBACK_QUEUE_WAIT_MS', '2000'))  # Max wait for an LLM slot before falling back
+
+# LLM instrumentation
+LLM_PROMPT_COST_PER_1K_TOKENS = float(os.getenv('LLM_PROMPT_COST_PER_1K_TOKENS', '0.000075'))  # USD, gemini-1.5-flash list price
+LLM_RESPONSE_COST_PER_1K_TOKENS = float(os.getenv('LLM_RESPONSE_COST_PER_1K_TOKENS', '0.0003'))
+QUIZ_MAX_RETRIES = int(os.getenv('QUIZ_MAX_RETRIES', '1'))  # Extra attempts when a quiz response fails validation
+
+# Quiz generation
+QUIZ_LLM_ENRICHMENT_ENABLED = os.getenv('QUIZ_LLM_ENRICHMENT_ENABLED', 'True').lower() == 'true'
+QUIZ_MIN_RULE_QUESTIONS = int(os.getenv('QUIZ_MIN_RULE_QUESTIONS', '3'))  # Below this, generate the quiz with the LLM inline
+QUIZ_CACHE_TTL = int(os.getenv('QUIZ_CACHE_TTL', str(CACHE_TTL)))
+
+# Story caching and multi-style generation
+STORY_CACHE_TTL = int(os.getenv('STORY_CACHE_TTL', str(CACHE_TTL)))
+STORY_BATCH_MAX_STYLES = int(os.getenv('STORY_BATCH_MAX_STYLES', '4'))  # Max styles generated by one model call
+
+# Slate-level quiz batching
+QUIZ_BATCH_MAX_GAMES = int(os.getenv('QUIZ_BATCH_MAX_GAMES', '5'))  # Games packed into one model call
+QUIZ_BATCH_GAME_TOKEN_CAP = int(os.getenv('QUIZ_BATCH_GAME_TOKEN_CAP', '250'))  # Max prompt tokens per game summary
+QUIZ_BATCH_MAX_REQUEST_GAMES = int(os.getenv('QUIZ_BATCH_MAX_REQUEST_GAMES', '30'))  # Max games per /api/quiz/batch request
+
+# Live (per half-inning) stories
+LIVE_STORY_TTL = int(os.getenv('LIVE_STORY_TTL', '21600'))  # Keep live narratives for 6 hours
+LIVE_STORY_SUMMARY_MAX_CHARS = int(os.getenv('LIVE_STORY_SUMMARY_MAX_CHARS', '600'))  # Running summary sent with each update
+LIVE_STORY_MAX_CATCHUP_HALVES = int(os.getenv('LIVE_STORY_MAX_CATCHUP_HALVES', '2'))  # Beyond this backlog, summarize in one catch-up segment
+LIVE_STORY_MAX_PLAYS_PER_HALF = int(os.getenv('LIVE_STORY_MAX_PLAYS_PER_HALF', '12'))
+LIVE_STORY_LOCK_TTL_SECONDS = int(os.getenv('LIVE_STORY_LOCK_TTL_SECONDS', '120'))  # Longest one refresh may hold a story's lock
+LIVE_STORY_LOCK_WAIT_SECONDS = int(os.getenv('LIVE_STORY_LOCK_WAIT_SECONDS', '60'))  # Wait for a concurrent refresh before returning the stored story
+LIVE_GAME_DATA_CACHE_TTL = int(os.getenv('LIVE_GAME_DATA_CACHE_TTL', '15'))  # Seconds game data is cached until the game is final
+
+# Shared game context
+GAME_CONTEXT_CACHE_SIZE = int(os.getenv('GAME_CONTEXT_CACHE_SIZE', '256'))  # Memoized game contexts per worker
+LLM_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv('LLM_CONTEXT_CACHE_TTL_SECONDS', '3600'))  # Backend prefix cache lifetime
+
+# Idempotency-Key support
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))  # How long a completed response is replayed
+IDEMPOTENCY_LOCK_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_TTL_SECONDS', '300'))  # Claim lifetime if a worker dies mid-request
+IDEMPOTENCY_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '30'))  # How long a retry waits for the original request
+IDEMPOTENCY_POLL_INTERVAL_MS = int(os.getenv('IDEMPOTENCY_POLL_INTERVAL_MS', '100'))
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv('IDEMPOTENCY_MAX_BODY_BYTES', str(10 * 1024 * 1024)))  # Larger responses are not stored
+
+# Background generation jobs
+JOB_BACKEND = os.getenv('JOB_BACKEND', 'redis').lower()  # 'redis' or 'memory' (single process, tests)
+JOB_CONCURRENCY = os.getenv('JOB_CONCURRENCY', 'story=4,quiz=4,audio=2')  # Worker tasks per job kind in each process
+JOB_TTL_SECONDS = int(os.getenv('JOB_TTL_SECONDS', '86400'))  # How long job status and results are kept
+JOB_POLL_INTERVAL_MS = int(os.getenv('JOB_POLL_INTERVAL_MS', '200'))  # Queue and status polling interval
+JOB_MAX_WAIT_SECONDS = int(os.getenv('JOB_MAX_WAIT_SECONDS', '30'))  # Longest long-poll on GET /jobs/{id}
+JOB_WEBHOOK_TIMEOUT_SECONDS = int(os.getenv('JOB_WEBHOOK_TIMEOUT_SECONDS', '10'))
+JOB_WEBHOOK_RETRIES = int(os.getenv('JOB_WEBHOOK_RETRIES', '2'))
+JOB_WEBHOOK_ALLOWED_HOSTS = os.getenv('JOB_WEBHOOK_ALLOWED_HOSTS', '')  # Comma-separated callback hosts; empty allows any host with only public addresses
+JOB_SHUTDOWN_GRACE_SECONDS = int(os.getenv('JOB_SHUTDOWN_GRACE_SECONDS', '20'))  # Time running jobs get to finish on shutdown
+JOB_RUNNING_TIMEOUT_SECONDS = int(os.getenv('JOB_RUNNING_TIMEOUT_SECONDS', '600'))  # Running jobs whose worker stops reporting for this long are requeued
+JOB_STATS_WINDOW_SECONDS = int(os.getenv('JOB_STATS_WINDOW_SECONDS', '300'))  # Window for throughput and latency in /jobs/stats
+
+# Admission control for generation endpoints
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+ADMISSION_STORY_CONCURRENCY = int(os.getenv('ADMISSION_STORY_CONCURRENCY', '16'))  # Concurrent story requests per worker
+ADMISSION_QUIZ_CONCURRENCY = int(os.getenv('ADMISSION_QUIZ_CONCURRENCY', '16'))
+ADMISSION_AUDIO_CONCURRENCY = int(os.getenv('ADMISSION_AUDIO_CONCURRENCY', '4'))
+ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', '64'))  # Waiting requests per endpoint group before 429s
+ADMISSION_MAX_QUEUED_PER_USER = int(os.getenv('ADMISSION_MAX_QUEUED_PER_USER', '4'))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', '10'))  # Queue deadline; longer expected waits are rejected up front
+
+# Text-to-speech synthesis
+TTS_MAX_CONCURRENCY = int(os.getenv('TTS_MAX_CONCURRENCY', '4'))  # Concurrent synthesize_speech calls per worker (stay under the API quota)
+TTS_CHUNK_RETRIES = int(os.getenv('TTS_CHUNK_RETRIES', '2'))  # Extra attempts for a chunk after a transient error
+TTS_RETRY_BACKOFF_MS = int(os.getenv('TTS_RETRY_BACKOFF_MS', '250'))  # Doubles with each retry
+TTS_VOICE_CACHE_TTL = int(os.getenv('TTS_VOICE_CACHE_TTL', '3600'))  # Voice catalog cache per language
+TTS_MAX_REQUEST_BYTES = int(os.getenv('TTS_MAX_REQUEST_BYTES', '5000'))  # API input limit per synthesize_speech call, in UTF-8 bytes (SSML markup included)
+TTS_SSML_SENTENCE_BREAK_MS = int(os.getenv('TTS_SSML_SENTENCE_BREAK_MS', '0'))  # Send SSML with a pause of this length between sentences (0 sends plain text)
+TTS_SCHEDULER_BACKEND = os.getenv('TTS_SCHEDULER_BACKEND', 'redis')  # 'redis' paces all workers together, 'memory' paces each worker on its own
+TTS_QUOTA_REQUESTS_PER_SECOND = float(os.getenv('TTS_QUOTA_REQUESTS_PER_SECOND', '15'))  # Shared synthesize_speech budget (0 disables)
+TTS_QUOTA_CHARACTERS_PER_MINUTE = int(os.getenv('TTS_QUOTA_CHARACTERS_PER_MINUTE', '135000'))  # Shared character budget (0 disables)
+TTS_QUOTA_BURST_SECONDS = float(os.getenv('TTS_QUOTA_BURST_SECONDS', '5'))  # Unused budget that can be saved up for a burst
+TTS_QUOTA_BACKGROUND_RESERVE = float(os.getenv('TTS_QUOTA_BACKGROUND_RESERVE', '0.3'))  # Share of the burst that background jobs leave for interactive requests
+TTS_QUOTA_MAX_WAIT_SECONDS = float(os.getenv('TTS_QUOTA_MAX_WAIT_SECONDS', '30'))  # Give up on a chunk that cannot get budget in time
+
+# Narration audio cache
+AUDIO_CACHE_ENABLED = os.getenv('AUDIO_CACHE_ENABLED', 'True').lower() == 'true'
+AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mlb_storyteller_audio'))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))  # Disk budget for the whole directory, shared by the workers using it
+AUDIO_CACHE_REDIS_MAX_ITEM_BYTES = int(os.getenv('AUDIO_CACHE_REDIS_MAX_ITEM_BYTES', str(256 * 1024)))  # Also keep narrations up to this size in Redis (0 disables)
+AUDIO_CACHE_REDIS_TTL = int(os.getenv('AUDIO_CACHE_REDIS_TTL', '86400'))
+AUDIO_CACHE_RESCAN_SECONDS = int(os.getenv('AUDIO_CACHE_RESCAN_SECONDS', '3600'))  # Recount the directory this often to correct the shared byte total
+TTS_SEGMENT_CACHE_ENABLED = os.getenv('TTS_SEGMENT_CACHE_ENABLED', 'False').lower() == 'true'  # Cache audio per segment too; new text then costs at least one TTS call per paragraph
+TTS_SEGMENT_MAX_CHARS = int(os.getenv('TTS_SEGMENT_MAX_CHARS', '600'))  # Sentences packed into one segment (and one TTS call)
+
+# Story history write-behind
+HISTORY_FLUSH_BATCH_SIZE = int(os.getenv('HISTORY_FLUSH_BATCH_SIZE', '100'))  # Records written by one insert_many
+HISTORY_FLUSH_INTERVAL_MS = int(os.getenv('HISTORY_FLUSH_INTERVAL_MS', '1000'))  # Longest a record waits before it is written
+HISTORY_MAX_BACKLOG = int(os.getenv('HISTORY_MAX_BACKLOG', '10000'))  # Records buffered per worker; newer ones are dropped beyond this
+HISTORY_RETRY_MAX_DELAY_SECONDS = float(os.getenv('HISTORY_RETRY_MAX_DELAY_SECONDS', '30'))  # Retries back off exponentially up to this while MongoDB is failing
+HISTORY_SHUTDOWN_GRACE_SECONDS = int(os.getenv('HISTORY_SHUTDOWN_GRACE_SECONDS', '10'))  # Time the final flush gets on shutdown
+
+# Popularity counters
+POPULARITY_CACHE_TTL_SECONDS = int(os.getenv('POPULARITY_CACHE_TTL_SECONDS', '30'))  # How long top-N results are served from Redis
+POPULARITY_RECONCILE_INTERVAL_SECONDS = int(os.getenv('POPULARITY_RECONCILE_INTERVAL_SECONDS', '3600'))  # How often one worker recounts favorites to fix drift (0 disables)
+
 # Application Settings
 NARRATIVE_STYLES = {
     'dramatic': {
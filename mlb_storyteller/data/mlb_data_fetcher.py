@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Union
 import os
 from dotenv import load_dotenv
 from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import LIVE_GAME_DATA_CACHE_TTL
 import json
 import time
 from requests.adapters import HTTPAdapter
@@ -135,8 +136,10 @@ class MLBDataFetcher:
             # Process the raw game data
             processed_data = self._process_game_data(game_data)
             
-            # Cache the processed data
-            await self.cache.set_game_data(game_pk, processed_data)
+            # Cache the processed data; games that are not final change every
+            # few pitches, so live refreshes must not be served an hour-old feed
+            final = processed_data.get('game_state', {}).get('abstract_state') == 'Final'
+            await self.cache.set_game_data(game_pk, processed_data, expire=None if final else LIVE_GAME_DATA_CACHE_TTL)
             
             return processed_data
             
@@ -191,8 +194,9 @@ class MLBDataFetcher:
             return None
 
     def _extract_player_info(self, player: Dict) -> Dict:
-        """Extract relevant player information from roster data."""
-        person = player.get("person", {})
+        """Extract relevant player information from roster data (or a flat {id, fullName} reference)."""
+        # Roster entries nest the person; play matchups and runners reference it directly
+        person = player.get("person") or player
         position = player.get("position", {})
         stats = player.get("stats", [{}])[0].get("splits", [{}])[0].get("stat", {})
         
@@ -347,8 +351,11 @@ class MLBDataFetcher:
             game_info = raw_data.get('gameData', {})
             plays = raw_data.get('liveData', {}).get('plays', {})
             
-            # Core Game Data
+            # Core Game Data; game_pk and data_version (the feed's update
+            # timestamp) identify this version of the data cheaply
             game_data = {
+                'game_pk': raw_data.get('gamePk') or game_info.get('game', {}).get('pk'),
+                'data_version': raw_data.get('metaData', {}).get('timeStamp'),
                 'summary': {
                 'home_team': game_info.get('teams', {}).get('home', {}).get('name'),
                 'away_team': game_info.get('teams', {}).get('away', {}).get('name'),
@@ -424,10 +431,10 @@ class MLBDataFetcher:
             if game_info.get('status', {}).get('abstractGameState') == 'Final':
                 decisions = raw_data.get('liveData', {}).get('decisions', {})
                 game_data['result'] = {
-                    'winner': self._determine_winner(linescore.get('teams', {})),
-                    'winning_pitcher': self._extract_player_info(decisions.get('winner', {})),
-                    'losing_pitcher': self._extract_player_info(decisions.get('loser', {})),
-                    'save': self._extract_player_info(decisions.get('save', {})) if decisions.get('save') else None,
+                    'winner': self._determine_winner(game_data['summary']),
+                    'winning_pitcher': self._extract_decision_pitcher(decisions.get('winner')),
+                    'losing_pitcher': self._extract_decision_pitcher(decisions.get('loser')),
+                    'save': self._extract_decision_pitcher(decisions.get('save')),
                     'winning_margin': abs(game_data['summary']['home_score'] - game_data['summary']['away_score']),
                     'duration': game_info.get('gameInfo', {}).get('gameDurationMinutes')
                 }
@@ -667,17 +674,23 @@ class MLBDataFetcher:
         """Format player name for narrative purposes."""
         return player.get('fullName', 'Unknown player')
 
-    def _determine_winner(self, teams: Dict) -> str:
-        """Determine the winning team name."""
-        if not teams:
+    def _determine_winner(self, summary: Dict) -> str:
+        """Determine the winning team name from the processed game summary."""
+        if not summary:
             return "Unknown"
-            
-        home_score = teams.get('home', {}).get('runs', 0)
-        away_score = teams.get('away', {}).get('runs', 0)
-        
-        if home_score > away_score:
-            return teams.get('home', {}).get('team', {}).get('name', 'Home Team')
-        return teams.get('away', {}).get('team', {}).get('name', 'Away Team')
+
+        if summary.get('home_score', 0) > summary.get('away_score', 0):
+            return summary.get('home_team') or 'Home Team'
+        return summary.get('away_team') or 'Away Team'
+
+    def _extract_decision_pitcher(self, pitcher: Optional[Dict]) -> Optional[Dict]:
+        """Extract a pitcher from liveData.decisions, whose entries carry id and fullName directly."""
+        if not pitcher or not pitcher.get('fullName'):
+            return None
+        return {
+            "id": pitcher.get("id"),
+            "fullName": pitcher.get("fullName")
+        }
 
     def _process_player_stats(self, stats_data: Dict) -> Dict:
         """Process player statistics data."""
@@ -0,0 +1 @@
+"""Background generation jobs package."""
@@ -0,0 +1,57 @@
+import base64
+from typing import Dict
+
+from mlb_storyteller.api.dependencies import get_text_to_speech_service
+from mlb_storyteller.data.mlb_data_fetcher import MLBDataFetcher
+from mlb_storyteller.services.audio_assembly import AUDIO_FORMATS, DEFAULT_AUDIO_FORMAT
+from mlb_storyteller.story_engine.story_generator import StoryGenerator
+
+
+async def _fetch_game(game_id: str) -> Dict:
+    game_data = await MLBDataFetcher().get_game_data(game_id)
+    if not game_data:
+        raise ValueError(f"Game ID {game_id} not found")
+    return game_data
+
+
+async def story_job(params: Dict) -> Dict:
+    """Generate the full LLM story for a game (params: game_id, preferences)."""
+    preferences = params.get('preferences') or {}
+    game_data = await _fetch_game(params['game_id'])
+    story = await StoryGenerator().generate_story(game_data, preferences, preferences.get('style', 'dramatic'))
+    return {'story': story}
+
+
+async def quiz_job(params: Dict) -> Dict:
+    """Generate a quiz for a game (params: game_id, preferences)."""
+    game_data = await _fetch_game(params['game_id'])
+    quiz = await StoryGenerator().generate_quiz(game_data, params.get('preferences') or {})
+    quiz['game_data'] = {'summary': game_data.get('summary', {})}
+    return quiz
+
+
+async def audio_job(params: Dict) -> Dict:
+    """Synthesize narration audio (params: the /audio/generate-audio request fields)."""
+    audio_format = params.get('audio_format') or DEFAULT_AUDIO_FORMAT
+    audio_content = await get_text_to_speech_service().generate_long_audio(
+        text=params['text'],
+        voice_id=params['voice'],
+        language_code=params.get('language_code') or "en-US",
+        speaking_rate=params.get('speaking_rate') or 1.0,
+        pitch=params.get('pitch') or 0.0,
+        audio_format=audio_format,
+    )
+    if not audio_content:
+        raise ValueError("No audio content generated")
+    return {
+        'media_type': AUDIO_FORMATS[audio_format]['media_type'],
+        'extension': AUDIO_FORMATS[audio_format]['extension'],
+        'audio': base64.b64encode(audio_content).decode('ascii'),
+    }
+
+
+JOB_HANDLERS = {
+    'story': story_job,
+    'quiz': quiz_job,
+    'audio': audio_job,
+}
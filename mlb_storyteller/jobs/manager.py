@@ -0,0 +1,396 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from mlb_storyteller.config import (
+    CACHE_ENABLED,
+    JOB_BACKEND,
+    JOB_CONCURRENCY,
+    JOB_POLL_INTERVAL_MS,
+    JOB_WEBHOOK_TIMEOUT_SECONDS,
+    JOB_WEBHOOK_RETRIES,
+    JOB_WEBHOOK_ALLOWED_HOSTS,
+    JOB_SHUTDOWN_GRACE_SECONDS,
+    JOB_RUNNING_TIMEOUT_SECONDS,
+    JOB_STATS_WINDOW_SECONDS,
+)
+from mlb_storyteller.jobs.handlers import JOB_HANDLERS
+from mlb_storyteller.jobs.store import Job, InMemoryJobStore, RedisJobStore, PRIORITIES
+from mlb_storyteller.monitoring.llm_metrics import llm_endpoint
+from mlb_storyteller.services.tts_scheduler import tts_priority
+from mlb_storyteller.monitoring.metrics import metrics, log_event
+
+JobHandler = Callable[[Dict], Awaitable[Dict]]
+
+metrics.describe("jobs_submitted_total", "Background jobs submitted by kind and priority")
+metrics.describe("jobs_finished_total", "Background jobs finished by kind and outcome")
+metrics.describe("job_queue_wait_seconds", "Time from job submission to a worker starting it")
+metrics.describe("job_run_seconds", "Time a worker spent running a job")
+metrics.describe("jobs_running", "Jobs currently running in this process")
+metrics.describe("job_webhook_deliveries_total", "Job completion webhooks by outcome")
+metrics.describe("jobs_requeued_total", "Running jobs put back on the queue after their worker stopped reporting")
+
+WEBHOOK_ALLOWED_HOSTS = {host.strip().lower() for host in JOB_WEBHOOK_ALLOWED_HOSTS.split(',') if host.strip()}
+
+
+def parse_concurrency(spec: str) -> Dict[str, int]:
+    """Parse a 'kind=count,kind=count' concurrency spec."""
+    concurrency = {}
+    for part in spec.split(','):
+        kind, _, count = part.partition('=')
+        if kind.strip() and count.strip():
+            concurrency[kind.strip()] = max(1, int(count))
+    return concurrency
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not private, loopback, link-local, reserved or multicast)."""
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_callback_url(url: str):
+    """
+    Reject callback URLs that could make workers POST to internal services.
+
+    With JOB_WEBHOOK_ALLOWED_HOSTS set, only those hosts are accepted.
+    Otherwise every address the host resolves to must be public.
+
+    Raises:
+        ValueError: If the URL must not be called back
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError("Callback URL must be an http(s) URL")
+    host = parts.hostname.lower()
+    if WEBHOOK_ALLOWED_HOSTS:
+        if host not in WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError("Callback URL host is not allowed")
+        return
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(host, parts.port or 0, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise ValueError("Callback URL host does not resolve")
+    if not addresses or not all(is_public_address(address[4][0]) for address in addresses):
+        raise ValueError("Callback URL must resolve to a public address")
+
+
+class PublicResolver(aiohttp.ThreadedResolver):
+    """Resolver for webhook delivery that refuses non-public addresses.
+
+    Checking the URL at submit time is not enough on its own: the host's DNS
+    can be changed to point at an internal address before the job finishes.
+    """
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET):
+        hosts = await super().resolve(host, port, family)
+        if host.lower() not in WEBHOOK_ALLOWED_HOSTS and not all(is_public_address(entry['host']) for entry in hosts):
+            raise OSError(f"Callback host {host} resolves to a non-public address")
+        return hosts
+
+
+class JobManager:
+    """Run generation work in background workers instead of inside HTTP requests.
+
+    ``submit`` records a job and returns immediately; clients poll ``get`` /
+    ``wait`` or pass a callback URL that receives the finished job. Each job
+    kind has its own queue and its own fixed number of worker tasks per
+    process (JOB_CONCURRENCY), so a burst of slow audio jobs cannot starve
+    stories. Within a kind, higher priority jobs run first and jobs of equal
+    priority run in submission order.
+
+    With the Redis store, every worker process pulls from the same queues;
+    the in-memory store is for single-process use and tests. Jobs that are
+    still running when the process shuts down are put back on the queue.
+    Each process also heartbeats its running jobs, and any process puts a
+    job back on the queue once it has gone ``running_timeout`` seconds
+    without one (its process was killed or lost its connection).
+    """
+
+    def __init__(
+        self,
+        store=None,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        running_timeout: float = JOB_RUNNING_TIMEOUT_SECONDS
+    ):
+        """
+        Initialize the job manager.
+
+        Args:
+            store: InMemoryJobStore or RedisJobStore (chosen from JOB_BACKEND by default)
+            handlers: Coroutine per job kind taking the job params and returning its result
+            concurrency: Worker tasks per job kind (JOB_CONCURRENCY by default)
+            running_timeout: Seconds without a heartbeat before a running job is requeued
+        """
+        if store is None:
+            store = RedisJobStore() if JOB_BACKEND == 'redis' and CACHE_ENABLED else InMemoryJobStore()
+        self.store = store
+        self.handlers: Dict[str, JobHandler] = dict(handlers or {})
+        self.concurrency = concurrency or parse_concurrency(JOB_CONCURRENCY)
+        self.running_timeout = running_timeout
+        self._workers: List[asyncio.Task] = []
+        self._watcher: Optional[asyncio.Task] = None
+        self._webhooks: Set[asyncio.Task] = set()
+        self._running: Dict[str, Job] = {}
+        self._stopping = False
+        # (finished_at, kind, queue seconds, run seconds, succeeded) for /jobs/stats
+        self._recent: Deque[Tuple[float, str, float, float, bool]] = deque()
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of a kind."""
+        self.handlers[kind] = handler
+
+    async def submit(
+        self,
+        kind: str,
+        params: Dict,
+        priority: str = "normal",
+        callback_url: Optional[str] = None
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind: Registered job kind (story, quiz, audio)
+            params: Handler parameters
+            priority: high, normal or low
+            callback_url: Optional URL that is POSTed the finished job
+
+        Returns:
+            Job: The queued job
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Priority must be one of: {', '.join(PRIORITIES)}")
+        if callback_url:
+            await check_callback_url(callback_url)
+
+        job = Job(kind, params, priority, callback_url)
+        await self.store.save(job)
+        await self.store.enqueue(job)
+        metrics.inc("jobs_submitted_total", {"kind": kind, "priority": priority})
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job's current status."""
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Get a job once it has finished, or its current status after timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.store.get(job_id)
+            if job is None or job.done or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(JOB_POLL_INTERVAL_MS / 1000)
+
+    def start(self):
+        """Start the worker tasks for every registered kind."""
+        if self._workers:
+            return
+        self._stopping = False
+        for kind in self.handlers:
+            for _ in range(self.concurrency.get(kind, 1)):
+                self._workers.append(asyncio.create_task(self._worker(kind)))
+        self._watcher = asyncio.create_task(self._watch_running())
+        print(f"Started job workers ({self.store.name} store): "
+              + ", ".join(f"{kind}={self.concurrency.get(kind, 1)}" for kind in self.handlers))
+
+    async def stop(self):
+        """Stop taking jobs, give running ones time to finish, then requeue the rest."""
+        self._stopping = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        if self._workers:
+            _, pending = await asyncio.wait(self._workers, timeout=JOB_SHUTDOWN_GRACE_SECONDS)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._workers = []
+        if self._webhooks:
+            await asyncio.wait(self._webhooks, timeout=JOB_WEBHOOK_TIMEOUT_SECONDS)
+
+    async def requeue_stale(self) -> int:
+        """
+        Heartbeat this process's running jobs, then requeue running jobs that have gone quiet.
+
+        Returns:
+            int: Jobs put back on the queue
+        """
+        now = time.time()
+        for job_id in list(self._running):
+            await self.store.heartbeat(job_id, now)
+
+        requeued = 0
+        for job_id in await self.store.stale_running(now - self.running_timeout):
+            # Only the process that removes the entry requeues the job
+            if job_id in self._running or not await self.store.release_running(job_id):
+                continue
+            job = await self.store.get(job_id)
+            if job is None or job.status != Job.RUNNING:
+                continue
+            job.status = Job.QUEUED
+            job.started_at = None
+            await self.store.save(job)
+            await self.store.enqueue(job)
+            metrics.inc("jobs_requeued_total", {"kind": job.kind})
+            print(f"Requeued job {job.id} ({job.kind}): no heartbeat for {self.running_timeout:g}s")
+            requeued += 1
+        return requeued
+
+    async def _watch_running(self):
+        while True:
+            try:
+                await self.requeue_stale()
+            except Exception as e:
+                print(f"Checking for stale jobs failed: {str(e)}")
+            # Heartbeats must land well within the timeout
+            await asyncio.sleep(max(1.0, self.running_timeout / 4))
+
+    async def stats(self) -> Dict:
+        """
+        Queue depth, running jobs, throughput and latency per kind.
+
+        Throughput and latency cover jobs this process finished within the
+        last JOB_STATS_WINDOW_SECONDS.
+        """
+        cutoff = time.time() - JOB_STATS_WINDOW_SECONDS
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+        kinds = {}
+        for kind in self.handlers:
+            finished = [entry for entry in self._recent if entry[1] == kind]
+            queue_waits = sorted(entry[2] for entry in finished)
+            run_times = sorted(entry[3] for entry in finished)
+            kinds[kind] = {
+                'queued': await self.store.queued(kind),
+                'running': sum(1 for job in self._running.values() if job.kind == kind),
+                'workers': self.concurrency.get(kind, 1),
+                'finished': len(finished),
+                'failed': sum(1 for entry in finished if not entry[4]),
+                'throughput_per_minute': round(len(finished) * 60 / JOB_STATS_WINDOW_SECONDS, 2),
+                'queue_wait_p50_seconds': self._percentile(queue_waits, 0.5),
+                'queue_wait_p95_seconds': self._percentile(queue_waits, 0.95),
+                'run_p50_seconds': self._percentile(run_times, 0.5),
+                'run_p95_seconds': self._percentile(run_times, 0.95),
+            }
+        return {'store': self.store.name, 'window_seconds': JOB_STATS_WINDOW_SECONDS, 'kinds': kinds}
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> Optional[float]:
+        if not values:
+            return None
+        return round(values[min(len(values) - 1, int(fraction * len(values)))], 3)
+
+    async def _worker(self, kind: str):
+        while not self._stopping:
+            try:
+                job_id = await self.store.dequeue(kind, timeout=1.0)
+                if job_id is None:
+                    continue
+                job = await self.store.get(job_id)
+                if job is None or job.status != Job.QUEUED:
+                    # Expired, or already picked up before a requeue
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job worker for {kind} failed: {str(e)}")
+                await asyncio.sleep(JOB_POLL_INTERVAL_MS / 1000)
+
+    async def _run(self, job: Job):
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        await self.store.save(job)
+        self._running[job.id] = job
+        labels = {"kind": job.kind}
+        metrics.set_gauge("jobs_running", sum(1 for running in self._running.values() if running.kind == job.kind), labels)
+        metrics.observe("job_queue_wait_seconds", job.queue_seconds, labels)
+        llm_endpoint.set(f"job:{job.kind}")
+        tts_priority.set("background")
+
+        try:
+            job.result = await self.handlers[job.kind](job.params)
+            job.status = Job.SUCCEEDED
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to another worker process
+            job.status = Job.QUEUED
+            job.started_at = None
+            await self.store.save(job)
+            await self.store.enqueue(job)
+            raise
+        except Exception as e:
+            job.status = Job.FAILED
+            job.error = str(e)
+        finally:
+            self._running.pop(job.id, None)
+            metrics.set_gauge("jobs_running", sum(1 for running in self._running.values() if running.kind == job.kind), labels)
+
+        job.finished_at = time.time()
+        await self.store.save(job)
+
+        succeeded = job.status == Job.SUCCEEDED
+        metrics.inc("jobs_finished_total", {**labels, "outcome": "ok" if succeeded else "error"})
+        metrics.observe("job_run_seconds", job.run_seconds, labels)
+        self._recent.append((job.finished_at, job.kind, job.queue_seconds, job.run_seconds, succeeded))
+        log_event(
+            "job_finished",
+            job_id=job.id,
+            kind=job.kind,
+            priority=job.priority,
+            outcome="ok" if succeeded else "error",
+            error=job.error,
+            queue_wait_ms=round(job.queue_seconds * 1000, 1),
+            run_ms=round(job.run_seconds * 1000, 1),
+        )
+
+        if job.callback_url:
+            task = asyncio.create_task(self._deliver_webhook(job))
+            self._webhooks.add(task)
+            task.add_done_callback(self._webhooks.discard)
+
+    async def _deliver_webhook(self, job: Job):
+        """POST the finished job to its callback URL, retrying with backoff."""
+        try:
+            # Checked again in case the host was re-pointed since submit
+            await check_callback_url(job.callback_url)
+        except ValueError as e:
+            metrics.inc("job_webhook_deliveries_total", {"outcome": "rejected"})
+            print(f"Not delivering webhook for job {job.id}: {str(e)}")
+            return
+
+        timeout = aiohttp.ClientTimeout(total=JOB_WEBHOOK_TIMEOUT_SECONDS)
+        for attempt in range(JOB_WEBHOOK_RETRIES + 1):
+            try:
+                connector = aiohttp.TCPConnector(resolver=PublicResolver())
+                async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+                    async with session.post(job.callback_url, json=job.to_dict(), allow_redirects=False) as response:
+                        if response.status < 400:
+                            metrics.inc("job_webhook_deliveries_total", {"outcome": "ok"})
+                            return
+                        error = f"HTTP {response.status}"
+            except Exception as e:
+                error = str(e)
+            if attempt < JOB_WEBHOOK_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+        metrics.inc("job_webhook_deliveries_total", {"outcome": "error"})
+        print(f"Failed to deliver webhook for job {job.id}: {error}")
+
+
+@lru_cache()
+def get_job_manager() -> JobManager:
+    """Get the worker-wide job manager with the story, quiz and audio handlers registered."""
+    return JobManager(handlers=JOB_HANDLERS)
@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import JOB_TTL_SECONDS, JOB_POLL_INTERVAL_MS
+
+
+# Lower value runs first
+PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+
+
+class Job:
+    """One unit of background work and its current status.
+
+    Status moves from ``queued`` to ``running`` to ``succeeded`` or
+    ``failed``. Timestamps are Unix times so queue and run latency can be
+    computed by any worker.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        kind: str,
+        params: Dict,
+        priority: str = "normal",
+        callback_url: Optional[str] = None,
+        job_id: Optional[str] = None
+    ):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.callback_url = callback_url
+        self.status = self.QUEUED
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        return self.started_at - self.created_at if self.started_at else None
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        return self.finished_at - self.started_at if self.started_at and self.finished_at else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'priority': self.priority,
+            'callback_url': self.callback_url,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Job":
+        job = cls(data['kind'], data.get('params') or {}, data.get('priority', 'normal'),
+                  data.get('callback_url'), job_id=data['id'])
+        job.status = data.get('status', cls.QUEUED)
+        job.result = data.get('result')
+        job.error = data.get('error')
+        job.created_at = data.get('created_at', job.created_at)
+        job.started_at = data.get('started_at')
+        job.finished_at = data.get('finished_at')
+        return job
+
+
+class InMemoryJobStore:
+    """Job records and per-kind priority queues held in this process.
+
+    Only suitable for a single worker process and for tests: a job submitted
+    here cannot be seen or run by other processes.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        """Initialize the store."""
+        self._jobs: Dict[str, Tuple[Dict, float]] = {}
+        self._queues: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._sequence = itertools.count()
+        self._available: Dict[str, asyncio.Event] = {}
+        # Running job ID -> last heartbeat (Unix time)
+        self._running: Dict[str, float] = {}
+
+    async def save(self, job: Job):
+        """Create or update a job record."""
+        self._jobs[job.id] = (job.to_dict(), time.monotonic() + JOB_TTL_SECONDS)
+        if job.status == Job.RUNNING:
+            self._running.setdefault(job.id, job.started_at or time.time())
+        else:
+            self._running.pop(job.id, None)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Load a job record, or None if it is unknown or expired."""
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._jobs[job_id]
+            return None
+        return Job.from_dict(data)
+
+    async def enqueue(self, job: Job):
+        """Queue a saved job behind others of the same kind and priority."""
+        heapq.heappush(
+            self._queues.setdefault(job.kind, []),
+            (PRIORITIES.get(job.priority, PRIORITIES['normal']), next(self._sequence), job.id)
+        )
+        self._event(job.kind).set()
+
+    async def dequeue(self, kind: str, timeout: float) -> Optional[str]:
+        """Take the next job ID of a kind, waiting up to timeout seconds for one."""
+        queue = self._queues.setdefault(kind, [])
+        if not queue:
+            event = self._event(kind)
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+            if not queue:
+                return None
+        return heapq.heappop(queue)[2]
+
+    async def queued(self, kind: str) -> int:
+        """Number of jobs of a kind waiting to run."""
+        return len(self._queues.get(kind, []))
+
+    async def heartbeat(self, job_id: str, at: float):
+        """Record that a running job's worker is still alive."""
+        self._running[job_id] = at
+
+    async def stale_running(self, before: float) -> List[str]:
+        """IDs of running jobs with no heartbeat since the given Unix time."""
+        return [job_id for job_id, at in self._running.items() if at <= before]
+
+    async def release_running(self, job_id: str) -> bool:
+        """Stop tracking a running job; True only for the caller that removed it."""
+        return self._running.pop(job_id, None) is not None
+
+    def _event(self, kind: str) -> asyncio.Event:
+        if kind not in self._available:
+            self._available[kind] = asyncio.Event()
+        return self._available[kind]
+
+
+class RedisJobStore:
+    """Job records and per-kind priority queues shared through Redis.
+
+    Each kind has a sorted set scored by priority and then submission time,
+    so ZPOPMIN hands every worker process the most urgent, oldest job.
+    Records are JSON values that expire after JOB_TTL_SECONDS. Running jobs
+    are also kept in a sorted set scored by their last heartbeat, so any
+    worker can find jobs whose process died mid-run.
+    """
+
+    name = "redis"
+
+    # Keeps submission order within a priority band (ms timestamps fit well below this)
+    PRIORITY_SCALE = 10 ** 14
+
+    def __init__(self, redis_service: Optional[RedisService] = None):
+        """Initialize the store."""
+        self.redis = redis_service or RedisService()
+
+    RUNNING_KEY = "jobs:running"
+
+    async def save(self, job: Job):
+        """Create or update a job record."""
+        await self.redis.set(f"job:{job.id}", job.to_dict(), expire=JOB_TTL_SECONDS)
+        if job.status == Job.RUNNING:
+            await self.redis.sorted_set_add(self.RUNNING_KEY, job.id, job.started_at or time.time())
+        else:
+            await self.redis.sorted_set_remove(self.RUNNING_KEY, job.id)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Load a job record, or None if it is unknown or expired."""
+        data = await self.redis.get(f"job:{job_id}")
+        return Job.from_dict(data) if data else None
+
+    async def enqueue(self, job: Job):
+        """Queue a saved job behind others of the same kind and priority."""
+        score = PRIORITIES.get(job.priority, PRIORITIES['normal']) * self.PRIORITY_SCALE + int(job.created_at * 1000)
+        await self.redis.sorted_set_add(f"jobs:queue:{job.kind}", job.id, score)
+
+    async def dequeue(self, kind: str, timeout: float) -> Optional[str]:
+        """Take the next job ID of a kind, polling up to timeout seconds for one."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job_id = await self.redis.sorted_set_pop_min(f"jobs:queue:{kind}")
+            if job_id is not None or time.monotonic() >= deadline:
+                return job_id
+            await asyncio.sleep(JOB_POLL_INTERVAL_MS / 1000)
+
+    async def queued(self, kind: str) -> int:
+        """Number of jobs of a kind waiting to run."""
+        return await self.redis.sorted_set_count(f"jobs:queue:{kind}")
+
+    async def heartbeat(self, job_id: str, at: float):
+        """Record that a running job's worker is still alive."""
+        await self.redis.sorted_set_add(self.RUNNING_KEY, job_id, at)
+
+    async def stale_running(self, before: float) -> List[str]:
+        """IDs of running jobs with no heartbeat since the given Unix time."""
+        return await self.redis.sorted_set_range_by_score(self.RUNNING_KEY, before)
+
+    async def release_running(self, job_id: str) -> bool:
+        """Stop tracking a running job; True only for the worker that removed it."""
+        return await self.redis.sorted_set_remove(self.RUNNING_KEY, job_id)
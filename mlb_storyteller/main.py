@@ -1,16 +1,38 @@
-from fastapi import FastAPI, HTTPException, Request, Body
+from fastapi import FastAPI, HTTPException, Request, Body, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from mlb_storyteller.api.routes import audio
+from mlb_storyteller.api.dependencies import get_text_to_speech_service
+from mlb_storyteller.api.admission import AdmissionRejected, get_admission_controller
 from mlb_storyteller.data.mlb_data_fetcher import MLBDataFetcher
 from mlb_storyteller.story_engine.story_generator import StoryGenerator
+from mlb_storyteller.story_engine.template_narrator import TemplateNarrator
+from mlb_storyteller.config import (
+    STORY_FALLBACK_ENABLED,
+    STORY_FALLBACK_QUEUE_WAIT_MS,
+    QUIZ_BATCH_MAX_REQUEST_GAMES,
+    JOB_MAX_WAIT_SECONDS,
+    ADMISSION_ENABLED,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+from mlb_storyteller.monitoring.llm_metrics import llm_endpoint
 from mlb_storyteller.cache.redis_service import RedisService
-from mlb_storyteller.preferences.db_service import DatabaseService
+from mlb_storyteller.cache.idempotency import get_idempotency_store
+from mlb_storyteller.jobs.manager import get_job_manager
+from mlb_storyteller.services.audio_assembly import AUDIO_FORMATS
+from mlb_storyteller.services.tts_scheduler import QuotaWaitExceeded
+from mlb_storyteller.preferences.db_service import get_database_service, close_mongo_client
+from mlb_storyteller.preferences.history_writer import get_story_history_writer
+from mlb_storyteller.preferences.popularity import get_popularity_service
 from mlb_storyteller.preferences.models import UserPreferencesDB, UserStoryHistory
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 import uvicorn
+import asyncio
+import base64
+import json
 import os
+import time
 from dotenv import load_dotenv
 from typing import List, Optional, Dict
 from datetime import datetime
@@ -33,6 +55,44 @@ class StoryRequest(BaseModel):
     game_id: str
     preferences: dict
 
+class NarratedStoryRequest(StoryRequest):
+    voice: str = Field(..., description="The voice ID to use (e.g., 'en-US-Neural2-D')")
+    language_code: Optional[str] = "en-US"
+    speaking_rate: Optional[float] = Field(1.0, ge=0.25, le=4.0)
+    pitch: Optional[float] = Field(0.0, ge=-20.0, le=20.0)
+    audio_format: Optional[str] = Field(None, pattern="^(mp3|ogg_opus)$")
+
+class StoryBatchRequest(BaseModel):
+    game_id: str
+    preferences: dict
+    styles: List[str]
+
+class QuizBatchRequest(BaseModel):
+    game_ids: List[str]
+    preferences: dict = {}
+
+class JobRequest(BaseModel):
+    kind: str
+    params: dict
+    priority: str = "normal"
+    callback_url: Optional[str] = None
+
+# Narrative styles offered to users
+STORY_STYLES = ["dramatic", "analytical", "casual", "humorous"]
+
+# Request model that validates the params of each background job kind
+JOB_PARAM_MODELS = {
+    "story": StoryRequest,
+    "quiz": StoryRequest,
+    "audio": audio.TextToSpeechRequest,
+}
+
+async def run_idempotent(scope: str, idempotency_key: Optional[str], payload: Dict, handler):
+    """Run a generation handler, replaying the stored response for a repeated Idempotency-Key."""
+    if idempotency_key is None:
+        return await handler()
+    return await get_idempotency_store().run(scope, idempotency_key, payload, handler)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="MLB Storyteller",
@@ -51,6 +111,59 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Admission control for LLM- and TTS-bound endpoints. Registered before the
+# header middleware so 429 responses still get the CORS headers.
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    gate = get_admission_controller().gate_for(request.method, request.url.path) if ADMISSION_ENABLED else None
+    if gate is None:
+        return await call_next(request)
+
+    user = (
+        request.query_params.get("user_id")
+        or request.headers.get("X-User-Id")
+        or (request.client.host if request.client else "anonymous")
+    )
+    try:
+        waited = await gate.acquire(user)
+    except AdmissionRejected as e:
+        metrics.inc("admission_requests_total", {"endpoint": gate.name, "outcome": "rejected"})
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    metrics.inc("admission_requests_total", {"endpoint": gate.name, "outcome": "admitted"})
+    metrics.observe("admission_wait_seconds", waited, {"endpoint": gate.name})
+
+    start = time.perf_counter()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            gate.release(time.perf_counter() - start)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        release()
+        raise
+
+    # Hold the slot until the body has been sent, so streaming responses count too
+    body_iterator = response.body_iterator
+
+    async def body_then_release():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            release()
+
+    response.body_iterator = body_then_release()
+    return response
+
 # Add custom middleware for additional headers
 @app.middleware("http")
 async def add_cors_headers(request: Request, call_next):
@@ -171,23 +284,28 @@ async def get_api_info():
         "description": "An AI-powered baseball storytelling platform"
     }
 
+@app.get("/admission")
+async def get_admission_status():
+    """Current load of each admission-controlled endpoint group in this worker."""
+    return get_admission_controller().snapshot()
+
+@app.get("/metrics")
+async def get_metrics(format: str = "prometheus"):
+    """Expose this worker's metrics in Prometheus text format (or JSON with ?format=json)."""
+    if format == "json":
+        return metrics.snapshot()
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/styles")
 async def get_available_styles():
     """Get available storytelling styles."""
-    return {
-        "styles": [
-            "dramatic",
-            "analytical",
-            "casual",
-            "humorous"
-        ]
-    }
+    return {"styles": STORY_STYLES}
 
 @app.post("/users/{user_id}/preferences")
 async def create_user_preferences(user_id: str, preferences: UserPreferences):
     """Create or update user preferences."""
     try:
-        db_service = DatabaseService()
+        db_service = get_database_service()
         # Convert to UserPreferencesDB model
         db_preferences = UserPreferencesDB(
             user_id=user_id,
@@ -206,7 +324,7 @@ async def create_user_preferences(user_id: str, preferences: UserPreferences):
 async def get_user_preferences(user_id: str):
     """Get user preferences."""
     try:
-        db_service = DatabaseService()
+        db_service = get_database_service()
         preferences = await db_service.get_user_preferences(user_id)
         if not preferences:
             raise HTTPException(status_code=404, detail="User preferences not found")
@@ -218,7 +336,7 @@ async def get_user_preferences(user_id: str):
 async def get_user_history(user_id: str):
     """Get user's story generation history."""
     try:
-        db_service = DatabaseService()
+        db_service = get_database_service()
         # Ensure user_id is valid before querying
         if not user_id:
             raise HTTPException(status_code=400, detail="Invalid user ID")
@@ -241,16 +359,37 @@ async def get_user_history(user_id: str):
 async def get_popular_teams():
     """Get popular teams based on user preferences."""
     try:
-        db_service = DatabaseService()
-        teams = await db_service.get_popular_teams()
+        teams = await get_popularity_service().popular("team")
         return {"teams": teams or []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/stats/popular-players")
+async def get_popular_players():
+    """Get popular players based on user preferences."""
+    try:
+        players = await get_popularity_service().popular("player")
+        return {"players": players or []}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Update the generate-story endpoint to match test requirements
 @app.post("/generate-story")
-async def generate_story(story_request: StoryRequest, user_id: Optional[str] = None):
+async def generate_story(
+    story_request: StoryRequest,
+    user_id: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """Generate a story for a game with user preferences."""
+    llm_endpoint.set("/generate-story")
+    return await run_idempotent(
+        "generate-story",
+        idempotency_key,
+        {**story_request.model_dump(), 'user_id': user_id},
+        lambda: _generate_story(story_request, user_id)
+    )
+
+async def _generate_story(story_request: StoryRequest, user_id: Optional[str]) -> JSONResponse:
     try:
         story_generator = StoryGenerator()
         mlb_service = MLBDataFetcher()
@@ -265,25 +404,43 @@ async def generate_story(story_request: StoryRequest, user_id: Optional[str] = N
             if not game_data:
                 raise HTTPException(status_code=404, detail=f"Game ID {story_request.game_id} not found")
             
-            # Generate story
-            story = await story_generator.generate_story(game_data, story_request.preferences)
+            # Generate story, falling back to the template narrative when the
+            # LLM queue is saturated or generation fails
+            style = story_request.preferences.get('style', 'dramatic')
+            story_source = "llm"
+            if STORY_FALLBACK_ENABLED:
+                try:
+                    story = await story_generator.generate_story(
+                        game_data,
+                        story_request.preferences,
+                        style,
+                        max_queue_wait=STORY_FALLBACK_QUEUE_WAIT_MS / 1000
+                    )
+                except Exception as e:
+                    print(f"Using template narrative for game {story_request.game_id}: {str(e)}")
+                    story = TemplateNarrator().render(game_data, style)
+                    story_source = "template"
+            else:
+                story = await story_generator.generate_story(game_data, story_request.preferences, style)
             
-            # Save to user history if user_id provided
+            # Save to user history if user_id provided; written in the background
+            # so the response does not wait on MongoDB
             if user_id:
                 try:
-                    db_service = DatabaseService()
                     history_entry = UserStoryHistory(
                         user_id=user_id,
                         game_id=story_request.game_id,
-                        story=story,
+                        narrative_style=style,
                         generated_at=datetime.utcnow()
                     )
-                    await db_service.add_story_history(history_entry)
+                    get_story_history_writer().add(history_entry)
                 except Exception as e:
                     # Log the error but don't fail the story generation
                     print(f"Failed to save story history: {str(e)}")
             
-            return story
+            # X-Story-Source tells the client whether this is the full LLM story
+            # or a template recap it may want to upgrade later
+            return JSONResponse(content=story, headers={"X-Story-Source": story_source})
             
         except Exception as e:
             if "Game ID" in str(e):
@@ -294,15 +451,399 @@ async def generate_story(story_request: StoryRequest, user_id: Optional[str] = N
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/generate-story/batch")
+async def generate_story_batch(
+    story_request: StoryBatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Generate a story in several styles at once, sharing one model call."""
+    llm_endpoint.set("/generate-story/batch")
+    return await run_idempotent(
+        "generate-story-batch",
+        idempotency_key,
+        story_request.model_dump(),
+        lambda: _generate_story_batch(story_request)
+    )
+
+async def _generate_story_batch(story_request: StoryBatchRequest) -> JSONResponse:
+    if not story_request.game_id or not story_request.game_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid game ID format")
+    styles = [style.lower() for style in story_request.styles]
+    invalid = [style for style in styles if style not in STORY_STYLES]
+    if not styles or invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Styles must be chosen from: {', '.join(STORY_STYLES)}"
+        )
+
+    try:
+        story_generator = StoryGenerator()
+        mlb_service = MLBDataFetcher()
+        game_data = await mlb_service.get_game_data(story_request.game_id)
+    except Exception as e:
+        if "Game ID" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not game_data:
+        raise HTTPException(status_code=404, detail=f"Game ID {story_request.game_id} not found")
+
+    try:
+        stories = await story_generator.generate_stories(
+            game_data,
+            story_request.preferences,
+            styles,
+            max_queue_wait=STORY_FALLBACK_QUEUE_WAIT_MS / 1000 if STORY_FALLBACK_ENABLED else None
+        )
+        sources = {style: "llm" for style in stories}
+    except Exception as e:
+        if not STORY_FALLBACK_ENABLED:
+            raise HTTPException(status_code=500, detail=f"Failed to generate stories: {str(e)}")
+        print(f"Using template narratives for game {story_request.game_id}: {str(e)}")
+        narrator = TemplateNarrator()
+        stories = {style: narrator.render(game_data, style) for style in styles}
+        sources = {style: "template" for style in styles}
+
+    return JSONResponse(content={"stories": stories, "sources": sources})
+
+@app.post("/generate-story/live")
+async def generate_live_story(story_request: StoryRequest):
+    """Update a live game's story with the half-innings completed since the last request."""
+    llm_endpoint.set("/generate-story/live")
+    if not story_request.game_id or not story_request.game_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid game ID format")
+
+    try:
+        story_generator = StoryGenerator()
+        mlb_service = MLBDataFetcher()
+        game_data = await mlb_service.get_game_data(story_request.game_id)
+    except Exception as e:
+        if "Game ID" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not game_data:
+        raise HTTPException(status_code=404, detail=f"Game ID {story_request.game_id} not found")
+
+    style = story_request.preferences.get('style', 'dramatic')
+    try:
+        return await story_generator.generate_live_story(
+            story_request.game_id,
+            game_data,
+            story_request.preferences,
+            style
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update live story: {str(e)}")
+
+@app.post("/generate-story/stream")
+async def generate_story_stream(story_request: StoryRequest):
+    """Generate a story for a game and stream the text as it is produced."""
+    llm_endpoint.set("/generate-story/stream")
+    if not story_request.game_id or not story_request.game_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid game ID format")
+
+    try:
+        story_generator = StoryGenerator()
+        mlb_service = MLBDataFetcher()
+        game_data = await mlb_service.get_game_data(story_request.game_id)
+    except Exception as e:
+        if "Game ID" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not game_data:
+        raise HTTPException(status_code=404, detail=f"Game ID {story_request.game_id} not found")
+
+    return StreamingResponse(
+        story_generator.stream_story(game_data, story_request.preferences),
+        media_type="text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.post("/generate-story/narrate")
+async def generate_story_narration(story_request: NarratedStoryRequest, http_request: Request):
+    """
+    Generate a story for a game and stream its narration as the story is written.
+
+    Each sentence goes to text-to-speech as soon as the model finishes it,
+    so audio starts roughly one sentence in instead of after the whole story.
+    The format is negotiated as for /api/audio/generate-audio.
+    """
+    llm_endpoint.set("/generate-story/narrate")
+    if not story_request.game_id or not story_request.game_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid game ID format")
+
+    try:
+        story_generator = StoryGenerator()
+        mlb_service = MLBDataFetcher()
+        game_data = await mlb_service.get_game_data(story_request.game_id)
+    except Exception as e:
+        if "Game ID" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not game_data:
+        raise HTTPException(status_code=404, detail=f"Game ID {story_request.game_id} not found")
+
+    try:
+        tts_service = get_text_to_speech_service()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to initialize Text-to-Speech service: {str(e)}")
+
+    audio_format = story_request.audio_format or audio.negotiate_audio_format(http_request.headers.get("accept"))
+    audio_chunks = tts_service.stream_narration(
+        story_generator.stream_story(
+            game_data,
+            story_request.preferences,
+            story_request.preferences.get('style', 'dramatic')
+        ),
+        voice_id=story_request.voice,
+        language_code=story_request.language_code,
+        speaking_rate=story_request.speaking_rate,
+        pitch=story_request.pitch,
+        audio_format=audio_format,
+    )
+    # Wait for the first audio so a failure before anything is sent still gets a status code
+    try:
+        first_chunk = await audio_chunks.__anext__()
+    except QuotaWaitExceeded as e:
+        raise audio.quota_exceeded_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Narration failed: {str(e)}")
+
+    return StreamingResponse(
+        audio.stream_audio_chunks(first_chunk, audio_chunks),
+        media_type=AUDIO_FORMATS[audio_format]['media_type'],
+        headers={
+            "Content-Disposition": f"attachment; filename=story_narration.{AUDIO_FORMATS[audio_format]['extension']}",
+            "Cache-Control": "no-cache",
+            "Vary": "Accept"
+        }
+    )
     
 @app.post("/api/game/{game_id}/quiz")
-async def get_game_quiz(game_id: str, user_prefs: dict = Body(...)):
+async def get_game_quiz(
+    game_id: str,
+    user_prefs: dict = Body(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    llm_endpoint.set("/api/game/{game_id}/quiz")
+    return await run_idempotent(
+        "game-quiz",
+        idempotency_key,
+        {'game_id': game_id, 'preferences': user_prefs},
+        lambda: _get_game_quiz(game_id, user_prefs)
+    )
+
+async def _get_game_quiz(game_id: str, user_prefs: dict) -> JSONResponse:
+    mlb_service = MLBDataFetcher()
+    game_data = await mlb_service.get_game_data(game_id)  # Already processed
+    story_generator = StoryGenerator()
+    quiz = await story_generator.generate_quiz(game_data, user_prefs)
+    quiz['game_data'] = {'summary': game_data.get('summary', {})}
+    return JSONResponse(content=quiz)
+
+@app.post("/api/quiz/batch")
+async def get_quiz_batch(
+    quiz_request: QuizBatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Generate quizzes for a slate of games, several games per model call."""
+    llm_endpoint.set("/api/quiz/batch")
+    return await run_idempotent(
+        "quiz-batch",
+        idempotency_key,
+        quiz_request.model_dump(),
+        lambda: _get_quiz_batch(quiz_request)
+    )
+
+async def _get_quiz_batch(quiz_request: QuizBatchRequest) -> JSONResponse:
+    game_ids = list(dict.fromkeys(quiz_request.game_ids))
+    if not game_ids:
+        raise HTTPException(status_code=400, detail="No game IDs provided")
+    if len(game_ids) > QUIZ_BATCH_MAX_REQUEST_GAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {QUIZ_BATCH_MAX_REQUEST_GAMES} games per batch"
+        )
+
+    mlb_service = MLBDataFetcher()
+    results = await asyncio.gather(
+        *(mlb_service.get_game_data(game_id) for game_id in game_ids),
+        return_exceptions=True
+    )
+    games = {}
+    errors = {}
+    for game_id, result in zip(game_ids, results):
+        if isinstance(result, Exception):
+            errors[game_id] = str(result)
+        elif not result:
+            errors[game_id] = f"Game ID {game_id} not found"
+        else:
+            games[game_id] = result
+
+    batch = {'quizzes': {}, 'errors': {}}
+    if games:
+        story_generator = StoryGenerator()
+        batch = await story_generator.generate_quizzes(games, quiz_request.preferences)
+    for game_id, quiz in batch['quizzes'].items():
+        quiz['game_data'] = {'summary': games[game_id].get('summary', {})}
+    errors.update(batch['errors'])
+    return JSONResponse(content={"quizzes": batch['quizzes'], "errors": errors})
+
+@app.post("/api/game/{game_id}/quiz/stream")
+async def stream_game_quiz(game_id: str, user_prefs: dict = Body(...)):
+    """Stream quiz questions as newline-delimited JSON as soon as each one is ready.
+
+    The first line carries the game summary, then one line per question,
+    then a final "done" line (or an "error" line if generation failed).
+    """
+    llm_endpoint.set("/api/game/{game_id}/quiz/stream")
     mlb_service = MLBDataFetcher()
     game_data = await mlb_service.get_game_data(game_id)
-    processed_data = mlb_service._process_game_data(game_data)  # Use existing processing
+    if not game_data:
+        raise HTTPException(status_code=404, detail=f"Game ID {game_id} not found")
     story_generator = StoryGenerator()
-    quiz = await story_generator.generate_quiz(processed_data, user_prefs)
-    return quiz
+
+    async def quiz_lines():
+        yield json.dumps({'type': 'game', 'summary': game_data.get('summary', {})}) + "\n"
+        count = 0
+        try:
+            async for question in story_generator.stream_quiz(game_data, user_prefs):
+                count += 1
+                yield json.dumps({'type': 'question', 'question': question}) + "\n"
+        except Exception as e:
+            print(f"Error streaming quiz: {str(e)}")
+            yield json.dumps({'type': 'error', 'detail': str(e)}) + "\n"
+            return
+        yield json.dumps({'type': 'done', 'count': count}) + "\n"
+
+    return StreamingResponse(
+        quiz_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.on_event("startup")
+async def start_job_workers():
+    get_job_manager().start()
+
+@app.on_event("startup")
+async def warm_up_tts():
+    """Create the TTS client and load the default voice catalog before the first audio request."""
+    try:
+        tts_service = await asyncio.to_thread(get_text_to_speech_service)
+        await tts_service.get_available_voices("en-US")
+    except Exception as e:
+        # Audio routes retry the setup on first use and report the error there
+        print(f"Text-to-speech warm-up failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_history_writer():
+    get_story_history_writer().start()
+
+@app.on_event("startup")
+async def create_database_indexes():
+    """Create the MongoDB indexes the preference, history and popularity queries use (existing ones are kept)."""
+    await get_database_service().ensure_indexes()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await get_job_manager().stop()
+
+@app.on_event("startup")
+async def start_popularity_reconciliation():
+    get_popularity_service().start()
+
+@app.on_event("shutdown")
+async def stop_popularity_reconciliation():
+    await get_popularity_service().stop()
+
+@app.on_event("shutdown")
+async def close_database_client():
+    # Drain buffered story history before the client goes away
+    await get_story_history_writer().stop()
+    close_mongo_client()
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    job_request: JobRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Queue a story, quiz or audio generation job and return its ID immediately.
+
+    Poll GET /jobs/{job_id} (optionally with ?wait=<seconds>) or pass a
+    callback_url to be sent the finished job.
+    """
+    param_model = JOB_PARAM_MODELS.get(job_request.kind)
+    if param_model is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job kind must be one of: {', '.join(JOB_PARAM_MODELS)}"
+        )
+    try:
+        params = param_model(**job_request.params).model_dump()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+    async def submit():
+        try:
+            job = await get_job_manager().submit(
+                job_request.kind,
+                params,
+                job_request.priority,
+                job_request.callback_url
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+        )
+
+    return await run_idempotent("jobs", idempotency_key, job_request.model_dump(), submit)
+
+@app.get("/jobs/stats")
+async def get_job_stats():
+    """Queue depth, throughput and queue/run latency per job kind."""
+    return await get_job_manager().stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Get a job's status and result. With wait > 0, hold the request until the job finishes or wait seconds pass."""
+    manager = get_job_manager()
+    if wait > 0:
+        job = await manager.wait(job_id, min(wait, JOB_MAX_WAIT_SECONDS))
+    else:
+        job = await manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    job_dict = job.to_dict()
+    if job.kind == "audio" and job.result:
+        # Audio is served by /jobs/{job_id}/result rather than inlined as base64
+        job_dict['result'] = {'media_type': job.result['media_type'], 'result_url': f"/jobs/{job.id}/result"}
+    return job_dict
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Get a finished job's result (the audio file itself for audio jobs)."""
+    job = await get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}", headers={"Retry-After": "1"})
+    if job.kind == "audio":
+        return Response(
+            content=base64.b64decode(job.result['audio']),
+            media_type=job.result['media_type'],
+            headers={"Content-Disposition": f"attachment; filename=story_narration.{job.result.get('extension', 'mp3')}"}
+        )
+    return job.result
 
 if __name__ == "__main__":
     # Get port from environment variable or use default
@@ -0,0 +1 @@
+"""Metrics and structured logging package."""
\ No newline at end of file
@@ -0,0 +1,120 @@
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from mlb_storyteller.config import LLM_PROMPT_COST_PER_1K_TOKENS, LLM_RESPONSE_COST_PER_1K_TOKENS
+from mlb_storyteller.monitoring.metrics import metrics, log_event, TOKEN_BUCKETS
+
+# Endpoint label for LLM calls made while handling the current request
+llm_endpoint: ContextVar[str] = ContextVar("llm_endpoint", default="internal")
+
+metrics.describe("llm_queue_wait_seconds", "Time spent waiting for an LLM slot")
+metrics.describe("llm_time_to_first_token_seconds", "Time from backend call to first response chunk")
+metrics.describe("llm_latency_seconds", "Total backend call latency")
+metrics.describe("llm_prompt_tokens", "Prompt tokens per LLM call", buckets=TOKEN_BUCKETS)
+metrics.describe("llm_response_tokens", "Response tokens per LLM call", buckets=TOKEN_BUCKETS)
+metrics.describe("llm_calls_total", "LLM backend calls by outcome")
+metrics.describe("llm_tokens_total", "Tokens consumed by LLM calls")
+metrics.describe("llm_cost_usd_total", "Estimated LLM spend in US dollars")
+metrics.describe("llm_queue_rejections_total", "Requests rejected because the LLM queue was saturated")
+metrics.describe("llm_quiz_parse_failures_total", "Quiz responses that failed validation")
+metrics.describe("llm_retries_total", "LLM calls retried after a failure")
+metrics.describe("llm_context_lookups_total", "Shared game context lookups by result (hit or build)")
+metrics.describe("llm_context_build_seconds", "Time to look up or build a shared game context")
+metrics.describe("llm_context_build_seconds_saved_total", "Context build time avoided by reusing a memoized context")
+metrics.describe("llm_context_registrations_total", "Game contexts registered with a backend prefix cache")
+metrics.describe("llm_context_tokens_saved_total", "Prompt tokens not resent because the backend had the context cached")
+
+
+def llm_labels(task: str, style: Optional[str] = None) -> Dict[str, str]:
+    """Build the label set for an LLM metric in the current request."""
+    return {"endpoint": llm_endpoint.get(), "task": task, "style": style or "none"}
+
+
+def estimate_cost(prompt_tokens: int, response_tokens: int) -> float:
+    """Estimate the spend for one call from the configured token prices."""
+    return (
+        prompt_tokens / 1000 * LLM_PROMPT_COST_PER_1K_TOKENS
+        + response_tokens / 1000 * LLM_RESPONSE_COST_PER_1K_TOKENS
+    )
+
+
+def record_llm_call(
+    labels: Dict[str, str],
+    backend: str,
+    queue_wait: float,
+    time_to_first_token: Optional[float],
+    latency: float,
+    prompt_tokens: int,
+    response_tokens: int,
+    token_source: str,
+    error: Optional[Exception] = None,
+):
+    """Record one backend call in the metrics registry and the event log."""
+    outcome = "error" if error else "ok"
+    metrics.inc("llm_calls_total", {**labels, "outcome": outcome})
+    metrics.observe("llm_queue_wait_seconds", queue_wait, labels)
+    metrics.observe("llm_latency_seconds", latency, labels)
+    if time_to_first_token is not None:
+        metrics.observe("llm_time_to_first_token_seconds", time_to_first_token, labels)
+
+    cost = estimate_cost(prompt_tokens, response_tokens)
+    metrics.observe("llm_prompt_tokens", prompt_tokens, labels)
+    metrics.inc("llm_tokens_total", {**labels, "kind": "prompt"}, prompt_tokens)
+    if not error:
+        metrics.observe("llm_response_tokens", response_tokens, labels)
+        metrics.inc("llm_tokens_total", {**labels, "kind": "response"}, response_tokens)
+    metrics.inc("llm_cost_usd_total", labels, cost)
+
+    log_event(
+        "llm_call",
+        **labels,
+        backend=backend,
+        outcome=outcome,
+        error=str(error) if error else None,
+        queue_wait_ms=round(queue_wait * 1000, 1),
+        ttft_ms=round(time_to_first_token * 1000, 1) if time_to_first_token is not None else None,
+        latency_ms=round(latency * 1000, 1),
+        prompt_tokens=prompt_tokens,
+        response_tokens=response_tokens,
+        token_source=token_source,
+        cost_usd=round(cost, 6),
+    )
+
+
+def record_queue_rejection(labels: Dict[str, str], waited: float):
+    """Record a request turned away by the LLM queue."""
+    metrics.inc("llm_queue_rejections_total", labels)
+    metrics.observe("llm_queue_wait_seconds", waited, labels)
+    log_event("llm_queue_rejected", **labels, queue_wait_ms=round(waited * 1000, 1))
+
+
+def record_quiz_parse_failure(labels: Dict[str, str], error: Exception, attempt: int):
+    """Record a quiz response that failed validation."""
+    metrics.inc("llm_quiz_parse_failures_total", labels)
+    log_event("llm_quiz_parse_failure", **labels, attempt=attempt, error=str(error))
+
+
+def record_retry(labels: Dict[str, str], attempt: int, reason: str):
+    """Record an LLM call being retried."""
+    metrics.inc("llm_retries_total", {**labels, "reason": reason})
+    log_event("llm_retry", **labels, attempt=attempt, reason=reason)
+
+
+def record_context_lookup(hit: bool, seconds: float, saved_seconds: float = 0.0):
+    """Record a shared game context lookup and the build time a hit avoided."""
+    result = "hit" if hit else "build"
+    metrics.inc("llm_context_lookups_total", {"result": result})
+    metrics.observe("llm_context_build_seconds", seconds, {"result": result})
+    if hit:
+        metrics.inc("llm_context_build_seconds_saved_total", None, max(0.0, saved_seconds - seconds))
+
+
+def record_context_registration(backend: str, tokens: int):
+    """Record a game context being uploaded to a backend prefix cache."""
+    metrics.inc("llm_context_registrations_total", {"backend": backend})
+    log_event("llm_context_registered", backend=backend, context_tokens=tokens)
+
+
+def record_context_reuse(labels: Dict[str, str], tokens: int):
+    """Record prompt tokens saved by referencing a cached context."""
+    metrics.inc("llm_context_tokens_saved_total", labels, tokens)
@@ -1,31 +1,111 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 from bson import ObjectId
-from fastapi import HTTPException
 from mlb_storyteller.preferences.models import UserPreferencesDB, UserPreferencesUpdate, UserStoryHistory
-from mlb_storyteller.config import MONGODB_URI, MONGODB_DB_NAME
+from mlb_storyteller.config import MONGODB_URI, MONGODB_DB_NAME, MONGODB_MAX_POOL_SIZE, MONGODB_SERVER_SELECTION_TIMEOUT_MS
+
+# (collection, keys, options) for every index the queries below rely on
+INDEXES = [
+    # get_user_preferences and the upsert in create_user_preferences; one document per user
+    ("user_preferences", [("user_id", ASCENDING)], {"unique": True}),
+    # get_user_story_history: newest first for one user, without an in-memory sort
+    ("story_history", [("user_id", ASCENDING), ("generated_at", DESCENDING)], {}),
+    # One counter per favorite team or player
+    ("popularity_counters", [("kind", ASCENDING), ("name", ASCENDING)], {"unique": True}),
+    # get_popular_teams / get_popular_players: top N read straight off the index
+    ("popularity_counters", [("kind", ASCENDING), ("count", DESCENDING)], {}),
+]
+
+# Popularity counter kind -> the preference field it counts
+POPULARITY_KINDS = {
+    "team": "favorite_team",
+    "player": "favorite_players",
+}
+
+
+class HistoryRecordsRejected(Exception):
+    """Raised when MongoDB rejects records of a history batch in a way retrying cannot fix (e.g. validation)."""
+
+    def __init__(self, rejected: List[int], inserted: int, errors: List[str]):
+        self.rejected = rejected
+        self.inserted = inserted
+        super().__init__(f"{len(rejected)} story history records rejected: {errors[0] if errors else 'unknown error'}")
+
+
+def favorites_of(preferences: Optional[dict]) -> Dict[str, Set[str]]:
+    """The team and distinct players a preferences document counts towards."""
+    preferences = preferences or {}
+    team = preferences.get("favorite_team")
+    return {
+        "team": {team} if team else set(),
+        "player": {player for player in preferences.get("favorite_players") or [] if player},
+    }
+
+@lru_cache()
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Get the worker-wide MongoDB client; its connection pool is shared by every request."""
+    return AsyncIOMotorClient(
+        MONGODB_URI,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS
+    )
+
+def close_mongo_client() -> None:
+    """Close the worker-wide client, if one was created."""
+    if get_mongo_client.cache_info().currsize:
+        get_mongo_client().close()
+        get_mongo_client.cache_clear()
+        get_database_service.cache_clear()
 
 class DatabaseService:
     """Database service for MLB Storyteller."""
 
-    def __init__(self):
-        """Initialize database connection."""
-        self.client = AsyncIOMotorClient(MONGODB_URI)
-        self.db = self.client[MONGODB_DB_NAME]
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None, db_name: str = MONGODB_DB_NAME):
+        """
+        Initialize the collections.
+
+        Args:
+            client: Client to use instead of the worker-wide one (for tests)
+            db_name: Database to use
+        """
+        self.client = client or get_mongo_client()
+        self.db = self.client[db_name]
         self.preferences_collection = self.db.user_preferences
         self.history_collection = self.db.story_history
+        self.popularity_collection = self.db.popularity_counters
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes in INDEXES; ones that already exist are left as they are."""
+        for collection, keys, options in INDEXES:
+            try:
+                name = await self.db[collection].create_index(keys, **options)
+                print(f"MongoDB index {collection}.{name} ready")
+            except Exception as e:
+                # e.g. duplicate user_ids from before the unique index; queries still work, just slower
+                print(f"Failed to create MongoDB index on {collection} {keys}: {str(e)}")
 
     async def create_user_preferences(self, user_id: str, preferences: UserPreferencesDB) -> UserPreferencesDB:
-        """Create new user preferences."""
-        preferences_dict = preferences.model_dump(by_alias=True)
-        if "_id" in preferences_dict and preferences_dict["_id"]:
-            preferences_dict["_id"] = ObjectId(preferences_dict["_id"])
-        else:
-            preferences_dict["_id"] = ObjectId()
-        
+        """Create user preferences, or replace the user's existing ones."""
         preferences.user_id = user_id
-        result = await self.preferences_collection.insert_one(preferences_dict)
+        preferences_dict = preferences.model_dump(by_alias=True)
+        preferences_dict.pop("_id", None)
+        created_at = preferences_dict.pop("created_at")
+
+        # user_id is unique, so saving again replaces the preferences instead of adding a document
+        before = await self.preferences_collection.find_one_and_update(
+            {"user_id": user_id},
+            {
+                "$set": preferences_dict,
+                "$setOnInsert": {"_id": ObjectId(preferences.id), "created_at": created_at}
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        await self._move_popularity_counters(before, preferences_dict)
         return await self.get_user_preferences(user_id)
 
     async def get_user_preferences(self, user_id: str) -> Optional[UserPreferencesDB]:
@@ -45,29 +125,86 @@ class DatabaseService:
         update_data = preferences.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
 
-        result = await self.preferences_collection.update_one(
+        before = await self.preferences_collection.find_one_and_update(
             {"user_id": user_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
+        if before is None:
+            return None
 
-        if result.modified_count:
-            return await self.get_user_preferences(user_id)
-        return None
+        await self._move_popularity_counters(before, {**before, **update_data})
+        return await self.get_user_preferences(user_id)
+
+    async def _move_popularity_counters(self, before: Optional[dict], after: dict) -> None:
+        """
+        Move the popularity counters from a user's old favorites to their new ones.
+
+        Only the teams and players that changed are touched. A failure here
+        leaves the counters off until the next reconcile_popularity pass,
+        so it is logged rather than failing the preference update.
+
+        Args:
+            before: Preferences document before the write (None for a new user)
+            after: Preferences after the write
+        """
+        old, new = favorites_of(before), favorites_of(after)
+        updates = []
+        for kind in POPULARITY_KINDS:
+            for name in new[kind] - old[kind]:
+                updates.append(UpdateOne({"kind": kind, "name": name}, {"$inc": {"count": 1}}, upsert=True))
+            for name in old[kind] - new[kind]:
+                updates.append(UpdateOne({"kind": kind, "name": name}, {"$inc": {"count": -1}}, upsert=True))
+        if not updates:
+            return
+        try:
+            await self.popularity_collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print(f"Failed to update popularity counters: {str(e)}")
 
     async def add_story_history(self, history: UserStoryHistory) -> UserStoryHistory:
         """Add a story generation to user's history."""
-        history_dict = history.model_dump(by_alias=True)
-        if "_id" in history_dict and history_dict["_id"]:
-            history_dict["_id"] = ObjectId(history_dict["_id"])
-        else:
-            history_dict["_id"] = ObjectId()
-            
-        result = await self.history_collection.insert_one(history_dict)
-        created = await self.history_collection.find_one({"_id": result.inserted_id})
-        if created:
-            created["_id"] = str(created["_id"])
-            return UserStoryHistory(**created)
-        raise HTTPException(status_code=500, detail="Failed to create history record")
+        await self.add_story_histories([history])
+        return history
+
+    async def add_story_histories(self, histories: List[UserStoryHistory]) -> int:
+        """
+        Add several story generations to users' histories in one round trip.
+
+        Records keep their IDs, so writing a batch again after a partial
+        failure skips the records that were already saved.
+
+        Args:
+            histories: Records to insert
+
+        Returns:
+            int: Records inserted by this call
+
+        Raises:
+            HistoryRecordsRejected: If some records can never be written; the rest of the batch was
+        """
+        documents = []
+        for history in histories:
+            history_dict = history.model_dump(by_alias=True)
+            history_dict["_id"] = ObjectId(history_dict["_id"]) if history_dict.get("_id") else ObjectId()
+            documents.append(history_dict)
+        if not documents:
+            return 0
+        try:
+            result = await self.history_collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors"):
+                raise
+            # Duplicate keys are records saved by an earlier attempt; other write errors reject the record itself
+            rejected = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if rejected:
+                raise HistoryRecordsRejected(
+                    [error["index"] for error in rejected],
+                    e.details.get("nInserted", 0),
+                    [error.get("errmsg", "") for error in rejected]
+                )
+            return e.details.get("nInserted", 0)
 
     async def get_user_story_history(self, user_id: str, limit: int = 10) -> List[UserStoryHistory]:
         """Get user's story generation history."""
@@ -83,44 +220,88 @@ class DatabaseService:
 
     async def get_popular_teams(self, limit: int = 5) -> List[dict]:
         """Get most popular favorite teams."""
-        pipeline = [
-            {"$group": {
-                "_id": "$favorite_team",
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
+        return [
+            {"team": name, "count": count}
+            for name, count in await self._top_counters("team", limit)
         ]
-        
-        cursor = self.preferences_collection.aggregate(pipeline)
-        popular_teams = []
-        async for doc in cursor:
-            if doc["_id"]:  # Exclude None values
-                popular_teams.append({
-                    "team": doc["_id"],
-                    "count": doc["count"]
-                })
-        
-        return popular_teams
 
     async def get_popular_players(self, limit: int = 5) -> List[dict]:
         """Get most popular favorite players."""
-        pipeline = [
-            {"$unwind": "$favorite_players"},
-            {"$group": {
-                "_id": "$favorite_players",
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
+        return [
+            {"player": name, "count": count}
+            for name, count in await self._top_counters("player", limit)
         ]
-        
-        cursor = self.preferences_collection.aggregate(pipeline)
-        popular_players = []
-        async for doc in cursor:
-            popular_players.append({
-                "player": doc["_id"],
-                "count": doc["count"]
-            })
-        
-        return popular_players
\ No newline at end of file
+
+    async def _top_counters(self, kind: str, limit: int) -> List[tuple]:
+        """Highest counters of a kind, read from the (kind, count) index."""
+        cursor = self.popularity_collection.find(
+            {"kind": kind, "count": {"$gt": 0}},
+            {"_id": 0, "name": 1, "count": 1}
+        ).sort("count", DESCENDING).limit(limit)
+        return [(doc["name"], doc["count"]) async for doc in cursor]
+
+    async def count_favorites(self, kind: str) -> Dict[str, int]:
+        """
+        Count users per favorite team or player with a full aggregation.
+
+        This scans every preferences document, so only reconcile_popularity uses it.
+
+        Args:
+            kind: 'team' or 'player'
+
+        Returns:
+            Dict[str, int]: Users per team or player name
+        """
+        field = POPULARITY_KINDS[kind]
+        if kind == "player":
+            pipeline = [
+                # A player listed twice by one user still counts once
+                {"$project": {"favorite_players": {"$setUnion": [{"$ifNull": ["$favorite_players", []]}, []]}}},
+                {"$unwind": "$favorite_players"},
+            ]
+        else:
+            pipeline = []
+        pipeline.append({"$group": {"_id": f"${field}", "count": {"$sum": 1}}})
+
+        counts = {}
+        async for doc in self.preferences_collection.aggregate(pipeline):
+            if doc["_id"]:  # Exclude None values
+                counts[doc["_id"]] = doc["count"]
+        return counts
+
+    async def reconcile_popularity(self) -> int:
+        """
+        Recount every favorite and correct the counters that drifted.
+
+        Drift comes from counter writes that failed after the preference
+        write went through. A counter is only corrected if it has not changed
+        since it was read, so a concurrent preference update is not
+        overwritten; anything that slips through is fixed on the next pass.
+
+        Returns:
+            int: Counters corrected
+        """
+        updates = []
+        for kind in POPULARITY_KINDS:
+            expected = await self.count_favorites(kind)
+            async for counter in self.popularity_collection.find({"kind": kind}):
+                count = expected.pop(counter["name"], 0)
+                if counter["count"] != count:
+                    updates.append(UpdateOne(
+                        {"_id": counter["_id"], "count": counter["count"]},
+                        {"$set": {"count": count}}
+                    ))
+            for name, count in expected.items():
+                updates.append(UpdateOne(
+                    {"kind": kind, "name": name},
+                    {"$set": {"count": count}},
+                    upsert=True
+                ))
+        if updates:
+            await self.popularity_collection.bulk_write(updates, ordered=False)
+        return len(updates)
+
+@lru_cache()
+def get_database_service() -> DatabaseService:
+    """Get the worker-wide DatabaseService."""
+    return DatabaseService()
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Optional
+
+from mlb_storyteller.config import (
+    HISTORY_FLUSH_BATCH_SIZE,
+    HISTORY_FLUSH_INTERVAL_MS,
+    HISTORY_MAX_BACKLOG,
+    HISTORY_RETRY_MAX_DELAY_SECONDS,
+    HISTORY_SHUTDOWN_GRACE_SECONDS,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+from mlb_storyteller.preferences.db_service import HistoryRecordsRejected, get_database_service
+from mlb_storyteller.preferences.models import UserStoryHistory
+
+metrics.describe("story_history_backlog", "Story history records buffered in this process, not yet written")
+metrics.describe("story_history_written_total", "Story history records written to MongoDB")
+metrics.describe("story_history_dropped_total", "Story history records dropped, by reason")
+metrics.describe("story_history_flush_failures_total", "Failed story history batch writes")
+metrics.describe("story_history_flush_seconds", "Time one story history insert_many took")
+metrics.describe("story_history_record_age_seconds", "Time from buffering a story history record to writing it")
+
+
+class StoryHistoryWriter:
+    """Write story history to MongoDB behind the requests that produce it.
+
+    ``add`` only appends to an in-process buffer, so story responses never
+    wait on MongoDB. A background task writes the buffer with insert_many
+    once ``batch_size`` records are waiting or ``flush_interval`` seconds
+    have passed, whichever comes first. A batch that fails (MongoDB down or
+    unreachable) stays buffered and is retried, backing off exponentially
+    up to ``max_retry_delay`` seconds while failures continue. Records that
+    MongoDB rejects outright are dropped and counted, so one bad record
+    cannot hold up the rest of the buffer.
+
+    The buffer holds at most ``max_backlog`` records; while MongoDB is down
+    and the buffer is full, new records are dropped (and counted) rather
+    than held in memory without limit. ``stop`` drains the buffer on
+    shutdown.
+    """
+
+    def __init__(
+        self,
+        db_service=None,
+        batch_size: int = HISTORY_FLUSH_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL_MS / 1000,
+        max_backlog: int = HISTORY_MAX_BACKLOG,
+        max_retry_delay: float = HISTORY_RETRY_MAX_DELAY_SECONDS
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            db_service: DatabaseService to write through (the worker-wide one by default)
+            batch_size: Records per insert_many, and the backlog that triggers an early flush
+            flush_interval: Longest a record waits in the buffer while MongoDB is healthy
+            max_backlog: Records the buffer holds before new ones are dropped
+            max_retry_delay: Longest wait between retries while writes keep failing
+        """
+        self._db_service = db_service
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_backlog = max(self.batch_size, max_backlog)
+        self.max_retry_delay = max_retry_delay
+        # Consecutive failed flushes, for the retry backoff
+        self._failures = 0
+        # (record, time buffered)
+        self._buffer: Deque = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def db_service(self):
+        return self._db_service or get_database_service()
+
+    @property
+    def backlog(self) -> int:
+        return len(self._buffer)
+
+    def add(self, history: UserStoryHistory) -> bool:
+        """
+        Buffer a record for the next flush; never blocks.
+
+        Returns:
+            bool: False if the buffer was full and the record was dropped
+        """
+        if len(self._buffer) >= self.max_backlog:
+            metrics.inc("story_history_dropped_total", {"reason": "backlog_full"})
+            return False
+        self._buffer.append((history, time.monotonic()))
+        metrics.set_gauge("story_history_backlog", len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def start(self):
+        """Start the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout=HISTORY_SHUTDOWN_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        if self._buffer:
+            print(f"Lost {len(self._buffer)} story history records that could not be written before shutdown")
+            metrics.inc("story_history_dropped_total", {"reason": "shutdown"}, len(self._buffer))
+            self._buffer.clear()
+            metrics.set_gauge("story_history_backlog", 0)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._failures:
+                # Back off rather than retrying every time a batch fills up
+                await asyncio.sleep(self.retry_delay)
+
+    @property
+    def retry_delay(self) -> float:
+        """Seconds to wait before the next retry after consecutive failures."""
+        return min(self.max_retry_delay, self.flush_interval * 2 ** min(self._failures, 20))
+
+    async def flush(self) -> int:
+        """
+        Write the buffered records in batches of batch_size.
+
+        Stops at the first failed batch, which goes back to the front of the
+        buffer for the next flush. Records MongoDB rejects are dropped and
+        the rest of their batch counts as written.
+
+        Returns:
+            int: Records written
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                start = time.monotonic()
+                try:
+                    await self.db_service.add_story_histories([history for history, _ in batch])
+                except HistoryRecordsRejected as e:
+                    # Retrying would fail the same way; the rest of the batch was written
+                    rejected = set(e.rejected)
+                    for index in sorted(rejected):
+                        history = batch[index][0]
+                        print(f"Dropped story history record (user {history.user_id}, game {history.game_id}): {str(e)}")
+                    metrics.inc("story_history_dropped_total", {"reason": "rejected"}, len(rejected))
+                    batch = [entry for index, entry in enumerate(batch) if index not in rejected]
+                except asyncio.CancelledError:
+                    # Shutdown ran out of time mid-write; the batch is counted with the rest
+                    self._buffer.extendleft(reversed(batch))
+                    raise
+                except Exception as e:
+                    self._failures += 1
+                    print(f"Failed to write {len(batch)} story history records, retrying in {self.retry_delay:g}s: {str(e)}")
+                    metrics.inc("story_history_flush_failures_total")
+                    self._buffer.extendleft(reversed(batch))
+                    # Records added meanwhile may have pushed the buffer over its limit
+                    while len(self._buffer) > self.max_backlog:
+                        self._buffer.pop()
+                        metrics.inc("story_history_dropped_total", {"reason": "backlog_full"})
+                    break
+                self._failures = 0
+                finished = time.monotonic()
+                metrics.observe("story_history_flush_seconds", finished - start)
+                for _, buffered_at in batch:
+                    metrics.observe("story_history_record_age_seconds", finished - buffered_at)
+                metrics.inc("story_history_written_total", value=len(batch))
+                written += len(batch)
+            metrics.set_gauge("story_history_backlog", len(self._buffer))
+        return written
+
+
+@lru_cache()
+def get_story_history_writer() -> StoryHistoryWriter:
+    """Get the worker-wide story history writer."""
+    return StoryHistoryWriter()
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import uuid
+from functools import lru_cache
+from typing import List, Optional
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import POPULARITY_CACHE_TTL_SECONDS, POPULARITY_RECONCILE_INTERVAL_SECONDS
+from mlb_storyteller.monitoring.metrics import metrics
+from mlb_storyteller.preferences.db_service import POPULARITY_KINDS, get_database_service
+
+metrics.describe("popularity_reconcile_corrections_total", "Popularity counters corrected by reconciliation")
+metrics.describe("popularity_reconcile_seconds", "Time one popularity reconciliation pass took")
+
+RECONCILE_LOCK_KEY = "popularity:reconcile"
+
+
+class PopularityService:
+    """Popular teams and players, from counters kept up to date on every preference write.
+
+    DatabaseService adjusts a counter per team and player whenever a user's
+    favorites change, so a top-N query reads N entries off an index instead
+    of aggregating every preferences document. Results are cached in Redis
+    for ``cache_ttl`` seconds.
+
+    Counters can drift when a counter write fails after its preference write
+    went through, so every ``reconcile_interval`` seconds one worker (chosen
+    by a Redis lock) recounts the favorites and corrects them.
+    """
+
+    def __init__(
+        self,
+        db_service=None,
+        redis_service: Optional[RedisService] = None,
+        cache_ttl: int = POPULARITY_CACHE_TTL_SECONDS,
+        reconcile_interval: int = POPULARITY_RECONCILE_INTERVAL_SECONDS
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            db_service: DatabaseService holding the counters (the worker-wide one by default)
+            redis_service: Redis for the result cache and the reconciliation lock
+            cache_ttl: Seconds a top-N result is served from Redis
+            reconcile_interval: Seconds between reconciliation passes; 0 disables them
+        """
+        self._db_service = db_service
+        self.redis = redis_service or RedisService()
+        self.cache_ttl = cache_ttl
+        self.reconcile_interval = reconcile_interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def db_service(self):
+        return self._db_service or get_database_service()
+
+    async def popular(self, kind: str, limit: int = 5) -> List[dict]:
+        """
+        Get the most popular favorite teams or players.
+
+        Args:
+            kind: 'team' or 'player'
+            limit: Number of entries
+
+        Returns:
+            List[dict]: {'team'|'player': name, 'count': users}, most popular first
+        """
+        if kind not in POPULARITY_KINDS:
+            raise ValueError(f"Popularity kind must be one of: {', '.join(POPULARITY_KINDS)}")
+        stat_type = f"popular_{kind}s:{limit}"
+        try:
+            cached = await self.redis.get_popular_stats(stat_type)
+            if cached is not None:
+                return cached["items"]
+        except Exception as e:
+            print(f"Error reading cached {stat_type}: {str(e)}")
+
+        if kind == "team":
+            items = await self.db_service.get_popular_teams(limit)
+        else:
+            items = await self.db_service.get_popular_players(limit)
+
+        try:
+            await self.redis.set_popular_stats(stat_type, {"items": items}, expire=self.cache_ttl)
+        except Exception as e:
+            print(f"Error caching {stat_type}: {str(e)}")
+        return items
+
+    async def reconcile(self) -> Optional[int]:
+        """
+        Recount favorites and correct the counters, unless another worker did so this interval.
+
+        Returns:
+            Optional[int]: Counters corrected, or None if another worker holds the lock
+        """
+        if self.redis.enabled:
+            try:
+                lock_ms = max(1, self.reconcile_interval - 1) * 1000
+                if not await self.redis.acquire_lock(RECONCILE_LOCK_KEY, uuid.uuid4().hex, lock_ms):
+                    return None
+            except Exception as e:
+                # Without the lock every worker reconciles; that is only wasted work
+                print(f"Popularity reconciliation lock failed, reconciling anyway: {str(e)}")
+
+        start = time.monotonic()
+        corrected = await self.db_service.reconcile_popularity()
+        metrics.observe("popularity_reconcile_seconds", time.monotonic() - start)
+        metrics.inc("popularity_reconcile_corrections_total", value=corrected)
+        if corrected:
+            print(f"Corrected {corrected} popularity counters")
+        return corrected
+
+    def start(self):
+        """Start periodic reconciliation (the first pass runs right away)."""
+        if self._task is None and self.reconcile_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop periodic reconciliation."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"Popularity reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval)
+
+
+@lru_cache()
+def get_popularity_service() -> PopularityService:
+    """Get the worker-wide popularity service."""
+    return PopularityService()
@@ -0,0 +1,311 @@
+import struct
+from typing import List, Optional, Tuple
+
+# Output formats offered to clients: TTS encoding name, media type, file extension
+AUDIO_FORMATS = {
+    'mp3': {'encoding': 'MP3', 'media_type': 'audio/mpeg', 'extension': 'mp3'},
+    'ogg_opus': {'encoding': 'OGG_OPUS', 'media_type': 'audio/ogg', 'extension': 'ogg'},
+}
+
+DEFAULT_AUDIO_FORMAT = 'mp3'
+
+
+def media_type_for(audio: bytes) -> str:
+    """Media type of finished audio, from its first bytes."""
+    return AUDIO_FORMATS['ogg_opus' if audio[:4] == b"OggS" else 'mp3']['media_type']
+
+
+# --- MP3 ---------------------------------------------------------------------
+
+# Layer III bitrates in kbps by bitrate index, for MPEG-1 and for MPEG-2/2.5
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5) and rate index
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_frame(data: bytes, pos: int) -> Optional[Tuple[int, int]]:
+    """(frame length, offset of the Xing/Info tag) for a Layer III frame header at pos, or None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 3
+    layer = (data[pos + 1] >> 1) & 3
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 1
+    length = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+    mono = data[pos + 3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    crc = 0 if data[pos + 1] & 1 else 2
+    return length, 4 + crc + side_info
+
+
+def _mp3_frames(audio: bytes) -> Tuple[List[bytes], int, Optional[bytes]]:
+    """
+    Split MP3 audio into its audio frames, dropping ID3 tags and any Xing/Info/VBRI header frame.
+
+    Returns:
+        tuple: (runs of contiguous frames, frame count, first audio frame's
+        header or None if no frames were found)
+    """
+    start, end = 0, len(audio)
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        # Syncsafe size, plus the footer if the flags say there is one
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        start = 10 + size + (10 if audio[5] & 0x10 else 0)
+    if end - start >= 128 and audio[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    runs, count, first_header = [], 0, None
+    pos, run_start = start, None
+    while pos < end:
+        frame = _mp3_frame(audio, pos)
+        if frame is None or pos + frame[0] > end:
+            # Junk between frames (or a truncated final frame): resync on the next header
+            if run_start is not None:
+                runs.append(audio[run_start:pos])
+                run_start = None
+            pos += 1
+            continue
+        length, tag_offset = frame
+        if first_header is None:
+            tag = audio[pos + tag_offset:pos + tag_offset + 4]
+            if tag in (b"Xing", b"Info") or audio[pos + 36:pos + 40] == b"VBRI":
+                pos += length
+                continue
+            first_header = audio[pos:pos + 4]
+        if run_start is None:
+            run_start = pos
+        count += 1
+        pos += length
+    if run_start is not None:
+        runs.append(audio[run_start:pos])
+    return runs, count, first_header
+
+
+def _mp3_info_frame(first_header: bytes, frame_count: int, frames_bytes: int, constant_bitrate: bool) -> bytes:
+    """A silent frame carrying an Info (CBR) or Xing (VBR) tag with the stream's frame and byte counts."""
+    header = bytearray(first_header)
+    header[1] |= 1  # no CRC
+    header[2] &= 0xFD  # no padding
+    # The tag has to fit in the frame, so low bitrates need a bigger (and so VBR-tagged) frame
+    bitrate_index = header[2] >> 4
+    while True:
+        header[2] = (bitrate_index << 4) | (header[2] & 0x0F)
+        length, tag_offset = _mp3_frame(bytes(header) + b"\0" * 32, 0)
+        if tag_offset + 16 <= length or bitrate_index == 14:
+            break
+        bitrate_index += 1
+        constant_bitrate = False
+    frame = bytearray(length)
+    frame[:4] = header
+    frame[tag_offset:tag_offset + 16] = struct.pack(
+        ">4sIII",
+        b"Info" if constant_bitrate else b"Xing",
+        0x03,  # frame count and byte count present
+        frame_count,  # audio frames, not counting this one
+        frames_bytes + length,
+    )
+    return bytes(frame)
+
+
+# --- Ogg Opus ----------------------------------------------------------------
+
+def _crc_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _crc_table()
+_OGG_NO_GRANULE = 0xFFFFFFFFFFFFFFFF
+_OGG_BOS = 0x02
+_OGG_EOS = 0x04
+
+
+def _ogg_crc(page: bytes) -> int:
+    crc = 0
+    for byte in page:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+
+def _ogg_pages(audio: bytes) -> List[Tuple[int, int, bytes, bytes]]:
+    """(header flags, granule position, lacing values, body) for each page; empty if not Ogg."""
+    pages, pos = [], 0
+    while pos + 27 <= len(audio) and audio[pos:pos + 4] == b"OggS":
+        flags = audio[pos + 5]
+        granule = struct.unpack_from("<Q", audio, pos + 6)[0]
+        segments = audio[pos + 26]
+        lacing = audio[pos + 27:pos + 27 + segments]
+        body_start = pos + 27 + segments
+        body_end = body_start + sum(lacing)
+        if body_end > len(audio):
+            break
+        pages.append((flags, granule, lacing, audio[body_start:body_end]))
+        pos = body_end
+    return pages
+
+
+def _opus_samples(toc: int, frame_count_byte: int) -> int:
+    """Samples at 48 kHz decoded from an Opus packet, from its TOC byte (RFC 6716 section 3.1)."""
+    config = toc >> 3
+    if config < 12:
+        frame_size = (480, 960, 1920, 2880)[config % 4]  # SILK: 10, 20, 40, 60 ms
+    elif config < 16:
+        frame_size = (480, 960)[config % 2]  # Hybrid: 10, 20 ms
+    else:
+        frame_size = (120, 240, 480, 960)[config % 4]  # CELT: 2.5, 5, 10, 20 ms
+    frames = (1, 2, 2, frame_count_byte & 0x3F)[toc & 3]
+    return frame_size * frames
+
+
+class AudioAssembler:
+    """Merge independently synthesized audio chunks into one stream.
+
+    Every TTS response is a complete file, so simply concatenating them
+    repeats headers and confuses players about duration and seeking. For
+    MP3 each chunk is reduced to its audio frames (ID3 tags and Xing/Info
+    frames dropped), and finalize_audio adds a single Info frame for the
+    whole narration. For Ogg Opus the first chunk's OpusHead and OpusTags
+    are kept, later chunks' are dropped, and every page is rewritten into
+    one logical stream: one serial number, consecutive page numbers,
+    granule positions counted from the start, and EOS only on the last
+    page. The encoder priming (pre-skip) of later chunks, a few
+    milliseconds each, stays in the audio.
+
+    Chunks are fed in order with add(), which returns the bytes to send
+    next, so assembly works while streaming. When the last chunk is not
+    known in advance, call finish() after it instead of passing last=True.
+    Audio that does not parse as the expected format is passed through
+    unchanged.
+    """
+
+    def __init__(self, audio_format: str = DEFAULT_AUDIO_FORMAT):
+        """Initialize the assembler."""
+        self.audio_format = audio_format
+        # Ogg stream state
+        self._serial: Optional[int] = None
+        self._sequence = 0
+        self._granule = 0
+        self._ended = False
+
+    def add(self, chunk: bytes, last: bool = False) -> bytes:
+        """
+        Assemble the next chunk.
+
+        Args:
+            chunk: One complete TTS response
+            last: Whether this is the final chunk of the narration
+
+        Returns:
+            bytes: Audio to append to what has been returned so far
+        """
+        if self.audio_format == 'ogg_opus':
+            return self._add_ogg(chunk, last)
+        runs, count, _ = _mp3_frames(chunk)
+        return b"".join(runs) if count else chunk
+
+    def finish(self) -> bytes:
+        """End the stream if no chunk was added with last=True: an empty EOS page for Ogg, nothing for MP3."""
+        if self._serial is None or self._ended:
+            return b""
+        self._ended = True
+        return self._ogg_page(_OGG_EOS, self._granule, b"", b"")
+
+    def _ogg_page(self, flags: int, granule: int, lacing: bytes, body: bytes) -> bytes:
+        """A page of the merged stream, taking the next sequence number."""
+        page = bytearray(struct.pack("<4sBBQIIIB", b"OggS", 0, flags, granule, self._serial, self._sequence, 0, len(lacing)))
+        page += lacing + body
+        struct.pack_into("<I", page, 22, _ogg_crc(page))
+        self._sequence += 1
+        return bytes(page)
+
+    def _add_ogg(self, chunk: bytes, last: bool) -> bytes:
+        pages = _ogg_pages(chunk)
+        if not pages:
+            return chunk
+        first_chunk = self._serial is None
+        if first_chunk:
+            self._serial = struct.unpack_from("<I", chunk, 14)[0]
+
+        output = []
+        header_packets = 0
+        packet_head = b""
+        samples = 0
+        for index, (flags, granule, lacing, body) in enumerate(pages):
+            in_header = header_packets < 2
+            completed = False
+            offset = 0
+            for value in lacing:
+                if not in_header and len(packet_head) < 2:
+                    packet_head += body[offset:offset + min(value, 2 - len(packet_head))]
+                offset += value
+                if value < 255:
+                    if in_header:
+                        header_packets += 1
+                    else:
+                        if packet_head:
+                            samples += _opus_samples(packet_head[0], packet_head[1] if len(packet_head) > 1 else 0)
+                        completed = True
+                    packet_head = b""
+            if in_header and not first_chunk:
+                continue
+
+            final_page = last and index == len(pages) - 1
+            if in_header:
+                new_granule = 0
+            elif final_page and granule != _OGG_NO_GRANULE:
+                # The final granule may trim the end of the last packet; keep that
+                new_granule = self._granule + granule
+            elif completed:
+                new_granule = self._granule + samples
+            else:
+                new_granule = _OGG_NO_GRANULE
+            new_flags = flags & ~(_OGG_BOS | _OGG_EOS)
+            if first_chunk and index == 0:
+                new_flags |= _OGG_BOS
+            if final_page:
+                new_flags |= _OGG_EOS
+            output.append(self._ogg_page(new_flags, new_granule, lacing, body))
+        self._granule += samples
+        self._ended = self._ended or last
+        return b"".join(output)
+
+
+def finalize_audio(audio: bytes, audio_format: str = DEFAULT_AUDIO_FORMAT) -> bytes:
+    """
+    Prepare assembled audio for serving as a complete file.
+
+    For MP3 this prepends one Info (or Xing) frame with the narration's frame
+    and byte counts, so players show the right duration and seek quickly.
+    It is idempotent, and Ogg Opus, whose pages already carry timing, is
+    returned unchanged.
+    """
+    if audio_format != 'mp3':
+        return audio
+    runs, count, first_header = _mp3_frames(audio)
+    if not count:
+        return audio
+    frames = b"".join(runs)
+    # Constant bitrate if every frame uses the first frame's bitrate index
+    bitrate_index = first_header[2] >> 4
+    constant_bitrate = True
+    pos = 0
+    while pos < len(frames):
+        if frames[pos + 2] >> 4 != bitrate_index:
+            constant_bitrate = False
+            break
+        pos += _mp3_frame(frames, pos)[0]
+    return _mp3_info_frame(first_header, count, len(frames), constant_bitrate) + frames
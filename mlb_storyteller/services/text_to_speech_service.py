@@ -1,18 +1,64 @@
 from google.cloud import texttospeech
 import os
-from typing import Optional, List, Dict
+from typing import AsyncIterator, Optional, List, Dict
 import asyncio
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from dotenv import load_dotenv
 from pathlib import Path
 import json
+import re
+import time
 from google.api_core import exceptions
+from mlb_storyteller.cache.audio_cache import get_audio_cache
+from mlb_storyteller.config import (
+    TTS_MAX_CONCURRENCY,
+    TTS_CHUNK_RETRIES,
+    TTS_RETRY_BACKOFF_MS,
+    TTS_SEGMENT_CACHE_ENABLED,
+    TTS_SEGMENT_MAX_CHARS,
+    TTS_VOICE_CACHE_TTL,
+    TTS_MAX_REQUEST_BYTES,
+    TTS_SSML_SENTENCE_BREAK_MS,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+from mlb_storyteller.services.audio_assembly import AUDIO_FORMATS, DEFAULT_AUDIO_FORMAT, AudioAssembler, finalize_audio
+from mlb_storyteller.services.tts_chunk_planner import plan_chunks, split_sentences
+from mlb_storyteller.services.tts_scheduler import get_tts_scheduler
 
 load_dotenv()
 
+# Errors worth retrying for a single chunk; anything else fails the narration at once
+RETRYABLE_TTS_ERRORS = (
+    exceptions.ServiceUnavailable,
+    exceptions.DeadlineExceeded,
+    exceptions.InternalServerError,
+    exceptions.TooManyRequests,
+    exceptions.ResourceExhausted,
+)
+
+
+metrics.describe("tts_segments_total", "Narration segments by source (cache or synthesized)")
+metrics.describe("tts_characters_total", "Narration characters by source (cache or synthesized)")
+
+
+@lru_cache()
+def get_synthesis_slots() -> asyncio.Semaphore:
+    """Worker-wide cap on concurrent synthesize_speech calls, shared by all service instances."""
+    return asyncio.Semaphore(max(1, TTS_MAX_CONCURRENCY))
+
+
+@lru_cache()
+def get_synthesis_executor() -> ThreadPoolExecutor:
+    """Threads for the blocking TTS client, sized to the cap so the default pool can't throttle it."""
+    return ThreadPoolExecutor(max_workers=max(1, TTS_MAX_CONCURRENCY), thread_name_prefix="tts")
+
+
 class TextToSpeechService:
     def __init__(self):
         """Initialize the Google Cloud Text-to-Speech client."""
+        # Voice catalog per language code: (expiry timestamp, voices)
+        self._voice_cache: Dict[str, tuple] = {}
         try:
             # First try credentials as JSON string
             credentials_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
@@ -95,6 +141,8 @@ class TextToSpeechService:
         language_code: str = "en-US",
         speaking_rate: float = 1.0,
         pitch: float = 0.0,
+        ssml: bool = False,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
     ) -> bytes:
         """
         Generate audio from text using Google Cloud Text-to-Speech.
@@ -105,16 +153,18 @@ class TextToSpeechService:
             language_code: The language code (default: 'en-US')
             speaking_rate: The speaking rate (0.25 to 4.0, default: 1.0)
             pitch: The pitch adjustment (-20.0 to 20.0, default: 0.0)
+            ssml: Whether text is an SSML document rather than plain text
+            audio_format: Output format, a key of AUDIO_FORMATS (default: 'mp3')
             
         Returns:
-            bytes: The audio data in MP3 format
+            bytes: The audio data in the requested format
         """
         if not text.strip():
             raise ValueError("Empty text provided for audio generation")
 
         try:
             # Configure the synthesis input
-            synthesis_input = texttospeech.SynthesisInput(text=text)
+            synthesis_input = texttospeech.SynthesisInput(ssml=text) if ssml else texttospeech.SynthesisInput(text=text)
 
             # Configure the voice
             voice = texttospeech.VoiceSelectionParams(
@@ -124,7 +174,7 @@ class TextToSpeechService:
 
             # Configure the audio encoding with enhanced quality
             audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
+                audio_encoding=getattr(texttospeech.AudioEncoding, AUDIO_FORMATS[audio_format]['encoding']),
                 speaking_rate=max(0.25, min(speaking_rate, 4.0)),  # Clamp to valid range
                 pitch=max(-20.0, min(pitch, 20.0)),  # Clamp to valid range
                 effects_profile_id=['headphone-class-device'],
@@ -132,11 +182,14 @@ class TextToSpeechService:
             )
 
             # Perform the text-to-speech request
-            response = await asyncio.to_thread(
-                self.client.synthesize_speech,
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config,
+            response = await asyncio.get_running_loop().run_in_executor(
+                get_synthesis_executor(),
+                partial(
+                    self.client.synthesize_speech,
+                    input=synthesis_input,
+                    voice=voice,
+                    audio_config=audio_config,
+                ),
             )
 
             if not response.audio_content:
@@ -148,9 +201,72 @@ class TextToSpeechService:
             print(f"Error generating audio: {str(e)}")
             raise
 
+    async def _segment_audio(
+        self,
+        index: int,
+        total: int,
+        segment: str,
+        voice_id: str,
+        language_code: str,
+        speaking_rate: float,
+        pitch: float,
+        ssml: bool = False,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
+    ) -> bytes:
+        """Get one segment's audio from the audio cache, synthesizing and caching it on a miss."""
+        audio_cache = get_audio_cache()
+        segment_key = audio_cache.key_for(segment, voice_id, language_code, speaking_rate, pitch, audio_format)
+        audio = await audio_cache.get(segment_key)
+        if audio:
+            metrics.inc("tts_segments_total", {"source": "cache"})
+            metrics.inc("tts_characters_total", {"source": "cache"}, len(segment))
+            return audio
+
+        audio = await self._synthesize_chunk(
+            index, total, segment, voice_id, language_code, speaking_rate, pitch, ssml, audio_format
+        )
+        metrics.inc("tts_segments_total", {"source": "synthesized"})
+        metrics.inc("tts_characters_total", {"source": "synthesized"}, len(segment))
+        if audio:
+            await audio_cache.put(segment_key, audio)
+        return audio
+
+    async def _synthesize_chunk(
+        self,
+        index: int,
+        total: int,
+        chunk: str,
+        voice_id: str,
+        language_code: str,
+        speaking_rate: float,
+        pitch: float,
+        ssml: bool = False,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
+    ) -> bytes:
+        """
+        Synthesize one chunk within the shared quota and the worker-wide concurrency cap, retrying transient errors.
+        Raises QuotaWaitExceeded if the quota has no room for it in time.
+        """
+        for attempt in range(TTS_CHUNK_RETRIES + 1):
+            try:
+                # Every attempt is a billable request, so each one waits for quota
+                await get_tts_scheduler().acquire(len(chunk))
+                async with get_synthesis_slots():
+                    print(f"Generating audio for chunk {index}/{total or '?'}")
+                    return await self.generate_audio(
+                        chunk, voice_id, language_code, speaking_rate, pitch, ssml, audio_format
+                    )
+            except RETRYABLE_TTS_ERRORS as e:
+                if attempt == TTS_CHUNK_RETRIES:
+                    raise
+                delay = TTS_RETRY_BACKOFF_MS / 1000 * 2 ** attempt
+                print(f"Retrying chunk {index}/{total or '?'} in {delay:.2f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
     async def get_available_voices(self, language_code: str = "en-US") -> List[Dict]:
         """
         Get a list of available voices for the specified language.
+        The catalog rarely changes, so it is cached per language for TTS_VOICE_CACHE_TTL seconds.
         
         Args:
             language_code: The language code to filter voices by
@@ -158,6 +274,10 @@ class TextToSpeechService:
         Returns:
             list: List of available voice names and properties
         """
+        cached = self._voice_cache.get(language_code)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
         try:
             # Run the API call in a thread pool
             voices = await asyncio.to_thread(
@@ -165,93 +285,74 @@ class TextToSpeechService:
                 language_code=language_code
             )
             
-            if not voices or not voices.voices:
-                return []
-
-            return [
+            catalog = [
                 {
                     'name': voice.name,
                     'gender': texttospeech.SsmlVoiceGender(voice.ssml_gender).name,
-                    'language_codes': voice.language_codes,
+                    'language_codes': list(voice.language_codes),
                     'natural_sample_rate_hertz': voice.natural_sample_rate_hertz
                 }
-                for voice in voices.voices
+                for voice in (voices.voices if voices else [])
             ]
+            self._voice_cache[language_code] = (time.monotonic() + TTS_VOICE_CACHE_TTL, catalog)
+            return catalog
         except Exception as e:
             print(f"Error listing voices: {str(e)}")
             raise
 
     @staticmethod
-    def chunk_text(text: str, max_chars: int = 5000) -> List[str]:
+    def chunk_text(
+        text: str,
+        max_bytes: int = TTS_MAX_REQUEST_BYTES,
+        ssml_break_ms: int = TTS_SSML_SENTENCE_BREAK_MS
+    ) -> List[str]:
         """
-        Split text into chunks that are within Google Cloud Text-to-Speech limits.
-        Improved to maintain sentence integrity and proper punctuation.
+        Split text into as few chunks as fit Google Cloud Text-to-Speech's byte limit.
+        See tts_chunk_planner.plan_chunks.
         
         Args:
             text: The text to split
-            max_chars: Maximum characters per chunk
+            max_bytes: Maximum UTF-8 bytes per chunk
+            ssml_break_ms: If positive, chunks are SSML with this pause between sentences
             
         Returns:
             list: List of text chunks
         """
-        if not text:
-            return []
+        return plan_chunks(text, max_bytes, ssml_break_ms)
 
-        # Clean and normalize the text
-        text = text.strip().replace('\n', ' ').replace('  ', ' ')
-        
-        # If text is short enough, return as is
-        if len(text) <= max_chars:
-            return [text]
-
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        sentences = text.split('. ')
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            # Add period if it was removed by split
-            if not sentence.endswith('.'):
-                sentence += '.'
-                
-            sentence_length = len(sentence) + 1  # +1 for space
-            
-            if current_length + sentence_length > max_chars:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk).strip())
-                    current_chunk = [sentence]
-                    current_length = sentence_length
-                else:
-                    # If a single sentence is too long, split it at word boundaries
-                    words = sentence.split()
-                    temp_chunk = []
-                    temp_length = 0
-                    
-                    for word in words:
-                        word_length = len(word) + 1
-                        if temp_length + word_length > max_chars:
-                            if temp_chunk:
-                                chunks.append(' '.join(temp_chunk) + '.')
-                            temp_chunk = [word]
-                            temp_length = word_length
-                        else:
-                            temp_chunk.append(word)
-                            temp_length += word_length
-                    
-                    if temp_chunk:
-                        chunks.append(' '.join(temp_chunk) + '.')
-            else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
+    @classmethod
+    def segment_text(cls, text: str, max_chars: int = TTS_SEGMENT_MAX_CHARS) -> List[str]:
+        """
+        Split text into sentence-aligned segments for the segment cache.
 
-        if current_chunk:
-            chunks.append(' '.join(current_chunk).strip())
+        Segments never span a paragraph break, and sentences are packed into
+        a segment only up to max_chars. Because packing restarts at every
+        paragraph, appending a paragraph (as live stories do) leaves all
+        earlier segments unchanged.
+
+        Args:
+            text: The text to split
+            max_chars: Maximum characters per segment
 
-        return chunks
+        Returns:
+            list: Segments in text order
+        """
+        segments = []
+        for paragraph in re.split(r'\n+', text or ""):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            current = ""
+            for sentence in split_sentences(paragraph):
+                if current and len(current) + 1 + len(sentence) > max_chars:
+                    segments.append(current)
+                    current = sentence
+                else:
+                    current = f"{current} {sentence}" if current else sentence
+            if current:
+                segments.append(current)
+        # chunk_text splits any sentence beyond the API limit (and renders SSML if enabled)
+        return [piece for segment in segments for piece in cls.chunk_text(segment)]
 
     async def generate_long_audio(
         self,
@@ -260,9 +361,10 @@ class TextToSpeechService:
         language_code: str = "en-US",
         speaking_rate: float = 1.0,
         pitch: float = 0.0,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
     ) -> bytes:
         """
-        Generate audio for long text by splitting it into chunks and concatenating the results.
+        Generate audio for long text by splitting it into chunks and assembling the results into one file.
         
         Args:
             text: The text to convert to speech
@@ -270,41 +372,209 @@ class TextToSpeechService:
             language_code: The language code
             speaking_rate: The speaking rate
             pitch: The pitch adjustment
+            audio_format: Output format, a key of AUDIO_FORMATS
             
         Returns:
-            bytes: The concatenated audio data in MP3 format
+            bytes: The complete audio in the requested format
+        """
+        audio_chunks = [
+            audio async for audio in self.stream_long_audio(
+                text, voice_id, language_code, speaking_rate, pitch, audio_format=audio_format
+            )
+        ]
+        return finalize_audio(b''.join(audio_chunks), audio_format)
+
+    async def stream_long_audio(
+        self,
+        text: str,
+        voice_id: str,
+        language_code: str = "en-US",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        check_cache: bool = True,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
+    ) -> AsyncIterator[bytes]:
+        """
+        Generate audio for long text, yielding each chunk's audio in order as soon as it is ready.
+
+        All chunks are synthesized concurrently (up to TTS_MAX_CONCURRENCY per
+        worker), so by the time chunk 1 has been consumed the later ones are
+        usually done too. Closing the iterator early cancels the chunks that
+        are still being synthesized. Chunks pass through an AudioAssembler,
+        so together they form one stream rather than a run of separate
+        files; pass the joined output through finalize_audio to serve it as
+        a complete file. Finished narrations are stored in the audio cache,
+        and a cached narration is yielded as a single, finalized chunk.
+
+        Args:
+            text: The text to convert to speech
+            voice_id: The ID of the voice to use
+            language_code: The language code
+            speaking_rate: The speaking rate
+            pitch: The pitch adjustment
+            check_cache: Look the narration up first (False if the caller already has)
+            audio_format: Output format, a key of AUDIO_FORMATS
+
+        Yields:
+            bytes: Audio for each chunk, in text order
         """
         if not text:
             raise ValueError("No text provided for audio generation")
 
-        try:
+        audio_cache = get_audio_cache()
+        cache_key = audio_cache.key_for(
+            text, voice_id, language_code, speaking_rate, pitch, audio_format
+        ) if audio_cache else None
+        if audio_cache and check_cache:
+            cached = await audio_cache.get(cache_key)
+            if cached:
+                yield cached
+                return
+
+        # With the segment cache, text is split into small sentence-aligned
+        # segments so a regenerated story only synthesizes the parts that changed
+        if audio_cache and TTS_SEGMENT_CACHE_ENABLED:
+            chunks = self.segment_text(text)
+        else:
             chunks = self.chunk_text(text)
-            if not chunks:
-                raise ValueError("Text chunking resulted in no valid chunks")
-
-            audio_chunks = []
-            total_chunks = len(chunks)
-
-            print(f"Processing {total_chunks} text chunks...")
-
-            for i, chunk in enumerate(chunks, 1):
-                print(f"Generating audio for chunk {i}/{total_chunks}")
-                chunk_audio = await self.generate_audio(
-                    chunk,
-                    voice_id,
-                    language_code,
-                    speaking_rate,
-                    pitch,
-                )
-                if chunk_audio:
-                    audio_chunks.append(chunk_audio)
+        if not chunks:
+            raise ValueError("Text chunking resulted in no valid chunks")
+
+        print(f"Processing {len(chunks)} text chunks...")
 
+        # chunk_text renders SSML documents when sentence breaks are configured
+        ssml = TTS_SSML_SENTENCE_BREAK_MS > 0
+        synthesize = self._segment_audio if audio_cache and TTS_SEGMENT_CACHE_ENABLED else self._synthesize_chunk
+        tasks = [
+            asyncio.create_task(
+                synthesize(i, len(chunks), chunk, voice_id, language_code, speaking_rate, pitch, ssml, audio_format)
+            )
+            for i, chunk in enumerate(chunks, 1)
+        ]
+        assembler = AudioAssembler(audio_format)
+        audio_chunks = []
+        try:
+            for i, task in enumerate(tasks, 1):
+                audio = await task
+                if audio:
+                    audio = assembler.add(audio, last=i == len(tasks))
+                    audio_chunks.append(audio)
+                    yield audio
             if not audio_chunks:
                 raise ValueError("No audio chunks were generated")
-
-            # Concatenate the audio chunks
-            return b''.join(audio_chunks)
-            
         except Exception as e:
             print(f"Error generating long audio: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if audio_cache:
+            await audio_cache.put(cache_key, finalize_audio(b''.join(audio_chunks), audio_format))
+
+    async def stream_narration(
+        self,
+        text_stream: AsyncIterator[str],
+        voice_id: str,
+        language_code: str = "en-US",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        audio_format: str = DEFAULT_AUDIO_FORMAT,
+    ) -> AsyncIterator[bytes]:
+        """
+        Narrate text while it is still being written, yielding audio in order.
+
+        Completed sentences are cut from text_stream as it arrives and sent
+        to TTS straight away, so the first audio follows the first sentence
+        rather than the whole text. While the previous call is still being
+        synthesized, further sentences are batched (up to
+        TTS_SEGMENT_MAX_CHARS) rather than each costing a request. The
+        finished narration is stored in the audio cache under its full text,
+        so replaying it through stream_long_audio is a cache hit.
+
+        Args:
+            text_stream: Pieces of the text, in order (e.g. StoryGenerator.stream_story)
+            voice_id: The ID of the voice to use
+            language_code: The language code
+            speaking_rate: The speaking rate
+            pitch: The pitch adjustment
+            audio_format: Output format, a key of AUDIO_FORMATS
+
+        Yields:
+            bytes: Audio for each batch of sentences, in text order
+        """
+        audio_cache = get_audio_cache()
+        ssml = TTS_SSML_SENTENCE_BREAK_MS > 0
+        synthesize = self._segment_audio if audio_cache and TTS_SEGMENT_CACHE_ENABLED else self._synthesize_chunk
+        # Synthesis tasks in text order; None once the text stream has ended
+        queue: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+        text_parts: List[str] = []
+
+        def dispatch(sentences: List[str]):
+            for chunk in self.chunk_text(" ".join(sentences)):
+                task = asyncio.create_task(synthesize(
+                    len(tasks) + 1, 0, chunk, voice_id, language_code, speaking_rate, pitch, ssml, audio_format
+                ))
+                tasks.append(task)
+                queue.put_nowait(task)
+
+        async def read_text():
+            buffer = ""
+            pending: List[str] = []
+            try:
+                async for piece in text_stream:
+                    text_parts.append(piece)
+                    buffer += piece
+                    sentences = split_sentences(buffer)
+                    if len(sentences) > 1:
+                        # The last sentence may still be growing; keep it and the whitespace after it
+                        pending.extend(sentences[:-1])
+                        buffer = sentences[-1] + buffer[len(buffer.rstrip()):]
+                    if pending and (
+                        not tasks or tasks[-1].done() or sum(len(s) + 1 for s in pending) > TTS_SEGMENT_MAX_CHARS
+                    ):
+                        dispatch(pending)
+                        pending = []
+                pending.extend(split_sentences(buffer))
+                if pending:
+                    dispatch(pending)
+            finally:
+                queue.put_nowait(None)
+                if hasattr(text_stream, "aclose"):
+                    await text_stream.aclose()
+
+        reader = asyncio.create_task(read_text())
+        assembler = AudioAssembler(audio_format)
+        audio_chunks = []
+        try:
+            while True:
+                task = await queue.get()
+                if task is None:
+                    break
+                audio = await task
+                if audio:
+                    audio = assembler.add(audio)
+                    audio_chunks.append(audio)
+                    yield audio
+            # Surface a failed text stream after the audio that was already written
+            await reader
+            tail = assembler.finish()
+            if tail:
+                audio_chunks.append(tail)
+                yield tail
+            if not audio_chunks:
+                raise ValueError("No audio chunks were generated")
+        except Exception as e:
+            print(f"Error narrating text stream: {str(e)}")
+            raise
+        finally:
+            reader.cancel()
+            for task in tasks:
+                task.cancel()
+
+        if audio_cache:
+            cache_key = audio_cache.key_for(
+                "".join(text_parts), voice_id, language_code, speaking_rate, pitch, audio_format
+            )
+            await audio_cache.put(cache_key, finalize_audio(b''.join(audio_chunks), audio_format))
@@ -0,0 +1,159 @@
+import re
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from mlb_storyteller.config import TTS_MAX_REQUEST_BYTES
+
+# A run of terminators plus any closing quotes or brackets, at the end of a word
+_SENTENCE_END = re.compile(r'[.!?…]+[\'"’”)\]]*(?= |$)')
+
+# Initials such as "J.D." (the final period is the one being tested)
+_INITIALS = re.compile(r'(?:[A-Z]\.)*[A-Z]')
+
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "mt", "ft", "lt", "sgt", "capt", "gen", "col", "prof", "rev",
+})
+
+_SSML_PREFIX = "<speak>"
+_SSML_SUFFIX = "</speak>"
+
+# Smallest budget that always fits one rendered character ("&amp;" or a 4-byte code point)
+_MIN_BUDGET = 8
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences in one pass.
+
+    A sentence ends at ``.``, ``!``, ``?`` or an ellipsis, together with any
+    closing quotes or brackets that follow, when the next word does not
+    start in lower case (so ``"Go!" he said`` stays whole). A period after a
+    known abbreviation or an initial ("St. Louis", "J.D. Martinez") is not
+    a boundary. A line break always is, so headings without punctuation
+    do not run into the next sentence. Whitespace is collapsed.
+
+    Args:
+        text: The text to split
+
+    Returns:
+        list: Sentences in text order
+    """
+    sentences = []
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        start = 0
+        for match in _SENTENCE_END.finditer(line):
+            end = match.end()
+            if end < len(line) and line[end + 1].islower():
+                continue
+            if match.group() == "." and _is_abbreviation(line, start, match.start()):
+                continue
+            sentences.append(line[start:end])
+            start = end + 1
+        if start < len(line):
+            sentences.append(line[start:])
+    return sentences
+
+
+def _is_abbreviation(line: str, start: int, period: int) -> bool:
+    """Whether the period at this index follows an abbreviation or an initial."""
+    word = line[line.rfind(" ", start, period) + 1:period]
+    return word.lower() in ABBREVIATIONS or bool(_INITIALS.fullmatch(word))
+
+
+def _fit(sentence: str, budget: int, ssml: bool) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    Render a sentence as pieces of at most budget bytes.
+
+    Returns:
+        list: (rendered text, UTF-8 size, glue) for each piece, where glue is
+        None for the first piece, " " after a word break and "" after a
+        break inside a word
+    """
+    rendered = escape(sentence) if ssml else sentence
+    size = len(rendered.encode('utf-8'))
+    if size <= budget:
+        return [(rendered, size, None)]
+
+    # Too long for one request: break at words, and inside any word that is itself too long
+    pieces = []
+    current, current_size = [], 0
+    for word in sentence.split(" "):
+        rendered = escape(word) if ssml else word
+        size = len(rendered.encode('utf-8'))
+        if current and current_size + 1 + size <= budget:
+            current.append(rendered)
+            current_size += 1 + size
+            continue
+        if current:
+            pieces.append((" ".join(current), current_size, " " if pieces else None))
+        if size <= budget:
+            current, current_size = [rendered], size
+            continue
+        current, current_size = [], 0
+        glue = " " if pieces else None
+        for char in word:
+            char = escape(char) if ssml else char
+            char_size = len(char.encode('utf-8'))
+            if current and current_size + char_size > budget:
+                pieces.append(("".join(current), current_size, glue))
+                current, current_size, glue = [], 0, ""
+            current.append(char)
+            current_size += char_size
+        pieces.append(("".join(current), current_size, glue))
+        current, current_size = [], 0
+    if current:
+        pieces.append((" ".join(current), current_size, " " if pieces else None))
+    return pieces
+
+
+def plan_chunks(text: str, max_bytes: int = TTS_MAX_REQUEST_BYTES, ssml_break_ms: int = 0) -> List[str]:
+    """
+    Split text into as few synthesize_speech inputs as fit the API's byte limit.
+
+    Sentences are packed greedily in order, so each chunk takes every
+    sentence that still fits; for an order-preserving split that is also the
+    fewest chunks possible. Size is measured in UTF-8 bytes of exactly what
+    is sent, markup included. Only a sentence that cannot fit on its own is
+    broken, at a word (or, for a runaway word, a character) boundary.
+    Runs in time linear in the length of the text.
+
+    Args:
+        text: The text to split
+        max_bytes: Byte limit per chunk
+        ssml_break_ms: If positive, emit SSML documents with a pause of this
+            many milliseconds between sentences instead of plain text
+
+    Returns:
+        list: Chunks in text order (SSML documents when ssml_break_ms is positive)
+    """
+    ssml = ssml_break_ms > 0
+    if ssml:
+        prefix, suffix = _SSML_PREFIX, _SSML_SUFFIX
+        sentence_glue = f' <break time="{int(ssml_break_ms)}ms"/> '
+    else:
+        prefix = suffix = ""
+        sentence_glue = " "
+    budget = max_bytes - len(prefix) - len(suffix)
+    if budget < _MIN_BUDGET:
+        raise ValueError(f"max_bytes of {max_bytes} is too small to hold any text")
+
+    chunks = []
+    current, current_size = [], 0
+    for sentence in split_sentences(text):
+        for piece, size, glue in _fit(sentence, budget, ssml):
+            glue = sentence_glue if glue is None else glue
+            if current and current_size + len(glue) + size > budget:
+                chunks.append(prefix + "".join(current) + suffix)
+                current, current_size = [], 0
+            if current:
+                current.append(glue)
+                current_size += len(glue)
+            current.append(piece)
+            current_size += size
+    if current:
+        chunks.append(prefix + "".join(current) + suffix)
+    return chunks
@@ -0,0 +1,240 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import (
+    CACHE_ENABLED,
+    TTS_MAX_REQUEST_BYTES,
+    TTS_SCHEDULER_BACKEND,
+    TTS_QUOTA_REQUESTS_PER_SECOND,
+    TTS_QUOTA_CHARACTERS_PER_MINUTE,
+    TTS_QUOTA_BURST_SECONDS,
+    TTS_QUOTA_BACKGROUND_RESERVE,
+    TTS_QUOTA_MAX_WAIT_SECONDS,
+)
+from mlb_storyteller.monitoring.metrics import metrics
+
+# Priority of TTS calls made while handling the current request or job
+tts_priority: ContextVar[str] = ContextVar("tts_priority", default="interactive")
+
+metrics.describe("tts_quota_wait_seconds", "Time synthesize_speech calls waited for quota, by priority")
+metrics.describe("tts_quota_timeouts_total", "TTS calls that gave up waiting for quota, by priority")
+
+# (key, capacity, refill per second, cost, level the bucket must stay above)
+BucketRequest = Tuple[str, float, float, float, float]
+
+
+class QuotaWaitExceeded(Exception):
+    """Raised when a TTS call cannot get quota within the maximum wait."""
+
+    def __init__(self, waited: float, retry_after: float):
+        self.waited = waited
+        self.retry_after = retry_after
+        super().__init__(f"TTS quota exhausted; waited {waited:.1f}s, next budget in {retry_after:.1f}s")
+
+
+class InMemoryTokenBuckets:
+    """Token buckets held by this worker only (for tests and single-worker runs)."""
+
+    def __init__(self):
+        # key -> (level, last refill time)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, buckets: List[BucketRequest]) -> float:
+        """
+        Take the cost from every bucket, or from none of them.
+
+        Returns:
+            float: 0 if taken, otherwise seconds until all buckets could cover their cost
+        """
+        now = time.monotonic()
+        levels = []
+        wait = 0.0
+        for key, capacity, rate, cost, floor in buckets:
+            level, updated = self._buckets.get(key, (capacity, now))
+            level = min(capacity, level + (now - updated) * rate)
+            levels.append(level)
+            wait = max(wait, (cost + floor - level) / rate)
+        if wait > 0:
+            return wait
+        for (key, _, _, cost, _), level in zip(buckets, levels):
+            self._buckets[key] = (level - cost, now)
+        return 0.0
+
+
+class RedisTokenBuckets:
+    """Token buckets in Redis, shared by every worker and instance.
+
+    Refill and take happen in one Lua script using the Redis clock, so
+    concurrent callers never overdraw a bucket and worker clocks do not
+    need to agree.
+    """
+
+    # ARGV holds capacity, rate, cost and floor for each key in turn.
+    # Levels are returned as strings because Redis truncates Lua numbers
+    TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 4 - 3])
+    local rate = tonumber(ARGV[i * 4 - 2])
+    local cost = tonumber(ARGV[i * 4 - 1])
+    local floor = tonumber(ARGV[i * 4])
+    local state = redis.call('HMGET', key, 'level', 'updated')
+    local level = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - updated) * rate)
+    levels[i] = level
+    wait = math.max(wait, (cost + floor - level) / rate)
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 4 - 3])
+    local rate = tonumber(ARGV[i * 4 - 2])
+    redis.call('HSET', key, 'level', tostring(levels[i] - tonumber(ARGV[i * 4 - 1])), 'updated', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+end
+return '0'
+"""
+
+    def __init__(self, redis_service: Optional[RedisService] = None):
+        """Initialize the buckets."""
+        self.redis = redis_service or RedisService()
+        # Used while Redis is unreachable, so TTS keeps working (paced per worker)
+        self._fallback = InMemoryTokenBuckets()
+
+    async def take(self, buckets: List[BucketRequest]) -> float:
+        """Take the cost from every bucket, or from none of them (see InMemoryTokenBuckets.take)."""
+        args = []
+        for _, capacity, rate, cost, floor in buckets:
+            args.extend([capacity, rate, cost, floor])
+        try:
+            result = await self.redis.eval_script(self.TAKE_SCRIPT, [key for key, *_ in buckets], args)
+        except Exception as e:
+            print(f"TTS quota check in Redis failed, pacing this worker alone: {str(e)}")
+            return await self._fallback.take(buckets)
+        if result is None:
+            # Redis is disabled
+            return await self._fallback.take(buckets)
+        return float(result)
+
+
+class TTSScheduler:
+    """Pace synthesize_speech calls within the project's TTS quota.
+
+    Every call needs one token from a requests-per-second bucket and one
+    per character from a characters-per-minute bucket. Each bucket holds up
+    to ``burst_seconds`` of unused budget, so short bursts go straight
+    through while sustained load is spread out instead of tripping quota
+    errors. With the Redis buckets the budget is shared by all workers.
+
+    Interactive calls may drain the buckets completely; background calls
+    (jobs) must leave ``background_reserve`` of each bucket's capacity
+    untouched, and within a worker they also wait while any interactive
+    call is waiting, so pre-generation never delays a listener.
+    """
+
+    def __init__(
+        self,
+        buckets=None,
+        requests_per_second: float = TTS_QUOTA_REQUESTS_PER_SECOND,
+        characters_per_minute: float = TTS_QUOTA_CHARACTERS_PER_MINUTE,
+        burst_seconds: float = TTS_QUOTA_BURST_SECONDS,
+        background_reserve: float = TTS_QUOTA_BACKGROUND_RESERVE,
+        max_wait: float = TTS_QUOTA_MAX_WAIT_SECONDS
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            buckets: InMemoryTokenBuckets or RedisTokenBuckets (chosen from TTS_SCHEDULER_BACKEND by default)
+            requests_per_second: Request budget; 0 leaves requests unlimited
+            characters_per_minute: Character budget; 0 leaves characters unlimited
+            burst_seconds: Seconds of budget each bucket can save up
+            background_reserve: Share of each bucket that background calls cannot use
+            max_wait: Seconds a call may wait before QuotaWaitExceeded
+        """
+        if buckets is None:
+            buckets = RedisTokenBuckets() if TTS_SCHEDULER_BACKEND == 'redis' and CACHE_ENABLED else InMemoryTokenBuckets()
+        self.buckets = buckets
+        self.requests_per_second = requests_per_second
+        self.characters_per_second = characters_per_minute / 60
+        self.burst_seconds = burst_seconds
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self._interactive_waiting = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_second > 0 or self.characters_per_second > 0
+
+    def _bucket_requests(self, characters: int, background: bool) -> List[BucketRequest]:
+        requests = []
+        if self.requests_per_second > 0:
+            capacity = max(1.0, self.requests_per_second * self.burst_seconds)
+            requests.append(("tts:quota:requests", capacity, self.requests_per_second, 1.0))
+        if self.characters_per_second > 0:
+            # Always big enough for the largest single request
+            capacity = max(float(TTS_MAX_REQUEST_BYTES), self.characters_per_second * self.burst_seconds)
+            requests.append(("tts:quota:characters", capacity, self.characters_per_second, float(min(characters, capacity))))
+        return [
+            (key, capacity, rate, cost, min(capacity * self.background_reserve, capacity - cost) if background else 0.0)
+            for key, capacity, rate, cost in requests
+        ]
+
+    async def acquire(self, characters: int, priority: Optional[str] = None) -> float:
+        """
+        Wait until a synthesize_speech call of this size fits the quota, and reserve it.
+
+        Args:
+            characters: Characters in the request (SSML markup included)
+            priority: 'interactive' or 'background' (from tts_priority by default)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            QuotaWaitExceeded: If the budget cannot be had within max_wait
+        """
+        if not self.enabled:
+            return 0.0
+        priority = priority or tts_priority.get()
+        background = priority == "background"
+        buckets = self._bucket_requests(characters, background)
+        start = time.monotonic()
+        deadline = start + self.max_wait
+
+        if not background:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                if background and self._interactive_waiting:
+                    wait = 0.05
+                else:
+                    wait = await self.buckets.take(buckets)
+                    if wait <= 0:
+                        break
+                if time.monotonic() + wait > deadline:
+                    metrics.inc("tts_quota_timeouts_total", {"priority": priority})
+                    raise QuotaWaitExceeded(time.monotonic() - start, wait)
+                await asyncio.sleep(wait)
+        finally:
+            if not background:
+                self._interactive_waiting -= 1
+
+        waited = time.monotonic() - start
+        metrics.observe("tts_quota_wait_seconds", waited, {"priority": priority})
+        return waited
+
+
+@lru_cache()
+def get_tts_scheduler() -> TTSScheduler:
+    """Get the worker-wide TTS scheduler."""
+    return TTSScheduler()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from mlb_storyteller.config import GAME_CONTEXT_CACHE_SIZE
+from mlb_storyteller.monitoring.llm_metrics import record_context_lookup
+
+
+class GameContext:
+    """Serialized game description shared by every prompt about a game.
+
+    Story, multi-style and quiz prompts all start with ``text``, so a backend
+    that caches prompt prefixes can be sent it once and referenced after
+    that. Contexts are memoized per game data version (see version_of) in
+    a bounded per-worker LRU, so the text is built once however many
+    prompts use it.
+    """
+
+    _cache: "OrderedDict[str, GameContext]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, version: str, text: str, build_seconds: float):
+        self.version = version
+        self.text = text
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def for_game(cls, game_data: Dict) -> "GameContext":
+        """
+        Get the context for a game, building it only for a new data version.
+
+        Args:
+            game_data: Processed game data
+
+        Returns:
+            GameContext: The memoized context
+        """
+        # Timed from before the version is worked out, so the savings a hit reports are net of it
+        start = time.perf_counter()
+        version = cls.version_of(game_data)
+        with cls._lock:
+            context = cls._cache.get(version)
+            if context is not None:
+                cls._cache.move_to_end(version)
+        if context is not None:
+            record_context_lookup(hit=True, seconds=time.perf_counter() - start, saved_seconds=context.build_seconds)
+            return context
+
+        build_start = time.perf_counter()
+        context = cls(version, cls._render(game_data), 0.0)
+        context.build_seconds = time.perf_counter() - build_start
+        with cls._lock:
+            cls._cache[version] = context
+            while len(cls._cache) > GAME_CONTEXT_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        record_context_lookup(hit=False, seconds=time.perf_counter() - start)
+        return context
+
+    @staticmethod
+    def version_of(game_data: Dict) -> str:
+        """
+        Key that changes whenever the game data changes.
+
+        Fetched feeds carry their game ID and the feed's update timestamp,
+        which is enough. Anything else (game data supplied by a client) is
+        hashed, which costs milliseconds for a full feed.
+        """
+        if game_data.get('game_pk') and game_data.get('data_version'):
+            return f"{game_data['game_pk']}:{game_data['data_version']}"
+        digest = hashlib.sha256(json.dumps(game_data, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def _render(game_data: Dict) -> str:
+        summary = game_data.get('summary', {})
+        home_team = summary.get('home_team', 'Unknown Team')
+        away_team = summary.get('away_team', 'Unknown Team')
+        home_score = summary.get('home_score', 0)
+        away_score = summary.get('away_score', 0)
+        status = summary.get('status', 'Unknown')
+
+        # Get key plays, falling back to the scoring plays from the processed feed
+        key_plays = game_data.get('key_plays') or (game_data.get('plays') or {}).get('scoring_plays', [])
+        play_descriptions = [
+            f"- {play['description']}"
+            for play in key_plays
+            if play.get('description')
+        ]
+
+        details = ""
+        if summary.get('venue'):
+            details += f"\n        Venue: {summary['venue']}"
+        if summary.get('game_date'):
+            details += f"\n        Date: {summary['game_date']}"
+
+        return f"""
+        Game Summary:
+        {home_team} vs {away_team}
+        Score: {home_team} {home_score}, {away_team} {away_score}
+        Status: {status}{details}
+
+        Key Plays:
+        {chr(10).join(play_descriptions) if play_descriptions else "No key plays available yet"}
+        """
@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from mlb_storyteller.config import (
+    LIVE_STORY_TTL,
+    LIVE_STORY_SUMMARY_MAX_CHARS,
+    LIVE_STORY_MAX_CATCHUP_HALVES,
+    LIVE_STORY_MAX_PLAYS_PER_HALF,
+    LIVE_STORY_LOCK_TTL_SECONDS,
+    LIVE_STORY_LOCK_WAIT_SECONDS,
+)
+
+
+class LiveStoryTeller:
+    """Build a live game narrative one half-inning at a time.
+
+    The narrative is stored as segments keyed by the ``plays_by_inning`` keys
+    they cover (e.g. ``7_top``) together with a short running summary. Each
+    update only sends the newly completed half-innings and that summary to
+    the model, so the cost of an update stays flat however long the game
+    runs. When a client falls more than LIVE_STORY_MAX_CATCHUP_HALVES behind
+    (e.g. the first request of a game already in the 6th), the backlog is
+    covered by a single catch-up segment built from its scoring plays.
+    """
+
+    SEGMENT_MARKER = "=== SEGMENT ==="
+    SUMMARY_MARKER = "=== SUMMARY ==="
+    SECTION_PATTERN = re.compile(r'^[\s#*]*=+\s*(SEGMENT|SUMMARY)\s*=+[\s*]*$', re.MULTILINE | re.IGNORECASE)
+
+    # Inning states from the linescore that mean the last half-inning is over
+    BETWEEN_HALVES = ('middle', 'end')
+
+    # Seconds between attempts to take the lock of a story another refresh is updating
+    LOCK_POLL_INTERVAL = 0.2
+
+    def __init__(self, generator):
+        """
+        Initialize the live storyteller.
+
+        Args:
+            generator: StoryGenerator used for model calls and caching
+        """
+        self.generator = generator
+
+    async def update(
+        self,
+        game_id: str,
+        game_data: Dict,
+        user_preferences: Dict,
+        style: str = "dramatic"
+    ) -> Dict:
+        """
+        Bring the stored narrative up to date with the latest completed half-inning.
+
+        Args:
+            game_id: MLB game ID
+            game_data: Processed game data
+            user_preferences: User's preferences (favorite team, players, etc.)
+            style: Narrative style (dramatic, analytical, humorous)
+
+        Returns:
+            dict: The full 'story', its 'segments', the running 'summary',
+                'last_half_inning' narrated, 'new_segments' added by this
+                update and whether the game is 'final'
+        """
+        state_key = self._state_key(game_id, user_preferences, style)
+        lock_key = f"{state_key}:lock"
+        token = uuid.uuid4().hex
+        locked = await self._acquire_lock(lock_key, token)
+        if locked is None:
+            # Another refresh held the lock for the whole wait; it is appending
+            # the same half-innings, so return what is stored
+            state = await self.generator._cache_get(state_key) or {'segments': [], 'summary': ''}
+            return self._response(state, 0, self._completed_halves(game_data)[1])
+        try:
+            return await self._update_state(state_key, game_data, user_preferences, style)
+        finally:
+            if locked:
+                try:
+                    await self.generator.cache.release_lock(lock_key, token)
+                except Exception as e:
+                    print(f"Failed to release live story lock {lock_key}: {str(e)}")
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> Optional[bool]:
+        """
+        Wait for the per-story lock, so concurrent refreshes cannot append the same half-inning twice.
+
+        Returns:
+            Optional[bool]: True if locked, False if there is no shared state
+                to protect (cache disabled or unreachable), None if the wait ran out
+        """
+        cache = self.generator.cache
+        if not cache.enabled:
+            return False
+        deadline = time.monotonic() + LIVE_STORY_LOCK_WAIT_SECONDS
+        while True:
+            try:
+                if await cache.acquire_lock(lock_key, token, LIVE_STORY_LOCK_TTL_SECONDS * 1000):
+                    return True
+            except Exception as e:
+                print(f"Live story lock unavailable, updating without it: {str(e)}")
+                return False
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+
+    async def _update_state(self, state_key: str, game_data: Dict, user_preferences: Dict, style: str) -> Dict:
+        """Read the stored narrative, append the missing half-innings and store it again."""
+        state = await self.generator._cache_get(state_key) or {'segments': [], 'summary': ''}
+        covered = {key for segment in state['segments'] for key in segment['keys']}
+
+        halves, final = self._completed_halves(game_data)
+        missing = [key for key in halves if key not in covered]
+        scores = self._scores_after(game_data)
+
+        new_segments = 0
+        if missing:
+            if len(missing) > LIVE_STORY_MAX_CATCHUP_HALVES:
+                batches = [missing[:-1], missing[-1:]]
+            else:
+                batches = [[key] for key in missing]
+
+            for keys in batches:
+                prompt = self._construct_segment_prompt(game_data, user_preferences, style, state['summary'], keys, scores)
+                response_text = await self.generator._complete(prompt, task="story_segment", style=style)
+                text, summary = self._split_segment_response(response_text)
+                if not text:
+                    raise ValueError(f"Empty story segment for {', '.join(keys)}")
+                state['segments'].append({'keys': keys, 'text': text})
+                state['summary'] = self._trim_summary(summary or f"{state['summary']} {self._first_sentence(text)}")
+                new_segments += 1
+
+            state['updated_at'] = time.time()
+            await self.generator._cache_set(state_key, state, expire=LIVE_STORY_TTL)
+
+        return self._response(state, new_segments, final)
+
+    @staticmethod
+    def _response(state: Dict, new_segments: int, final: bool) -> Dict:
+        return {
+            'story': "\n\n".join(segment['text'] for segment in state['segments']),
+            'segments': state['segments'],
+            'summary': state['summary'],
+            'last_half_inning': state['segments'][-1]['keys'][-1] if state['segments'] else None,
+            'new_segments': new_segments,
+            'final': final,
+        }
+
+    def _completed_halves(self, game_data: Dict) -> Tuple[List[str], bool]:
+        """Return the half-inning keys that are finished, in game order, and whether the game is over."""
+        keys = list(((game_data.get('plays') or {}).get('plays_by_inning') or {}).keys())
+        game_state = game_data.get('game_state') or {}
+        final = bool(game_data.get('result')) or game_state.get('abstract_state') == 'Final'
+        if not keys or final:
+            return keys, final
+        # The last half-inning is still being played unless the linescore says otherwise
+        if (game_state.get('inning_half') or '').lower() in self.BETWEEN_HALVES:
+            return keys, final
+        return keys[:-1], final
+
+    @staticmethod
+    def _scores_after(game_data: Dict) -> Dict[str, Tuple[int, int]]:
+        """Replay runs scored to get the (away, home) score after each half-inning."""
+        away = home = 0
+        scores = {}
+        for key, plays in ((game_data.get('plays') or {}).get('plays_by_inning') or {}).items():
+            runs = sum(
+                1 for play in plays for runner in play.get('runners', [])
+                if runner.get('end_base') == 'score'
+            )
+            if key.endswith('_bottom'):
+                home += runs
+            else:
+                away += runs
+            scores[key] = (away, home)
+        return scores
+
+    def _construct_segment_prompt(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        style: str,
+        running_summary: str,
+        keys: List[str],
+        scores: Dict[str, Tuple[int, int]]
+    ) -> str:
+        """Construct a prompt for the part of the story covering the given half-innings."""
+        summary = game_data.get('summary', {})
+        home_team = summary.get('home_team', 'Unknown Team')
+        away_team = summary.get('away_team', 'Unknown Team')
+        plays_by_inning = (game_data.get('plays') or {}).get('plays_by_inning') or {}
+        catch_up = len(keys) > 1
+
+        play_lines = []
+        for key in keys:
+            plays = [play for play in plays_by_inning.get(key, []) if play.get('description')]
+            if catch_up:
+                # Catch-up segments only cover the runs, to keep the prompt small
+                plays = [play for play in plays if play.get('is_scoring_play')]
+                if not plays:
+                    continue
+            play_lines.append(f"{self._half_label(key)}:")
+            play_lines.extend(f"- {play['description']}" for play in plays[:LIVE_STORY_MAX_PLAYS_PER_HALF])
+
+        away_score, home_score = scores.get(keys[-1], (summary.get('away_score', 0), summary.get('home_score', 0)))
+        favorite_team = user_preferences.get('favorite_team')
+        favorite_players = user_preferences.get('favorite_players', [])
+        if catch_up:
+            task = (
+                f"Write 1-2 short paragraphs catching the reader up on the game from the "
+                f"{self._half_label(keys[0])} through the {self._half_label(keys[-1])}."
+            )
+        else:
+            task = (
+                f"Write 1-2 short paragraphs covering only the {self._half_label(keys[0])}, "
+                f"continuing naturally from the story so far. Do not retell earlier innings."
+            )
+
+        return f"""
+        As a baseball storyteller, continue a {style} live narrative of {away_team} at {home_team}.
+
+        Story so far (summary):
+        {running_summary or "The game has just begun."}
+
+        New plays:
+        {(chr(10) + "        ").join(play_lines) if play_lines else "No scoring in these innings."}
+
+        Score after these plays: {away_team} {away_score}, {home_team} {home_score}
+
+        {task}
+        Focus on:
+        - {'Your favorite team: ' + favorite_team if favorite_team else 'Both teams equally'}
+        - Key players: {', '.join(favorite_players) if favorite_players else 'All notable performances'}
+
+        Style Guide:
+        - If "dramatic": Create an emotional and engaging narrative that captures the excitement
+        - If "analytical": Focus on statistics, strategy, and technical aspects
+        - If "humorous": Add wit and light-hearted observations
+        Strictly avoid mentioning the style in the story.
+
+        Then write an updated summary of the whole game so far in at most 3 sentences.
+
+        Format your response EXACTLY like this:
+        {self.SEGMENT_MARKER}
+        <the new part of the story>
+        {self.SUMMARY_MARKER}
+        <the updated summary>
+        """
+
+    @classmethod
+    def _split_segment_response(cls, response_text: str) -> Tuple[str, Optional[str]]:
+        """Split a response into the story segment and the updated summary.
+
+        Without markers the whole response is taken as the segment and no
+        summary is returned.
+        """
+        sections = {}
+        matches = list(cls.SECTION_PATTERN.finditer(response_text))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response_text)
+            sections.setdefault(match.group(1).upper(), response_text[match.end():end].strip())
+        if 'SEGMENT' not in sections:
+            return response_text.strip(), sections.get('SUMMARY') or None
+        return sections['SEGMENT'], sections.get('SUMMARY') or None
+
+    @staticmethod
+    def _trim_summary(summary: str) -> str:
+        """Keep the running summary within LIVE_STORY_SUMMARY_MAX_CHARS, dropping the oldest text."""
+        summary = " ".join(summary.split())
+        if len(summary) <= LIVE_STORY_SUMMARY_MAX_CHARS:
+            return summary
+        tail = summary[-LIVE_STORY_SUMMARY_MAX_CHARS:]
+        sentence_start = tail.find('. ')
+        return tail[sentence_start + 2:] if sentence_start != -1 else tail
+
+    @staticmethod
+    def _first_sentence(text: str) -> str:
+        match = re.match(r'.+?[.!?](\s|$)', " ".join(text.split()))
+        return match.group(0).strip() if match else text.strip()
+
+    @staticmethod
+    def _half_label(key: str) -> str:
+        inning, _, half = key.partition('_')
+        try:
+            number = int(inning)
+        except ValueError:
+            return key
+        suffix = 'th' if 10 <= number % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+        return f"{half.title()} of the {number}{suffix}"
+
+    def _state_key(self, game_id: str, user_preferences: Dict, style: str) -> str:
+        """Storage key for one fan's live narrative of a game."""
+        focus = {
+            'favorite_team': user_preferences.get('favorite_team'),
+            'favorite_players': sorted(user_preferences.get('favorite_players', [])),
+        }
+        digest = hashlib.sha256(json.dumps(focus, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return f"live_story:{self.generator.backend.name}:{game_id}:{style}:{digest}"
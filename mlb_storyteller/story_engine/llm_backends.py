@@ -0,0 +1,385 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from mlb_storyteller.config import (
+    LLM_BACKEND,
+    GEMINI_MODEL_NAME,
+    STUB_LLM_LATENCY_DISTRIBUTION,
+    STUB_LLM_LATENCY_MS,
+    STUB_LLM_LATENCY_SPREAD_MS,
+    STUB_LLM_CHUNK_CHARS,
+    STUB_LLM_CHUNK_INTERVAL_MS,
+    STUB_LLM_STORY_PARAGRAPHS,
+    STUB_LLM_SEED,
+    GAME_CONTEXT_CACHE_SIZE,
+)
+
+load_dotenv()
+
+
+class LLMResponse:
+    """Text returned by an LLM backend for a single prompt.
+
+    Token counts are filled in when the backend reports them and left as
+    None otherwise.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        prompt_tokens: Optional[int] = None,
+        response_tokens: Optional[int] = None,
+    ):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.response_tokens = response_tokens
+
+
+class ContextHandleExpired(ValueError):
+    """Raised when a call references a cached context the backend no longer holds."""
+
+
+class LLMBackend:
+    """Interface for the text generation backends used by StoryGenerator.
+
+    ``task`` tells the backend what kind of output the prompt asks for
+    (``"story"``, ``"story_batch"``, ``"story_segment"``, ``"quiz"`` or
+    ``"quiz_batch"``). Real models ignore it; the stub uses it to decide
+    which canned response shape to return.
+
+    Backends with ``supports_context_cache`` can hold a prompt prefix
+    server-side: ``cache_context`` uploads it once and returns a handle, and
+    later calls pass the handle with only the rest of the prompt. A call
+    whose handle the backend has already dropped raises ContextHandleExpired.
+    """
+
+    name = "base"
+    supports_context_cache = False
+
+    # Rough characters-per-token ratio for English prose, used when the
+    # backend does not report usage
+    CHARS_PER_TOKEN = 4
+
+    def estimate_tokens(self, text: str) -> int:
+        """Estimate the token count of a piece of text."""
+        if not text:
+            return 0
+        return max(1, round(len(text) / self.CHARS_PER_TOKEN))
+
+    async def cache_context(self, text: str, ttl_seconds: int) -> Optional[str]:
+        """Cache a prompt prefix on the backend and return its handle.
+
+        Returns None when the backend has no prefix cache.
+        """
+        return None
+
+    async def generate(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> LLMResponse:
+        """Generate the full response for a prompt, after the cached context if a handle is given."""
+        raise NotImplementedError
+
+    async def stream(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield the response for a prompt as text chunks.
+
+        Backends without native streaming return the whole response as a
+        single chunk.
+        """
+        response = await self.generate(prompt, task, context_handle)
+        yield response.text
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini backend.
+
+    The pinned google-generativeai release has no context caching API, so
+    every call sends the full prompt.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = GEMINI_MODEL_NAME):
+        """Configure the Gemini client."""
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> LLMResponse:
+        response = await self.model.generate_content_async(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata only)
+                continue
+            if text:
+                yield text
+
+
+class StubBackend(LLMBackend):
+    """Deterministic local backend for load testing.
+
+    The response text depends only on the prompt, so identical requests get
+    identical output. Latency is simulated: the first chunk arrives after a
+    delay drawn from the configured distribution, and the remaining chunks
+    follow at a fixed cadence. ``generate`` sleeps for the same total time a
+    full stream would take, so both paths have comparable cost.
+
+    It also simulates a prefix cache: cached contexts live in a class-level
+    registry (standing in for server-side storage shared by every worker
+    connection), and calls that reference one only count the uncached part
+    of the prompt as prompt tokens.
+    """
+
+    name = "stub"
+    supports_context_cache = True
+
+    # Cached contexts by handle: (text, expiry timestamp), least recently used first
+    _contexts: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    # One latency generator per seed for the whole worker. Backends are built
+    # per request, so a generator per instance would replay the same first
+    # draws for every request instead of sampling the distribution
+    _rngs: Dict[Optional[int], random.Random] = {}
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    STORY_SENTENCES = [
+        "The crowd settled in as the first pitch cut through the evening air.",
+        "Both starters traded zeros early, each working quickly and pounding the zone.",
+        "A two-out single in the fourth finally gave the offense something to cheer about.",
+        "The bullpen door swung open in the sixth and the tempo of the game changed.",
+        "A diving stop at third base kept the inning alive for only a moment longer.",
+        "With runners on the corners, the dugout leaned forward on the rail.",
+        "A line drive into the gap emptied the bases and flipped the momentum.",
+        "The closer needed just eleven pitches to slam the door in the ninth.",
+        "Fans lingered in the stands long after the final out was recorded.",
+        "It was the kind of game that rewards patience at the plate.",
+        "A stolen base in the seventh put the tying run in scoring position.",
+        "The veteran catcher called a masterful game behind the plate.",
+    ]
+
+    def __init__(
+        self,
+        latency_distribution: str = STUB_LLM_LATENCY_DISTRIBUTION,
+        latency_ms: float = STUB_LLM_LATENCY_MS,
+        latency_spread_ms: float = STUB_LLM_LATENCY_SPREAD_MS,
+        chunk_chars: int = STUB_LLM_CHUNK_CHARS,
+        chunk_interval_ms: float = STUB_LLM_CHUNK_INTERVAL_MS,
+        story_paragraphs: int = STUB_LLM_STORY_PARAGRAPHS,
+        seed: Optional[int] = STUB_LLM_SEED,
+    ):
+        """Configure simulated latency and output size."""
+        if latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown stub latency distribution '{latency_distribution}'. "
+                f"Expected one of: {', '.join(self.DISTRIBUTIONS)}"
+            )
+
+        self.latency_distribution = latency_distribution
+        self.latency_ms = max(0.0, latency_ms)
+        self.latency_spread_ms = max(0.0, latency_spread_ms)
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_interval_ms = max(0.0, chunk_interval_ms)
+        self.story_paragraphs = max(1, story_paragraphs)
+        self.random = self._rngs.setdefault(seed, random.Random(seed))
+
+    def sample_latency_ms(self) -> float:
+        """Draw a time-to-first-chunk sample in milliseconds."""
+        mean = self.latency_ms
+        spread = self.latency_spread_ms
+
+        if self.latency_distribution == "fixed" or mean == 0:
+            sample = mean
+        elif self.latency_distribution == "uniform":
+            sample = self.random.uniform(mean - spread, mean + spread)
+        elif self.latency_distribution == "normal":
+            sample = self.random.gauss(mean, spread)
+        elif self.latency_distribution == "lognormal":
+            # Parameterised so that the median equals latency_ms and
+            # latency_spread_ms controls the width of the long tail.
+            sigma = spread / mean if mean else 0.0
+            sample = mean * self.random.lognormvariate(0.0, sigma)
+        else:
+            sample = self.random.expovariate(1.0 / mean)
+
+        return max(0.0, sample)
+
+    def render(self, prompt: str, task: str = "story") -> str:
+        """Build the deterministic response text for a prompt."""
+        digest = hashlib.sha256(f"{task}\0{prompt}".encode("utf-8")).digest()
+        if task == "quiz":
+            return self._render_quiz(digest)
+        if task == "story_batch":
+            return self._render_story_batch(prompt, digest)
+        if task == "quiz_batch":
+            return self._render_quiz_batch(prompt, digest)
+        if task == "story_segment":
+            return self._render_story_segment(digest)
+        return self._render_story(digest)
+
+    def _render_story(self, digest: bytes) -> str:
+        sentences = self.STORY_SENTENCES
+        paragraphs = []
+        for p in range(self.story_paragraphs):
+            start = digest[p % len(digest)] % len(sentences)
+            paragraphs.append(" ".join(
+                sentences[(start + i) % len(sentences)] for i in range(4)
+            ))
+        return "\n\n".join(paragraphs)
+
+    def _render_story_batch(self, prompt: str, digest: bytes) -> str:
+        # One story per style marker line in the prompt, in the same layout
+        styles = list(dict.fromkeys(re.findall(r"=== STYLE: ([A-Za-z_-]+) ===", prompt)))
+        sections = []
+        for style in styles:
+            style_digest = hashlib.sha256(digest + style.encode("utf-8")).digest()
+            sections.append(f"=== STYLE: {style} ===\n{self._render_story(style_digest)}")
+        return "\n\n".join(sections)
+
+    def _render_story_segment(self, digest: bytes) -> str:
+        sentences = self.STORY_SENTENCES
+        start = digest[0] % len(sentences)
+        segment = " ".join(sentences[(start + i) % len(sentences)] for i in range(3))
+        summary = sentences[digest[1] % len(sentences)]
+        return f"=== SEGMENT ===\n{segment}\n=== SUMMARY ===\n{summary}"
+
+    def _render_quiz(self, digest: bytes) -> str:
+        return json.dumps({"questions": self._quiz_questions(digest, 5)}, indent=2)
+
+    def _render_quiz_batch(self, prompt: str, digest: bytes) -> str:
+        # One entry per game summary line in the prompt
+        games = []
+        for game_id, wanted in re.findall(r'"game_id": "([^"]+)", "questions_wanted": (\d+)', prompt):
+            game_digest = hashlib.sha256(digest + game_id.encode("utf-8")).digest()
+            games.append({"game_id": game_id, "questions": self._quiz_questions(game_digest, min(int(wanted), 5))})
+        return json.dumps({"games": games}, indent=2)
+
+    def _quiz_questions(self, digest: bytes, count: int) -> List[Dict]:
+        questions = []
+        for i in range(count):
+            home = digest[i] % 10
+            away = digest[i + 5] % 10
+            options = [f"{home + n}-{away}" for n in range(4)]
+            questions.append({
+                "question": f"Stub question {i + 1}: what was the score after inning {i + 3}?",
+                "options": options,
+                "correct_answer": options[digest[i + 10] % 4],
+                "explanation": "This answer comes from the deterministic stub backend.",
+            })
+        return questions
+
+    def _split_chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    async def cache_context(self, text: str, ttl_seconds: int) -> Optional[str]:
+        handle = "ctx-" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        now = time.time()
+        contexts = StubBackend._contexts
+        contexts[handle] = (text, now + ttl_seconds)
+        contexts.move_to_end(handle)
+        # Expired contexts are gone server-side too; the size cap keeps a long load test bounded
+        for stale in [stale for stale, (_, expires_at) in contexts.items() if expires_at < now]:
+            del contexts[stale]
+        while len(contexts) > GAME_CONTEXT_CACHE_SIZE:
+            contexts.popitem(last=False)
+        return handle
+
+    def _resolve_context(self, context_handle: Optional[str]) -> str:
+        if not context_handle:
+            return ""
+        contexts = StubBackend._contexts
+        text, expires_at = contexts.get(context_handle, (None, 0.0))
+        if text is None or expires_at < time.time():
+            contexts.pop(context_handle, None)
+            raise ContextHandleExpired(f"Unknown or expired context handle '{context_handle}'")
+        # Evict by use, like StoryGenerator's handle map, so a busy game keeps its context
+        contexts.move_to_end(context_handle)
+        return text
+
+    async def generate(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> LLMResponse:
+        # Render from the full prompt so cached and uncached calls match
+        text = self.render(self._resolve_context(context_handle) + prompt, task)
+        chunk_count = len(self._split_chunks(text))
+        delay_ms = self.sample_latency_ms() + max(0, chunk_count - 1) * self.chunk_interval_ms
+        await asyncio.sleep(delay_ms / 1000)
+        return LLMResponse(
+            text=text,
+            prompt_tokens=self.estimate_tokens(prompt),
+            response_tokens=self.estimate_tokens(text),
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        task: str = "story",
+        context_handle: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        chunks = self._split_chunks(self.render(self._resolve_context(context_handle) + prompt, task))
+        await asyncio.sleep(self.sample_latency_ms() / 1000)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(self.chunk_interval_ms / 1000)
+            yield chunk
+
+
+LLM_BACKENDS: Dict[str, type] = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_llm_backend(name: Optional[str] = None) -> LLMBackend:
+    """Create the LLM backend selected by name or the LLM_BACKEND setting."""
+    name = (name or LLM_BACKEND).lower()
+    if name not in LLM_BACKENDS:
+        raise ValueError(
+            f"Unknown LLM backend '{name}'. Expected one of: {', '.join(LLM_BACKENDS)}"
+        )
+    return LLM_BACKENDS[name]()
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from mlb_storyteller.config import LLM_MAX_CONCURRENCY
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a request waits too long for a free LLM slot."""
+
+    def __init__(self, waited: float):
+        self.waited = waited
+        super().__init__(f"LLM queue is saturated (waited {waited * 1000:.0f} ms for a slot)")
+
+
+class LLMQueue:
+    """Per-worker cap on concurrent LLM calls.
+
+    Callers wait in FIFO order for one of ``max_concurrency`` slots. A caller
+    that gives a ``timeout`` is rejected with LLMOverloadedError once it has
+    waited that long, so it can fall back instead of blocking.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        """Initialize the queue."""
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.waiting = 0
+        self.active = 0
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[float]:
+        """Hold an LLM slot for the duration of the block.
+
+        Yields the time spent waiting for the slot, in seconds.
+        """
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            if timeout is None:
+                await self._semaphore.acquire()
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            raise LLMOverloadedError(time.perf_counter() - start)
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield time.perf_counter() - start
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+@lru_cache()
+def get_llm_queue() -> LLMQueue:
+    """Get the worker-wide LLM queue shared by all StoryGenerators."""
+    return LLMQueue()
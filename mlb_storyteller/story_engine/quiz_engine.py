@@ -0,0 +1,223 @@
+import random
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+
+class RuleBasedQuizEngine:
+    """Build factual quiz questions directly from processed game data.
+
+    Every question is derived from fields the MLB feed already gives us
+    (final score, decisions, scoring plays, team stats), so the answers are
+    correct by construction and no LLM call is needed. Questions whose data
+    is missing are skipped rather than guessed.
+    """
+
+    def build(self, game_data: Dict) -> List[Dict]:
+        """
+        Build quiz questions for a game.
+
+        Args:
+            game_data: Processed game data from MLBDataFetcher
+
+        Returns:
+            list: Questions in the same shape the LLM quiz uses
+        """
+        summary = game_data.get('summary', {}) or {}
+        rng = random.Random(zlib.crc32(
+            f"{summary.get('home_team')}|{summary.get('away_team')}|{summary.get('game_date')}".encode('utf-8')
+        ))
+
+        builders = [
+            self._final_score_question,
+            self._winning_pitcher_question,
+            self._go_ahead_inning_question,
+            self._team_hits_question,
+            self._team_strikeouts_question,
+        ]
+
+        questions = []
+        for builder in builders:
+            question = builder(game_data, rng)
+            if question:
+                question['source'] = 'game_data'
+                questions.append(question)
+        return questions
+
+    def _final_score_question(self, game_data: Dict, rng: random.Random) -> Optional[Dict]:
+        if not game_data.get('result'):
+            return None
+        summary = game_data.get('summary', {})
+        home, away = summary.get('home_team'), summary.get('away_team')
+        home_score, away_score = summary.get('home_score'), summary.get('away_score')
+        if not home or not away or home_score is None or away_score is None:
+            return None
+
+        high, low = max(home_score, away_score), min(home_score, away_score)
+        correct = f"{high}-{low}"
+        candidates = [f"{high + 1}-{low}", f"{high}-{low + 1}", f"{high + 2}-{low + 1}", f"{high + 1}-{max(0, low - 1)}"]
+        if high - low > 1:
+            candidates.insert(0, f"{high - 1}-{low}")
+        winner = home if home_score > away_score else away
+        return self._question(
+            f"What was the final score of the {away} at {home} game?",
+            correct,
+            candidates,
+            f"The {winner} won the game {correct}.",
+            rng,
+        )
+
+    def _winning_pitcher_question(self, game_data: Dict, rng: random.Random) -> Optional[Dict]:
+        result = game_data.get('result') or {}
+        winner = self._player_name(result.get('winning_pitcher'))
+        if not winner:
+            return None
+
+        names = [
+            self._player_name(result.get('losing_pitcher')),
+            self._player_name(result.get('save')),
+        ]
+        names += [leader.get('name') for leader in (game_data.get('leaders') or {}).get('pitching', [])]
+        for play in (game_data.get('plays') or {}).get('all_plays', []):
+            names.append(self._player_name(play.get('pitcher')))
+
+        return self._question(
+            "Which pitcher earned the win in this game?",
+            winner,
+            names,
+            f"{winner} was credited with the win for the {result.get('winner', 'winning team')}.",
+            rng,
+        )
+
+    def _go_ahead_inning_question(self, game_data: Dict, rng: random.Random) -> Optional[Dict]:
+        found = self._find_go_ahead_play(game_data)
+        if not found:
+            return None
+        inning, half, description = found
+
+        correct = self._inning_label(inning, half)
+        scheduled = (game_data.get('summary') or {}).get('scheduled_innings') or 9
+        candidates = [
+            self._inning_label(n, h)
+            for n in range(1, max(scheduled, inning) + 1)
+            for h in ('top', 'bottom')
+        ]
+        return self._question(
+            "In which inning did the winning team score the go-ahead run for good?",
+            correct,
+            candidates,
+            f"The go-ahead run came in the {correct}: {description}",
+            rng,
+        )
+
+    def _team_hits_question(self, game_data: Dict, rng: random.Random) -> Optional[Dict]:
+        return self._team_stat_question(
+            game_data, rng, 'batting', 'hits',
+            "How many hits did the {team} collect in this game?",
+            "The {team} finished with {value} hits.",
+        )
+
+    def _team_strikeouts_question(self, game_data: Dict, rng: random.Random) -> Optional[Dict]:
+        return self._team_stat_question(
+            game_data, rng, 'pitching', 'strikeouts',
+            "How many strikeouts did {team} pitchers record?",
+            "{team} pitching combined for {value} strikeouts.",
+        )
+
+    def _team_stat_question(
+        self,
+        game_data: Dict,
+        rng: random.Random,
+        group: str,
+        stat: str,
+        question: str,
+        explanation: str,
+    ) -> Optional[Dict]:
+        if not game_data.get('result'):
+            return None
+        summary = game_data.get('summary', {})
+        team_stats = game_data.get('team_stats') or {}
+        side = rng.choice(['home', 'away'])
+        team = summary.get(f'{side}_team')
+        value = (team_stats.get(side) or {}).get(group, {}).get(stat)
+        if not team or not isinstance(value, int) or value <= 0:
+            return None
+
+        candidates = [value + delta for delta in (-3, -2, -1, 1, 2, 3) if value + delta >= 0]
+        return self._question(
+            question.format(team=team),
+            str(value),
+            [str(c) for c in candidates],
+            explanation.format(team=team, value=value),
+            rng,
+        )
+
+    def _find_go_ahead_play(self, game_data: Dict) -> Optional[Tuple[int, str, str]]:
+        """Replay the scoring to find when the eventual winner took the lead for good.
+
+        Runs are counted from runner movements ending at 'score'. If the
+        replayed totals don't match the final score, the data is incomplete
+        and no answer is returned.
+        """
+        summary = game_data.get('summary') or {}
+        if not game_data.get('result'):
+            return None
+        home_final, away_final = summary.get('home_score'), summary.get('away_score')
+        if home_final is None or away_final is None or home_final == away_final:
+            return None
+        winner_is_home = home_final > away_final
+
+        home = away = 0
+        go_ahead = None
+        for play in (game_data.get('plays') or {}).get('all_plays', []):
+            runs = sum(1 for runner in play.get('runners', []) if runner.get('end_base') == 'score')
+            if not runs:
+                continue
+            half = (play.get('half_inning') or '').lower()
+            was_leading = (home > away) if winner_is_home else (away > home)
+            if half == 'bottom':
+                home += runs
+            else:
+                away += runs
+            now_leading = (home > away) if winner_is_home else (away > home)
+            if now_leading and not was_leading:
+                go_ahead = (play.get('inning'), half or 'top', play.get('description') or '')
+
+        if (home, away) != (home_final, away_final) or not go_ahead or not go_ahead[0]:
+            return None
+        return go_ahead
+
+    def _question(
+        self,
+        question: str,
+        correct: str,
+        candidates: List[Optional[str]],
+        explanation: str,
+        rng: random.Random,
+    ) -> Optional[Dict]:
+        """Assemble a 4-option question, or None if there aren't 3 distinct distractors."""
+        distractors = []
+        for candidate in candidates:
+            if candidate and candidate != correct and candidate not in distractors:
+                distractors.append(candidate)
+        if len(distractors) < 3:
+            return None
+
+        options = [correct] + rng.sample(distractors, 3)
+        rng.shuffle(options)
+        return {
+            'question': question,
+            'options': options,
+            'correct_answer': correct,
+            'explanation': explanation,
+        }
+
+    @staticmethod
+    def _inning_label(inning: int, half: str) -> str:
+        suffix = 'th' if 10 <= inning % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(inning % 10, 'th')
+        return f"{half.title()} of the {inning}{suffix}"
+
+    @staticmethod
+    def _player_name(player: Optional[Dict]) -> Optional[str]:
+        if not player:
+            return None
+        return player.get('fullName') or player.get('name')
@@ -0,0 +1,108 @@
+import json
+from typing import Dict, List
+
+
+class IncrementalQuizParser:
+    """Pull complete question objects out of a streaming quiz JSON response.
+
+    Feed the model output as it arrives. Once the ``"questions"`` array has
+    started, every top-level object in it is returned as soon as its closing
+    brace arrives, without waiting for the rest of the document. Each
+    character is scanned once, so total work is linear in the response
+    length. Objects that are not valid JSON are skipped.
+    """
+
+    def __init__(self):
+        """Initialize the parser state."""
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._array_done = False
+        self._depth = 0
+        self._object_start = -1
+        self._in_string = False
+        self._escaped = False
+        self.skipped = 0
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        Add more response text.
+
+        Args:
+            text: The next chunk of model output
+
+        Returns:
+            list: Question objects completed by this chunk
+        """
+        self._buffer += text
+        completed = []
+
+        if not self._in_array:
+            if not self._find_array_start():
+                return completed
+
+        buffer = self._buffer
+        while self._pos < len(buffer) and not self._array_done:
+            char = buffer[self._pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                if self._depth == 0:
+                    self._object_start = self._pos
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0 and self._object_start >= 0:
+                    question = self._decode(buffer[self._object_start:self._pos + 1])
+                    if question is not None:
+                        completed.append(question)
+                    self._object_start = -1
+            elif char == ']' and self._depth == 0:
+                self._array_done = True
+
+            self._pos += 1
+
+        self._compact()
+        return completed
+
+    @property
+    def finished(self) -> bool:
+        """Whether the end of the questions array has been seen."""
+        return self._array_done
+
+    def _find_array_start(self) -> bool:
+        key_idx = self._buffer.find('"questions"')
+        if key_idx == -1:
+            return False
+        bracket_idx = self._buffer.find('[', key_idx)
+        if bracket_idx == -1:
+            return False
+        self._in_array = True
+        self._pos = bracket_idx + 1
+        return True
+
+    def _compact(self):
+        """Drop text that can no longer be part of an unfinished object."""
+        keep_from = self._object_start if self._object_start >= 0 else self._pos
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._pos -= keep_from
+            if self._object_start >= 0:
+                self._object_start = 0
+
+    def _decode(self, text: str):
+        # Drop // comment lines the model sometimes leaves in examples
+        cleaned = '\n'.join(line for line in text.split('\n') if not line.strip().startswith('//'))
+        try:
+            return json.loads(cleaned)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return None
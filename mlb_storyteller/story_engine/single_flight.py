@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import uuid
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import (
+    LLM_DEDUP_ENABLED,
+    LLM_DEDUP_LOCK_TTL_SECONDS,
+    LLM_DEDUP_RESULT_TTL_SECONDS,
+    LLM_DEDUP_POLL_INTERVAL_MS,
+)
+
+
+class RemoteGenerationError(Exception):
+    """Raised to callers following a generation that failed or stopped on another worker."""
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        self.error_type = error_type
+        super().__init__(f"{error_type}: {message}" if error_type else message)
+
+
+class _Flight:
+    """One in-flight generation and the chunks it has produced so far."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self._changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, chunk: str):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[Exception] = None):
+        self.error = error
+        self.done = True
+        self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every chunk from the start, then wait for new ones until done."""
+        position = 0
+        while True:
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                if self.error:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+    async def result(self) -> str:
+        return "".join([chunk async for chunk in self.follow()])
+
+
+class SingleFlight:
+    """Deduplicate identical in-flight LLM calls.
+
+    The first caller for a key becomes the leader and starts the generation
+    in a background task. Later callers with the same key attach to it:
+    ``run`` callers wait for the full text, ``stream`` callers replay the
+    chunks produced so far and then follow the live stream. A follower
+    disconnecting never cancels the shared generation.
+
+    Across workers the leader is elected with a Redis lock. The leader
+    mirrors its chunks into a Redis stream, and workers that lose the
+    election follow that stream instead of calling the model. The finished
+    stream is kept for a short window so requests arriving just after
+    completion are served from it too. If Redis is disabled or unreachable,
+    deduplication falls back to the current worker only.
+    """
+
+    # How long a failed stream is kept so attached followers see the error
+    ERROR_TTL_MS = 5000
+
+    def __init__(
+        self,
+        redis_service: Optional[RedisService] = None,
+        enabled: bool = LLM_DEDUP_ENABLED,
+        lock_ttl_seconds: int = LLM_DEDUP_LOCK_TTL_SECONDS,
+        result_ttl_seconds: int = LLM_DEDUP_RESULT_TTL_SECONDS,
+        poll_interval_ms: int = LLM_DEDUP_POLL_INTERVAL_MS,
+    ):
+        """Initialize the deduplicator."""
+        self.enabled = enabled
+        self.redis = redis_service
+        self.lock_ttl_ms = lock_ttl_seconds * 1000
+        self.result_ttl_ms = result_ttl_seconds * 1000
+        self.poll_interval = poll_interval_ms / 1000
+        self.worker_token = uuid.uuid4().hex
+        self._flights: Dict[str, _Flight] = {}
+
+    @staticmethod
+    def key_for(backend: str, task: str, prompt: str) -> str:
+        """Hash a prompt into a dedup key, ignoring whitespace differences."""
+        canonical = " ".join(prompt.split())
+        digest = hashlib.sha256(f"{backend}\0{task}\0{canonical}".encode("utf-8"))
+        return digest.hexdigest()
+
+    async def run(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        """Return the text for key, generating it at most once at a time."""
+        if not self.enabled:
+            return await generate()
+
+        async def source() -> AsyncIterator[str]:
+            yield await generate()
+
+        return await self._join(key, source).result()
+
+    async def stream(self, key: str, stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Yield the chunks for key, generating them at most once at a time."""
+        if not self.enabled:
+            async for chunk in stream():
+                yield chunk
+            return
+
+        async for chunk in self._join(key, stream).follow():
+            yield chunk
+
+    def _join(self, key: str, source: Callable[[], AsyncIterator[str]]) -> _Flight:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, source))
+        return flight
+
+    async def _produce(self, key: str, flight: _Flight, source: Callable[[], AsyncIterator[str]]):
+        try:
+            if await self._acquire(key):
+                await self._lead(key, flight, source)
+            elif not await self._follow_remote(key, flight):
+                # The remote leader went away without finishing; do it ourselves
+                await self._lead(key, flight, source, mirror=False)
+            flight.finish()
+        except Exception as e:
+            flight.finish(e)
+        finally:
+            self._flights.pop(key, None)
+
+    async def _lead(self, key: str, flight: _Flight, source: Callable[[], AsyncIterator[str]], mirror: bool = True):
+        stream_key = self._stream_key(key)
+        try:
+            async for chunk in source():
+                flight.publish(chunk)
+                if mirror:
+                    await self._mirror(stream_key, {"chunk": chunk})
+        except Exception as e:
+            if mirror:
+                await self._mirror(stream_key, {"error": str(e), "error_type": type(e).__name__})
+                await self._settle(key, self.ERROR_TTL_MS, release=True)
+            raise
+        if mirror:
+            await self._mirror(stream_key, {"done": "1"})
+            await self._settle(key, self.result_ttl_ms)
+
+    async def _follow_remote(self, key: str, flight: _Flight) -> bool:
+        """Mirror a leader's Redis stream into the local flight.
+
+        Returns False if the leader disappeared before producing anything.
+        """
+        stream_key = self._stream_key(key)
+        last_id = "0"
+        while True:
+            try:
+                entries = await self.redis.stream_read(stream_key, last_id)
+            except Exception as e:
+                print(f"LLM dedup stream read failed: {str(e)}")
+                if flight.chunks:
+                    raise
+                return False
+
+            for entry_id, fields in entries:
+                last_id = entry_id
+                if "chunk" in fields:
+                    flight.publish(fields["chunk"])
+                elif "error" in fields:
+                    raise RemoteGenerationError(fields["error"], fields.get("error_type"))
+                elif "done" in fields:
+                    return True
+
+            if not entries:
+                try:
+                    leader_alive = await self.redis.exists(self._lock_key(key))
+                except Exception:
+                    leader_alive = False
+                if not leader_alive:
+                    if flight.chunks:
+                        raise RemoteGenerationError("LLM generation on another worker stopped before finishing")
+                    return False
+                await asyncio.sleep(self.poll_interval)
+
+    async def _acquire(self, key: str) -> bool:
+        """Try to become the cross-worker leader for key.
+
+        Returns True when this worker should call the model, which is also
+        the case whenever Redis cannot be used.
+        """
+        if not self.redis or not self.redis.enabled:
+            return True
+        try:
+            if await self.redis.acquire_lock(self._lock_key(key), self.worker_token, self.lock_ttl_ms):
+                # Clear out a stream left behind by a previous failed leader
+                await self.redis.delete(self._stream_key(key))
+                return True
+            return False
+        except Exception as e:
+            print(f"LLM dedup lock unavailable, generating locally: {str(e)}")
+            return True
+
+    async def _mirror(self, stream_key: str, fields: Dict[str, str]):
+        if not self.redis or not self.redis.enabled:
+            return
+        try:
+            await self.redis.stream_append(stream_key, fields, ttl_ms=self.lock_ttl_ms)
+        except Exception as e:
+            print(f"LLM dedup stream write failed: {str(e)}")
+
+    async def _settle(self, key: str, ttl_ms: float, release: bool = False):
+        """Keep the finished stream around briefly, then let it expire."""
+        if not self.redis or not self.redis.enabled:
+            return
+        try:
+            await self.redis.expire(self._stream_key(key), int(ttl_ms))
+            if release:
+                await self.redis.release_lock(self._lock_key(key), self.worker_token)
+            else:
+                await self.redis.expire(self._lock_key(key), int(ttl_ms))
+        except Exception as e:
+            print(f"LLM dedup cleanup failed: {str(e)}")
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"llm:inflight:{key}:lock"
+
+    @staticmethod
+    def _stream_key(key: str) -> str:
+        return f"llm:inflight:{key}:stream"
+
+
+@lru_cache()
+def get_single_flight() -> SingleFlight:
+    """Get the worker-wide deduplicator shared by all StoryGenerators."""
+    return SingleFlight(redis_service=RedisService())
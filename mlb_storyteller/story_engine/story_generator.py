@@ -1,57 +1,723 @@
-import google.generativeai as genai
-from typing import Dict
-import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+import asyncio
+import hashlib
 import json
+import re
+import time
+from collections import OrderedDict
+from mlb_storyteller.cache.redis_service import RedisService
+from mlb_storyteller.config import (
+    QUIZ_MAX_RETRIES,
+    QUIZ_LLM_ENRICHMENT_ENABLED,
+    QUIZ_MIN_RULE_QUESTIONS,
+    QUIZ_CACHE_TTL,
+    STORY_CACHE_TTL,
+    STORY_BATCH_MAX_STYLES,
+    QUIZ_BATCH_MAX_GAMES,
+    QUIZ_BATCH_GAME_TOKEN_CAP,
+    LLM_CONTEXT_CACHE_TTL_SECONDS,
+    GAME_CONTEXT_CACHE_SIZE,
+)
+from mlb_storyteller.monitoring.llm_metrics import (
+    llm_labels,
+    record_llm_call,
+    record_queue_rejection,
+    record_quiz_parse_failure,
+    record_retry,
+    record_context_registration,
+    record_context_reuse,
+)
+from mlb_storyteller.story_engine.llm_backends import ContextHandleExpired, LLMBackend, LLMResponse, create_llm_backend
+from mlb_storyteller.story_engine.single_flight import SingleFlight, get_single_flight
+from mlb_storyteller.story_engine.llm_queue import LLMQueue, LLMOverloadedError, get_llm_queue
+from mlb_storyteller.story_engine.quiz_engine import RuleBasedQuizEngine
+from mlb_storyteller.story_engine.quiz_stream_parser import IncrementalQuizParser
+from mlb_storyteller.story_engine.live_story import LiveStoryTeller
+from mlb_storyteller.story_engine.game_context import GameContext
 
 load_dotenv()
 
 class StoryGenerator:
-    """Generate baseball stories using Gemini AI."""
+    """Generate baseball stories using an LLM backend (Gemini by default)."""
     
-    def __init__(self):
-        """Initialize the story generator with Gemini API."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
+    # Background quiz enrichment tasks in this worker, by quiz cache key
+    _enrichment_tasks: Dict[str, asyncio.Task] = {}
+    
+    # Number of LLM trivia/prediction questions added to a rule-based quiz
+    QUIZ_ENRICHMENT_QUESTIONS = 2
+    
+    # Backend prefix cache handles by (backend, context version): (handle, expiry),
+    # least recently used first and bounded like the GameContext memo
+    _context_handles: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+    
+    def __init__(
+        self,
+        backend: Optional[LLMBackend] = None,
+        single_flight: Optional[SingleFlight] = None,
+        llm_queue: Optional[LLMQueue] = None
+    ):
+        """
+        Initialize the story generator.
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        Args:
+            backend: LLM backend to use. Defaults to the backend selected by
+                the LLM_BACKEND setting.
+            single_flight: Deduplicator for identical in-flight prompts.
+                Defaults to the worker-wide instance.
+            llm_queue: Concurrency limiter for backend calls. Defaults to the
+                worker-wide instance.
+        """
+        self.backend = backend or create_llm_backend()
+        self.single_flight = single_flight or get_single_flight()
+        self.llm_queue = llm_queue or get_llm_queue()
+        self.quiz_engine = RuleBasedQuizEngine()
+        self.cache = RedisService()
+
+    async def _complete(
+        self,
+        prompt: str,
+        task: str,
+        style: Optional[str] = None,
+        max_queue_wait: Optional[float] = None,
+        attempt: int = 0,
+        context: Optional[GameContext] = None
+    ) -> str:
+        """Run a prompt through the backend, sharing identical in-flight calls.
+
+        If the prompt starts with a game context and the backend caches
+        prefixes, only the rest of the prompt is sent.
+        """
+        labels = llm_labels(task, style)
+
+        async def generate() -> str:
+            handle, sent_prompt = await self._split_cached_context(prompt, context, labels)
+            try:
+                async with self.llm_queue.slot(max_queue_wait) as queue_wait:
+                    call_start = time.perf_counter()
+                    try:
+                        for retry in (False, True):
+                            try:
+                                response = await self.backend.generate(sent_prompt, task=task, context_handle=handle)
+                                break
+                            except ContextHandleExpired:
+                                if retry:
+                                    raise
+                                handle, sent_prompt = await self._split_cached_context(prompt, context, labels, expired=handle)
+                    except Exception as e:
+                        self._record_call(labels, queue_wait, None, call_start, sent_prompt, None, None, e)
+                        raise
+            except LLMOverloadedError as e:
+                record_queue_rejection(labels, e.waited)
+                raise
+            self._record_call(labels, queue_wait, None, call_start, sent_prompt, response.text, response)
+            return response.text
+
+        key = self.single_flight.key_for(self.backend.name, self._flight_task(task, attempt), prompt)
+        return await self.single_flight.run(key, generate)
+
+    async def _stream(
+        self,
+        prompt: str,
+        task: str,
+        style: Optional[str] = None,
+        max_queue_wait: Optional[float] = None,
+        context: Optional[GameContext] = None
+    ) -> AsyncIterator[str]:
+        """Stream a prompt through the backend, sharing identical in-flight calls."""
+        labels = llm_labels(task, style)
+
+        async def stream() -> AsyncIterator[str]:
+            handle, sent_prompt = await self._split_cached_context(prompt, context, labels)
+            try:
+                async with self.llm_queue.slot(max_queue_wait) as queue_wait:
+                    call_start = time.perf_counter()
+                    time_to_first_token = None
+                    chunks = []
+                    try:
+                        for retry in (False, True):
+                            try:
+                                async for chunk in self.backend.stream(sent_prompt, task=task, context_handle=handle):
+                                    if time_to_first_token is None:
+                                        time_to_first_token = time.perf_counter() - call_start
+                                    chunks.append(chunk)
+                                    yield chunk
+                                break
+                            except ContextHandleExpired:
+                                if retry or chunks:
+                                    raise
+                                handle, sent_prompt = await self._split_cached_context(prompt, context, labels, expired=handle)
+                    except Exception as e:
+                        self._record_call(labels, queue_wait, time_to_first_token, call_start, sent_prompt, None, None, e)
+                        raise
+            except LLMOverloadedError as e:
+                record_queue_rejection(labels, e.waited)
+                raise
+            self._record_call(labels, queue_wait, time_to_first_token, call_start, sent_prompt, "".join(chunks))
+
+        key = self.single_flight.key_for(self.backend.name, task, prompt)
+        async for chunk in self.single_flight.stream(key, stream):
+            yield chunk
+
+    async def _split_cached_context(
+        self,
+        prompt: str,
+        context: Optional[GameContext],
+        labels: Dict[str, str],
+        expired: Optional[str] = None
+    ) -> Tuple[Optional[str], str]:
+        """Return the backend context handle to use and the part of the prompt to send.
+
+        Pass the handle a call just failed with as expired to register the
+        context again, for when the backend dropped it before we did.
+        """
+        if context is None or not self.backend.supports_context_cache or not prompt.startswith(context.text):
+            return None, prompt
+
+        key = (self.backend.name, context.version)
+        handles = StoryGenerator._context_handles
+        if expired is not None and handles.get(key, (None,))[0] == expired:
+            del handles[key]
+        handle, expires_at = handles.get(key, (None, 0.0))
+        if handle is not None:
+            handles.move_to_end(key)
+        if handle is None or expires_at <= time.time():
+            try:
+                handle = await self.backend.cache_context(context.text, LLM_CONTEXT_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"Context caching failed, sending the full prompt: {str(e)}")
+                return None, prompt
+            if not handle:
+                return None, prompt
+            # Stop using the handle a little before the backend drops it
+            now = time.time()
+            handles[key] = (handle, now + LLM_CONTEXT_CACHE_TTL_SECONDS * 0.9)
+            handles.move_to_end(key)
+            # Drop expired handles and, beyond the memo size, those for games no longer requested
+            for stale in [stale for stale, (_, expiry) in handles.items() if expiry <= now]:
+                del handles[stale]
+            while len(handles) > GAME_CONTEXT_CACHE_SIZE:
+                handles.popitem(last=False)
+            record_context_registration(self.backend.name, self.backend.estimate_tokens(context.text))
+
+        record_context_reuse(labels, self.backend.estimate_tokens(context.text))
+        return handle, prompt[len(context.text):]
+
+    def _game_context(self, game_data: Dict) -> GameContext:
+        """Shared, memoized context that every prompt about this game starts with."""
+        return GameContext.for_game(game_data)
+
+    @staticmethod
+    def _flight_task(task: str, attempt: int) -> str:
+        """Dedup task name; retries get their own key so they don't reuse the failed result."""
+        return f"{task}:retry{attempt}" if attempt else task
+
+    def _record_call(
+        self,
+        labels: Dict[str, str],
+        queue_wait: float,
+        time_to_first_token: Optional[float],
+        call_start: float,
+        prompt: str,
+        response_text: Optional[str],
+        response: Optional[LLMResponse] = None,
+        error: Optional[Exception] = None
+    ):
+        """Record latency, token and cost metrics for one backend call.
+
+        For non-streaming calls (no time_to_first_token), the first token
+        arrives with the full response, so it is recorded as the latency.
+        """
+        latency = time.perf_counter() - call_start
+        prompt_tokens = response.prompt_tokens if response else None
+        response_tokens = response.response_tokens if response else None
+        token_source = "backend" if prompt_tokens is not None else "estimate"
+        if prompt_tokens is None:
+            prompt_tokens = self.backend.estimate_tokens(prompt)
+        if response_tokens is None:
+            response_tokens = self.backend.estimate_tokens(response_text or "")
+        record_llm_call(
+            labels,
+            backend=self.backend.name,
+            queue_wait=queue_wait,
+            time_to_first_token=latency if time_to_first_token is None and not error else time_to_first_token,
+            latency=latency,
+            prompt_tokens=prompt_tokens,
+            response_tokens=response_tokens,
+            token_source=token_source,
+            error=error,
+        )
         
+    async def generate_quiz(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        enrich: bool = QUIZ_LLM_ENRICHMENT_ENABLED
+    ) -> Dict:
+        """
+        Generate an interactive quiz for a game.
+        
+        Factual questions are derived instantly from the game data. When
+        enrich is set, trivia and prediction questions are requested from the
+        LLM in the background and merged into the cached quiz, so later
+        requests get the enriched version. Games without enough data for
+        factual questions (e.g. not yet played) get an LLM quiz inline.
+        
+        Args:
+            game_data: Processed game data
+            user_preferences: User's preferences (favorite team, players, etc.)
+            enrich: Whether to add LLM questions to the rule-based ones
+            
+        Returns:
+            dict: Quiz with 'questions' and an 'enrichment' status
+                ('pending', 'complete', 'failed' or 'disabled')
+        """
+        cache_key = self._quiz_cache_key(game_data, user_preferences)
+        cached_quiz = await self._cache_get(cache_key)
+        if cached_quiz:
+            return cached_quiz
 
-    async def generate_quiz(self, game_data: Dict, user_preferences: Dict) -> Dict:
-        """Generate interactive quiz based on game data"""
-        quiz_prompt = await self._construct_quiz_prompt(game_data, user_preferences)
-        response = self.model.generate_content(quiz_prompt)
-        return self._parse_quiz_response(response.text)
+        questions = self.quiz_engine.build(game_data)
 
-    async def _construct_quiz_prompt(self, game_data: Dict, user_preferences: Dict) -> str:
-        """Construct quiz generation prompt"""
-        base_prompt = await self._construct_prompt(game_data, user_preferences, "analytical")
-        
-        # Create a simplified game data structure
-        simplified_game = {
-            'summary': game_data.get('summary', {}),
-            'teams': {
-                'home': game_data.get('summary', {}).get('home_team'),
-                'away': game_data.get('summary', {}).get('away_team'),
-                'score': {
-                    'home': game_data.get('summary', {}).get('home_score'),
-                    'away': game_data.get('summary', {}).get('away_score')
-                }
+        if len(questions) < QUIZ_MIN_RULE_QUESTIONS:
+            quiz_prompt = await self._construct_quiz_prompt(game_data, user_preferences)
+            try:
+                llm_questions = await self._generate_quiz_questions(quiz_prompt, self._game_context(game_data))
+            except Exception:
+                if not questions:
+                    raise
+                return {'questions': self._merge_questions(questions, []), 'enrichment': 'failed'}
+            quiz = {'questions': self._merge_questions(questions, llm_questions), 'enrichment': 'complete'}
+            await self._cache_set(cache_key, quiz)
+            return quiz
+
+        quiz = {
+            'questions': self._merge_questions(questions, []),
+            'enrichment': 'pending' if enrich else 'disabled'
+        }
+        if enrich:
+            self._schedule_quiz_enrichment(cache_key, quiz, game_data, user_preferences)
+        return quiz
+
+    async def _generate_quiz_questions(
+        self,
+        quiz_prompt: str,
+        context: Optional[GameContext] = None
+    ) -> List[Dict]:
+        """Ask the LLM for quiz questions, retrying if none of them are valid."""
+        labels = llm_labels("quiz")
+        for attempt in range(QUIZ_MAX_RETRIES + 1):
+            response_text = await self._complete(quiz_prompt, task="quiz", attempt=attempt, context=context)
+            try:
+                questions = self._parse_quiz_response(response_text)['questions']
+            except ValueError as e:
+                record_quiz_parse_failure(labels, e, attempt)
+                if attempt == QUIZ_MAX_RETRIES:
+                    raise
+                record_retry(labels, attempt + 1, "quiz_parse_failure")
+                continue
+            for question in questions:
+                question['source'] = 'llm'
+            return questions
+
+    async def stream_quiz(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        enrich: bool = QUIZ_LLM_ENRICHMENT_ENABLED
+    ) -> AsyncIterator[Dict]:
+        """
+        Generate a quiz and yield each question as soon as it is ready.
+
+        Cached and rule-based questions are yielded immediately. LLM
+        questions are parsed out of the streamed response one by one and
+        yielded once they pass the same validation as _parse_quiz_response,
+        so the first question can be answered while the rest are generating.
+        The complete quiz is cached at the end, like generate_quiz.
+
+        Args:
+            game_data: Processed game data
+            user_preferences: User's preferences (favorite team, players, etc.)
+            enrich: Whether to add LLM questions to the rule-based ones
+
+        Yields:
+            dict: Validated questions, with 'index' set in delivery order
+        """
+        cache_key = self._quiz_cache_key(game_data, user_preferences)
+        cached_quiz = await self._cache_get(cache_key)
+        if cached_quiz:
+            for question in cached_quiz['questions']:
+                yield question
+            return
+
+        questions = self._merge_questions(self.quiz_engine.build(game_data), [])
+        for question in questions:
+            yield question
+
+        needs_llm_quiz = len(questions) < QUIZ_MIN_RULE_QUESTIONS
+        if not needs_llm_quiz and not enrich:
+            return
+
+        if needs_llm_quiz:
+            prompt = await self._construct_quiz_prompt(game_data, user_preferences)
+            limit = None
+        else:
+            prompt = await self._construct_quiz_enrichment_prompt(game_data, user_preferences, questions)
+            limit = self.QUIZ_ENRICHMENT_QUESTIONS
+
+        labels = llm_labels("quiz")
+        parser = IncrementalQuizParser()
+        seen = {" ".join(q['question'].lower().split()) for q in questions}
+        added = 0
+        try:
+            async for chunk in self._stream(prompt, task="quiz", context=self._game_context(game_data)):
+                for raw in parser.feed(chunk):
+                    try:
+                        question = self._validate_quiz_question(raw, added)
+                    except ValueError as e:
+                        record_quiz_parse_failure(labels, e, attempt=0)
+                        continue
+                    text = " ".join(question['question'].lower().split())
+                    if text in seen:
+                        continue
+                    seen.add(text)
+                    question = {**question, 'source': 'llm', 'index': len(questions)}
+                    questions.append(question)
+                    added += 1
+                    yield question
+                    if limit is not None and added >= limit:
+                        break
+                if parser.finished or (limit is not None and added >= limit):
+                    break
+        except Exception as e:
+            if not questions:
+                raise
+            print(f"Streaming quiz generation failed: {str(e)}")
+            return
+
+        if not added:
+            error = ValueError("No valid questions in streamed response")
+            record_quiz_parse_failure(labels, error, attempt=0)
+            if not questions:
+                raise error
+            return
+
+        await self._cache_set(cache_key, {'questions': questions, 'enrichment': 'complete'})
+
+    def _schedule_quiz_enrichment(
+        self,
+        cache_key: str,
+        quiz: Dict,
+        game_data: Dict,
+        user_preferences: Dict
+    ):
+        """Start background LLM enrichment for a quiz unless one is already running."""
+        if cache_key in StoryGenerator._enrichment_tasks:
+            return
+        task = asyncio.create_task(self._enrich_quiz(cache_key, quiz, game_data, user_preferences))
+        StoryGenerator._enrichment_tasks[cache_key] = task
+        task.add_done_callback(lambda _: StoryGenerator._enrichment_tasks.pop(cache_key, None))
+
+    async def _enrich_quiz(self, cache_key: str, quiz: Dict, game_data: Dict, user_preferences: Dict):
+        """Add LLM trivia/prediction questions to a quiz and cache the result."""
+        try:
+            prompt = await self._construct_quiz_enrichment_prompt(game_data, user_preferences, quiz['questions'])
+            extra_questions = await self._generate_quiz_questions(prompt, self._game_context(game_data))
+        except Exception as e:
+            print(f"Quiz enrichment failed: {str(e)}")
+            return
+        enriched = {
+            'questions': self._merge_questions(
+                quiz['questions'],
+                extra_questions[:self.QUIZ_ENRICHMENT_QUESTIONS]
+            ),
+            'enrichment': 'complete'
+        }
+        await self._cache_set(cache_key, enriched)
+
+    # Questions requested per game in a batch when the rule-based quiz is too thin
+    QUIZ_BATCH_FULL_QUESTIONS = 5
+
+    async def generate_quizzes(self, games: Dict[str, Dict], user_preferences: Dict) -> Dict[str, Dict]:
+        """
+        Generate quizzes for a slate of games, packing several games into each model call.
+        
+        Each game gets its rule-based questions plus LLM questions from a
+        shared batch request, and the result is cached per game under the
+        same key generate_quiz uses. Responses are validated per game: a game
+        whose section is missing or invalid falls back to generate_quiz on
+        its own without affecting the rest of the batch.
+        
+        Args:
+            games: Processed game data by game ID
+            user_preferences: User's preferences (favorite team, players, etc.)
+            
+        Returns:
+            dict: 'quizzes' by game ID, and 'errors' by game ID for games
+                that could not get a quiz at all
+        """
+        quizzes: Dict[str, Dict] = {}
+        errors: Dict[str, str] = {}
+        pending: Dict[str, Dict] = {}
+        for game_id, game_data in games.items():
+            cache_key = self._quiz_cache_key(game_data, user_preferences)
+            cached_quiz = await self._cache_get(cache_key)
+            if cached_quiz:
+                quizzes[game_id] = cached_quiz
+                continue
+            questions = self.quiz_engine.build(game_data)
+            pending[game_id] = {
+                'cache_key': cache_key,
+                'questions': questions,
+                'wanted': (
+                    self.QUIZ_ENRICHMENT_QUESTIONS
+                    if len(questions) >= QUIZ_MIN_RULE_QUESTIONS
+                    else self.QUIZ_BATCH_FULL_QUESTIONS
+                ),
             }
+
+        game_ids = list(pending)
+        chunks = [
+            game_ids[start:start + QUIZ_BATCH_MAX_GAMES]
+            for start in range(0, len(game_ids), max(1, QUIZ_BATCH_MAX_GAMES))
+        ]
+        results = await asyncio.gather(*(
+            self._generate_quiz_batch(
+                {game_id: games[game_id] for game_id in chunk},
+                {game_id: pending[game_id]['wanted'] for game_id in chunk},
+                user_preferences
+            )
+            for chunk in chunks
+        ), return_exceptions=True)
+
+        llm_questions: Dict[str, List[Dict]] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                print(f"Quiz batch for games {', '.join(chunk)} failed: {str(result)}")
+                continue
+            llm_questions.update(result)
+
+        for game_id in game_ids:
+            entry = pending[game_id]
+            extra = llm_questions.get(game_id)
+            if extra:
+                quiz = {
+                    'questions': self._merge_questions(entry['questions'], extra[:entry['wanted']]),
+                    'enrichment': 'complete'
+                }
+                await self._cache_set(entry['cache_key'], quiz)
+                quizzes[game_id] = quiz
+                continue
+            try:
+                quizzes[game_id] = await self.generate_quiz(games[game_id], user_preferences)
+            except Exception as e:
+                errors[game_id] = str(e)
+
+        return {
+            'quizzes': {game_id: quizzes[game_id] for game_id in games if game_id in quizzes},
+            'errors': errors
         }
 
+    async def _generate_quiz_batch(
+        self,
+        games: Dict[str, Dict],
+        questions_wanted: Dict[str, int],
+        user_preferences: Dict
+    ) -> Dict[str, List[Dict]]:
+        """Ask the LLM for quiz questions for several games in one call."""
+        summaries = [
+            self._compact_game_summary(game_id, game_data, questions_wanted[game_id])
+            for game_id, game_data in games.items()
+        ]
+        prompt = self._construct_quiz_batch_prompt(summaries, user_preferences)
+        response_text = await self._complete(prompt, task="quiz_batch")
+        questions_by_game = self._parse_quiz_batch_response(response_text, list(games))
+        for questions in questions_by_game.values():
+            for question in questions:
+                question['source'] = 'llm'
+        return questions_by_game
+
+    def _compact_game_summary(self, game_id: str, game_data: Dict, questions_wanted: int) -> Dict:
+        """Summarize a game for a batch quiz prompt within QUIZ_BATCH_GAME_TOKEN_CAP tokens.
+
+        Optional details are dropped, least important first, until the
+        summary fits the cap.
+        """
+        summary = game_data.get('summary') or {}
+        result = game_data.get('result') or {}
+        home, away = summary.get('home_team', 'Home'), summary.get('away_team', 'Away')
+        compact = {
+            'game_id': game_id,
+            'questions_wanted': questions_wanted,
+            'matchup': f"{away} at {home}",
+            'score': f"{away} {summary.get('away_score', 0)}, {home} {summary.get('home_score', 0)}",
+            'status': summary.get('status', 'Unknown'),
+            'date': summary.get('game_date'),
+            'venue': summary.get('venue'),
+        }
+        for field in ('winning_pitcher', 'losing_pitcher', 'save'):
+            player = result.get(field) or {}
+            name = player.get('fullName') or player.get('name')
+            if name:
+                compact[field] = name
+        leaders = [
+            f"{leader['name']}: {leader['highlight']}"
+            for leader in (game_data.get('leaders') or {}).get('batting', [])
+            if leader.get('name') and leader.get('highlight')
+        ]
+        if leaders:
+            compact['batting_leaders'] = leaders
+        scoring_plays = [
+            play['description']
+            for play in (game_data.get('plays') or {}).get('scoring_plays', [])
+            if play.get('description')
+        ]
+        if scoring_plays:
+            compact['scoring_plays'] = scoring_plays
+
+        def fits() -> bool:
+            return self.backend.estimate_tokens(json.dumps(compact)) <= QUIZ_BATCH_GAME_TOKEN_CAP
+
+        for field in ('scoring_plays', 'batting_leaders'):
+            while compact.get(field) and not fits():
+                compact[field].pop()
+            if field in compact and not compact[field]:
+                del compact[field]
+        for field in ('venue', 'save', 'losing_pitcher', 'date', 'winning_pitcher'):
+            if fits():
+                break
+            compact.pop(field, None)
+        return compact
+
+    def _construct_quiz_batch_prompt(self, summaries: List[Dict], user_preferences: Dict) -> str:
+        """Construct a prompt for quiz questions about several games at once"""
+        favorite_team = user_preferences.get('favorite_team')
+        games = "\n".join(f"        {json.dumps(summary)}" for summary in summaries)
+
         return f"""
-        Based on this baseball game data, generate a quiz with 5 multiple-choice questions.
+        Write multiple-choice quiz questions for each of the baseball games below.
+        For each game, write exactly the number of questions in its "questions_wanted" field.
+        Mix questions about key moments of that game with baseball history/trivia about the two teams
+        {'(especially the ' + favorite_team + ') ' if favorite_team else ''}and one prediction/analysis question.
+        Every question must be about its own game only.
+
+        Games (one JSON object per line):
+{games}
+
+        Format your response EXACTLY as a JSON object with this structure:
+        {{
+            "games": [
+                {{
+                    "game_id": "The game_id of the game",
+                    "questions": [
+                        {{
+                            "question": "Question text",
+                            "options": ["Option A", "Option B", "Option C", "Option D"],
+                            "correct_answer": "Option A",
+                            "explanation": "Why this answer is correct."
+                        }}
+                    ]
+                }}
+            ]
+        }}
+
+        Requirements:
+        1. Include every game_id exactly once
+        2. Each question must have exactly 4 options
+        3. The correct_answer must match one of the options exactly
+        4. Include a brief explanation for each answer
+        5. Ensure all JSON formatting is correct
+        """
+
+    def _parse_quiz_batch_response(self, response_text: str, game_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Parse a batch quiz response into valid questions by game ID.
         
-        Game Data:
-        {json.dumps(simplified_game, indent=2)}
+        Games are validated independently: invalid questions are dropped,
+        and games with no valid questions (or missing from the response) are
+        left out. Raises ValueError only if the response isn't a batch quiz
+        JSON object at all.
+        """
+        labels = llm_labels("quiz_batch")
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}')
+        if start_idx == -1 or end_idx == -1:
+            raise ValueError("No JSON object found in batch quiz response")
+        json_str = '\n'.join(line for line in response_text[start_idx:end_idx + 1].split('\n')
+                             if not line.strip().startswith('//'))
+        try:
+            batch_data = json.loads(json_str)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse batch quiz response as JSON: {str(e)}")
+        if not isinstance(batch_data, dict) or not isinstance(batch_data.get('games'), list):
+            raise ValueError("Missing 'games' array in batch quiz response")
+
+        wanted = set(game_ids)
+        questions_by_game: Dict[str, List[Dict]] = {}
+        for entry in batch_data['games']:
+            if not isinstance(entry, dict):
+                continue
+            game_id = str(entry.get('game_id'))
+            if game_id not in wanted or game_id in questions_by_game:
+                continue
+            valid_questions = []
+            raw_questions = entry.get('questions')
+            for i, question in enumerate(raw_questions if isinstance(raw_questions, list) else []):
+                try:
+                    valid_questions.append(self._validate_quiz_question(question, i))
+                except ValueError as e:
+                    record_quiz_parse_failure(labels, ValueError(f"Game {game_id}: {str(e)}"), attempt=0)
+            if valid_questions:
+                questions_by_game[game_id] = valid_questions
+
+        for game_id in wanted - set(questions_by_game):
+            record_quiz_parse_failure(labels, ValueError(f"Game {game_id}: no valid questions"), attempt=0)
+        return questions_by_game
+
+    @staticmethod
+    def _merge_questions(base: List[Dict], extra: List[Dict]) -> List[Dict]:
+        """Combine question lists, dropping duplicates and renumbering."""
+        merged = []
+        seen = set()
+        for question in base + extra:
+            text = " ".join(question['question'].lower().split())
+            if text in seen:
+                continue
+            seen.add(text)
+            merged.append({**question, 'index': len(merged)})
+        return merged
+
+    def _quiz_cache_key(self, game_data: Dict, user_preferences: Optional[Dict] = None) -> str:
+        """Cache key that changes whenever the game data or the favorite team in the prompts changes."""
+        key = f"quiz:{GameContext.version_of(game_data)}"
+        favorite_team = " ".join(str((user_preferences or {}).get('favorite_team') or '').lower().split())
+        return f"{key}:team:{favorite_team}" if favorite_team else key
+
+    async def _cache_get(self, key: str) -> Optional[Any]:
+        try:
+            return await self.cache.get(key)
+        except Exception as e:
+            print(f"Cache read failed for {key}: {str(e)}")
+            return None
+
+    async def _cache_set(self, key: str, data: Any, expire: int = QUIZ_CACHE_TTL):
+        try:
+            await self.cache.set(key, data, expire=expire)
+        except Exception as e:
+            print(f"Cache write failed for {key}: {str(e)}")
+
+    async def _construct_quiz_prompt(self, game_data: Dict, user_preferences: Dict) -> str:
+        """Construct quiz generation prompt"""
+        context = self._game_context(game_data)
+        favorite_team = user_preferences.get('favorite_team')
+
+        return f"""{context.text}
+        Based on the baseball game above, generate a quiz with 5 multiple-choice questions.
 
         Create 5 engaging quiz questions:
         - 2 questions about key moments or plays from this game
         - 1 question about player statistics 
-        - 1 baseball history/trivia question
+        - 1 baseball history/trivia question related to these teams{' (especially the ' + favorite_team + ')' if favorite_team else ''}
         - 1 prediction/analysis question about future implications
 
         Format your response EXACTLY as a JSON object with this structure:
@@ -75,8 +741,52 @@ class StoryGenerator:
         5. Ensure all JSON formatting is correct
         """
 
+    async def _construct_quiz_enrichment_prompt(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        existing_questions: List[Dict]
+    ) -> str:
+        """Construct a prompt for trivia/prediction questions to add to a quiz"""
+        context = self._game_context(game_data)
+        favorite_team = user_preferences.get('favorite_team')
+        existing = "\n".join(f"- {q['question']}" for q in existing_questions)
+
+        return f"""{context.text}
+        Based on the baseball game above, write {self.QUIZ_ENRICHMENT_QUESTIONS} multiple-choice quiz questions:
+        - 1 baseball history/trivia question related to these teams{' (especially the ' + favorite_team + ')' if favorite_team else ''}
+        - 1 prediction/analysis question about future implications of this game
+
+        The quiz already asks these questions, so do not repeat them:
+        {existing}
+
+        Format your response EXACTLY as a JSON object with this structure:
+        {{
+            "questions": [
+                {{
+                    "question": "Question text",
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correct_answer": "Option A",
+                    "explanation": "Why this answer is correct."
+                }}
+            ]
+        }}
+
+        Requirements:
+        1. Each question must have exactly 4 options
+        2. The correct_answer must match one of the options exactly
+        3. Include a brief explanation for each answer
+        4. Ensure all JSON formatting is correct
+        """
+
     def _parse_quiz_response(self, response_text: str) -> Dict:
-        """Parse the quiz response from Gemini."""
+        """
+        Parse the quiz response from the LLM.
+        
+        Questions that fail validation are dropped and the valid ones kept.
+        Raises ValueError if the response isn't a quiz JSON object or has no
+        valid questions at all.
+        """
         try:
             # Clean up the response text to ensure valid JSON
             # Remove any text before the first {
@@ -108,32 +818,23 @@ class StoryGenerator:
             if not isinstance(quiz_data['questions'], list):
                 raise ValueError("'questions' is not an array")
             
-            # Process each question
+            # Keep every question that passes validation
+            valid_questions = []
             for i, question in enumerate(quiz_data['questions']):
-                # Validate required fields
-                required_fields = ['question', 'options', 'correct_answer', 'explanation']
-                for field in required_fields:
-                    if field not in question:
-                        raise ValueError(f"Question {i+1} is missing required field: {field}")
-                
-                # Validate options
-                if not isinstance(question['options'], list):
-                    raise ValueError(f"Question {i+1}: options must be an array")
-                
-                if len(question['options']) != 4:
-                    raise ValueError(f"Question {i+1}: must have exactly 4 options")
-                
-                # Convert all values to strings
-                question['options'] = [str(opt).strip() for opt in question['options']]
-                question['correct_answer'] = str(question['correct_answer']).strip()
-                
-                # Validate correct answer is in options
-                if question['correct_answer'] not in question['options']:
-                    raise ValueError(f"Question {i+1}: correct_answer must match one of the options exactly")
-                
-                # Add index for client-side handling
+                try:
+                    valid_questions.append(self._validate_quiz_question(question, i))
+                except ValueError as e:
+                    print(f"Dropping invalid quiz question: {str(e)}")
+                    record_quiz_parse_failure(llm_labels("quiz"), e, attempt=0)
+            
+            if not valid_questions:
+                raise ValueError("No valid questions in response")
+            
+            # Add index for client-side handling
+            for i, question in enumerate(valid_questions):
                 question['index'] = i
             
+            quiz_data['questions'] = valid_questions
             return quiz_data
             
         except json.JSONDecodeError as e:
@@ -145,11 +846,45 @@ class StoryGenerator:
             print(f"Response text: {response_text}")
             raise ValueError(f"Error processing quiz response: {str(e)}")
 
+    @staticmethod
+    def _validate_quiz_question(question: Dict, i: int) -> Dict:
+        """Validate and normalise one quiz question. Raises ValueError if invalid."""
+        if not isinstance(question, dict):
+            raise ValueError(f"Question {i+1} is not a JSON object")
+        
+        # Validate required fields
+        required_fields = ['question', 'options', 'correct_answer', 'explanation']
+        for field in required_fields:
+            if field not in question:
+                raise ValueError(f"Question {i+1} is missing required field: {field}")
+        
+        # Validate options
+        if not isinstance(question['options'], list):
+            raise ValueError(f"Question {i+1}: options must be an array")
+        
+        if len(question['options']) != 4:
+            raise ValueError(f"Question {i+1}: must have exactly 4 options")
+        
+        # Convert all values to strings
+        question['options'] = [str(opt).strip() for opt in question['options']]
+        question['correct_answer'] = str(question['correct_answer']).strip()
+        
+        # Validate correct answer is in options
+        if question['correct_answer'] not in question['options']:
+            raise ValueError(f"Question {i+1}: correct_answer must match one of the options exactly")
+        
+        return question
+
+    # Marker line that starts each story in a multi-style response
+    STYLE_MARKER = "=== STYLE: {style} ==="
+    STYLE_MARKER_PATTERN = re.compile(r'^[\s#*]*=+\s*STYLE:\s*([A-Za-z_-]+)\s*=+[\s*]*$', re.MULTILINE | re.IGNORECASE)
+
     async def generate_story(
         self,
         game_data: Dict,
         user_preferences: Dict,
-        style: str = "dramatic"
+        style: str = "dramatic",
+        max_queue_wait: Optional[float] = None
     ) -> str:
         """
         Generate a baseball story based on game data and user preferences.
@@ -158,19 +893,177 @@ class StoryGenerator:
             game_data: Dictionary containing game statistics and events
             user_preferences: User's preferences (favorite team, players, etc.)
             style: Narrative style (dramatic, analytical, humorous)
+            max_queue_wait: Seconds to wait for a free LLM slot before raising
+                LLMOverloadedError. Waits indefinitely when None.
             
         Returns:
             str: Generated story narrative
         """
         # Construct the prompt based on style and preferences
         prompt = await self._construct_prompt(game_data, user_preferences, style)
+        cache_key = self._story_cache_key(prompt)
+        cached_story = await self._cache_get(cache_key)
+        if cached_story:
+            return cached_story
         
         try:
-            # Generate the story using Gemini (synchronous call)
-            response = self.model.generate_content(prompt)
-            if not response or not response.text:
+            story = await self._complete(
+                prompt,
+                task="story",
+                style=style,
+                max_queue_wait=max_queue_wait,
+                context=self._game_context(game_data)
+            )
+            if not story:
                 raise Exception("No response generated")
-            return response.text
+        except LLMOverloadedError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to generate story: {str(e)}")
+        
+        await self._cache_set(cache_key, story, expire=STORY_CACHE_TTL)
+        return story
+
+    async def generate_stories(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        styles: List[str],
+        max_queue_wait: Optional[float] = None
+    ) -> Dict[str, str]:
+        """
+        Generate stories in several narrative styles with one model call.
+        
+        The game context is sent once and the model returns every style in a
+        single delimited response, which is split and cached per style under
+        the same key generate_story uses. Styles already cached are not
+        regenerated, and any style missing from the response is generated
+        on its own.
+        
+        Args:
+            game_data: Dictionary containing game statistics and events
+            user_preferences: User's preferences (favorite team, players, etc.)
+            styles: Narrative styles to generate
+            max_queue_wait: Seconds to wait for a free LLM slot before raising
+                LLMOverloadedError. Waits indefinitely when None.
+            
+        Returns:
+            dict: Story text by style, in the order requested
+        """
+        styles = list(dict.fromkeys(s.lower() for s in styles))
+        stories: Dict[str, str] = {}
+        cache_keys: Dict[str, str] = {}
+        for style in styles:
+            prompt = await self._construct_prompt(game_data, user_preferences, style)
+            cache_keys[style] = self._story_cache_key(prompt)
+            cached_story = await self._cache_get(cache_keys[style])
+            if cached_story:
+                stories[style] = cached_story
+
+        missing = [style for style in styles if style not in stories]
+        if len(missing) > 1:
+            for start in range(0, len(missing), STORY_BATCH_MAX_STYLES):
+                batch = missing[start:start + STORY_BATCH_MAX_STYLES]
+                if len(batch) == 1:
+                    continue
+                prompt = await self._construct_multi_style_prompt(game_data, user_preferences, batch)
+                try:
+                    response_text = await self._complete(
+                        prompt,
+                        task="story_batch",
+                        style=",".join(batch),
+                        max_queue_wait=max_queue_wait,
+                        context=self._game_context(game_data)
+                    )
+                except LLMOverloadedError:
+                    raise
+                except Exception as e:
+                    print(f"Multi-style story generation failed: {str(e)}")
+                    continue
+                for style, story in self._split_styled_stories(response_text, batch).items():
+                    stories[style] = story
+                    await self._cache_set(cache_keys[style], story, expire=STORY_CACHE_TTL)
+
+        remaining = [style for style in styles if style not in stories]
+        if remaining:
+            results = await asyncio.gather(*(
+                self.generate_story(game_data, user_preferences, style, max_queue_wait=max_queue_wait)
+                for style in remaining
+            ))
+            stories.update(zip(remaining, results))
+
+        return {style: stories[style] for style in styles}
+
+    async def generate_live_story(
+        self,
+        game_id: str,
+        game_data: Dict,
+        user_preferences: Dict,
+        style: str = "dramatic"
+    ) -> Dict:
+        """
+        Update the live narrative of a game with its newly completed half-innings.
+        
+        Only the new half-innings are sent to the model, along with a short
+        running summary, and the result is appended to the stored story.
+        See LiveStoryTeller.
+        
+        Args:
+            game_id: MLB game ID
+            game_data: Processed game data
+            user_preferences: User's preferences (favorite team, players, etc.)
+            style: Narrative style (dramatic, analytical, humorous)
+            
+        Returns:
+            dict: The full 'story' with its 'segments' and update details
+        """
+        return await LiveStoryTeller(self).update(game_id, game_data, user_preferences, style)
+
+    @classmethod
+    def _split_styled_stories(cls, response_text: str, styles: List[str]) -> Dict[str, str]:
+        """Split a multi-style response into stories by style.
+
+        Sections for styles that weren't requested, and empty sections, are
+        dropped. If a style appears twice, the first section wins.
+        """
+        wanted = set(styles)
+        matches = list(cls.STYLE_MARKER_PATTERN.finditer(response_text))
+        stories = {}
+        for i, match in enumerate(matches):
+            style = match.group(1).lower()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response_text)
+            story = response_text[match.end():end].strip()
+            if style in wanted and story and style not in stories:
+                stories[style] = story
+        return stories
+
+    def _story_cache_key(self, prompt: str) -> str:
+        """Cache key for a story; the prompt already covers game data, preferences and style."""
+        digest = hashlib.sha256(" ".join(prompt.split()).encode('utf-8'))
+        return f"story:{self.backend.name}:{digest.hexdigest()[:32]}"
+
+    async def stream_story(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        style: str = "dramatic"
+    ) -> AsyncIterator[str]:
+        """
+        Generate a baseball story and yield it as text chunks as they arrive.
+        
+        Args:
+            game_data: Dictionary containing game statistics and events
+            user_preferences: User's preferences (favorite team, players, etc.)
+            style: Narrative style (dramatic, analytical, humorous)
+            
+        Yields:
+            str: Consecutive pieces of the story narrative
+        """
+        prompt = await self._construct_prompt(game_data, user_preferences, style)
+        
+        try:
+            async for chunk in self._stream(prompt, task="story", style=style, context=self._game_context(game_data)):
+                yield chunk
         except Exception as e:
             raise Exception(f"Failed to generate story: {str(e)}")
     
@@ -181,51 +1074,69 @@ class StoryGenerator:
         style: str
     ) -> str:
         """Construct a prompt for Gemini based on the game data and preferences."""
-        # Extract game summary
-        summary = game_data.get('summary', {})
-        home_team = summary.get('home_team', 'Unknown Team')
-        away_team = summary.get('away_team', 'Unknown Team')
-        home_score = summary.get('home_score', 0)
-        away_score = summary.get('away_score', 0)
-        status = summary.get('status', 'Unknown')
+        context = self._game_context(game_data)
         
+        return f"""{context.text}
+        As a baseball storyteller, create a {style} narrative about the game above.
+        {self._construct_focus(game_data, user_preferences)}
+        Style Guide:
+        - If "dramatic": Create an emotional and engaging narrative that captures the excitement
+        - If "analytical": Focus on statistics, strategy, and technical aspects
+        - If "humorous": Add wit and light-hearted observations
+        Strictly avoid mentioning the style in the story.
+        
+        Make the story personal and engaging, highlighting moments that would interest this specific fan.
+        """
+
+    async def _construct_multi_style_prompt(
+        self,
+        game_data: Dict,
+        user_preferences: Dict,
+        styles: List[str]
+    ) -> str:
+        """Construct a prompt asking for one story per style in a single delimited response."""
+        context = self._game_context(game_data)
+        layout = "\n".join(
+            f"        {self.STYLE_MARKER.format(style=style)}\n        <the {style} story>"
+            for style in styles
+        )
+        
+        return f"""{context.text}
+        As a baseball storyteller, write {len(styles)} separate narratives about the game above, one in each of these styles: {', '.join(styles)}.
+        {self._construct_focus(game_data, user_preferences)}
+        Style Guide:
+        - If "dramatic": Create an emotional and engaging narrative that captures the excitement
+        - If "analytical": Focus on statistics, strategy, and technical aspects
+        - If "humorous": Add wit and light-hearted observations
+        Strictly avoid mentioning the style inside the stories.
+        
+        Make each story personal and engaging, highlighting moments that would interest this specific fan.
+        Each story must stand on its own; do not refer to the other versions.
+        
+        Format your response EXACTLY like this, starting each story with its marker line and writing nothing else:
+{layout}
+        """
+
+    def _construct_focus(self, game_data: Dict, user_preferences: Dict) -> str:
+        """Describe the fan's favorite players and focus; the per-user part of a story prompt."""
         # Get user's favorite team and players
         favorite_team = user_preferences.get('favorite_team')
         favorite_players = user_preferences.get('favorite_players', [])
         
-        # Get key plays
-        key_plays = game_data.get('key_plays', [])
-        play_descriptions = [
-            f"- {play['description']}" 
-            for play in key_plays
-            if 'description' in play
-        ]
-        
         # Get player stats
         player_stats = game_data.get('player_stats', {})
         
-        # Construct the prompt
-        prompt = f"""
-        As a baseball storyteller, create a {style} narrative about this game:
-        
-        Game Summary:
-        {home_team} vs {away_team}
-        Score: {home_team} {home_score}, {away_team} {away_score}
-        Status: {status}
-        
-        Key Plays:
-        {chr(10).join(play_descriptions) if play_descriptions else "No key plays available yet"}
-        
+        focus = """
         Player Statistics:
         """
         
         # Add batting stats if available
         batting_stats = player_stats.get('batting', [])
         if batting_stats:
-            prompt += "\nBatting Highlights:\n"
+            focus += "\nBatting Highlights:\n"
             for stat in batting_stats:
                 if stat.get('name') in favorite_players:
-                    prompt += (
+                    focus += (
                         f"- {stat['name']}: {stat.get('hits', 0)} hits, "
                         f"{stat.get('runs', 0)} runs, {stat.get('rbi', 0)} RBIs\n"
                     )
@@ -233,27 +1144,19 @@ class StoryGenerator:
         # Add pitching stats if available
         pitching_stats = player_stats.get('pitching', [])
         if pitching_stats:
-            prompt += "\nPitching Highlights:\n"
+            focus += "\nPitching Highlights:\n"
             for stat in pitching_stats:
                 if stat.get('name') in favorite_players:
-                    prompt += (
+                    focus += (
                         f"- {stat['name']}: {stat.get('innings_pitched', 0)} IP, "
                         f"{stat.get('earned_runs', 0)} ER, {stat.get('strikeouts', 0)} K\n"
                     )
         
         # Add focus points
-        prompt += f"""
+        focus += f"""
         Focus on:
         - {'Your favorite team: ' + favorite_team if favorite_team else 'Both teams equally'}
         - Key players: {', '.join(favorite_players) if favorite_players else 'All notable performances'}
-        
-        Style Guide:
-        - If "dramatic": Create an emotional and engaging narrative that captures the excitement
-        - If "analytical": Focus on statistics, strategy, and technical aspects
-        - If "humorous": Add wit and light-hearted observations
-        Strictly avoid mentioning the style in the story.
-        
-        Make the story personal and engaging, highlighting moments that would interest this specific fan.
         """
         
-        return prompt 
\ No newline at end of file
+        return focus
\ No newline at end of file
@@ -0,0 +1,181 @@
+from typing import Dict, List, Optional
+import zlib
+
+
+class TemplateNarrator:
+    """Render game recaps from processed game data without calling an LLM.
+
+    Output is deterministic for a given game and style, and rendering is
+    plain string formatting, so it is cheap enough to use as an instant
+    fallback when the LLM is overloaded or failing.
+    """
+
+    STYLES = {
+        'dramatic': {
+            'opening': [
+                "Under the lights at {venue}, the {winner} and the {loser} fought to the very last out.",
+                "{venue} held its breath as the {winner} and the {loser} traded blows all night long.",
+            ],
+            'final': "When the dust settled, the {winner} stood tall, {winner_score}-{loser_score} over the {loser}.",
+            'in_progress': "The {away_team} and the {home_team} are locked in battle, {away_team} {away_score}, {home_team} {home_score}.",
+            'play': "In the {half} of the {inning}, {description}",
+            'leaders': "{name} rose to the moment: {highlight}.",
+            'pitcher': "{winning_pitcher} earned the win on the mound{save_clause}.",
+            'closing': "It was a night the {winner} faithful will not soon forget.",
+        },
+        'analytical': {
+            'opening': [
+                "The {winner} defeated the {loser} at {venue}, and the box score tells a clear story.",
+                "A look at the numbers from {venue} shows how the {winner} handled the {loser}.",
+            ],
+            'final': "Final: {winner} {winner_score}, {loser} {loser_score}, a {margin}-run margin.",
+            'in_progress': "Current score: {away_team} {away_score}, {home_team} {home_score}.",
+            'play': "{Half} {inning}: {description}",
+            'leaders': "{name} posted {highlight}.",
+            'pitcher': "Decision: {winning_pitcher} (W){save_clause}.",
+            'closing': "Run production in key innings was the difference.",
+        },
+        'humorous': {
+            'opening': [
+                "Somebody had to win at {venue}, and the {winner} kindly volunteered against the {loser}.",
+                "The {winner} and the {loser} met at {venue}, and only one of them read the script.",
+            ],
+            'final': "The scoreboard settled the argument: {winner} {winner_score}, {loser} {loser_score}.",
+            'in_progress': "So far it's {away_team} {away_score}, {home_team} {home_score}, and nobody is leaving early.",
+            'play': "{Half} of the {inning}, and the plot thickens: {description}",
+            'leaders': "{name} clearly had somewhere to be, going {highlight}.",
+            'pitcher': "{winning_pitcher} gets the W and bragging rights{save_clause}.",
+            'closing': "The {loser} will be looking for a better punchline next time.",
+        },
+        'casual': {
+            'opening': [
+                "The {winner} beat the {loser} at {venue}.",
+                "It was the {winner} over the {loser} at {venue}.",
+            ],
+            'final': "The final was {winner} {winner_score}, {loser} {loser_score}.",
+            'in_progress': "Right now it's {away_team} {away_score}, {home_team} {home_score}.",
+            'play': "In the {half} of the {inning}, {description}",
+            'leaders': "{name} had a good day: {highlight}.",
+            'pitcher': "{winning_pitcher} picked up the win{save_clause}.",
+            'closing': "A solid game from start to finish.",
+        },
+    }
+
+    MAX_SCORING_PLAYS = 6
+    MAX_LEADERS = 3
+
+    def render(self, game_data: Dict, style: str = "dramatic") -> str:
+        """
+        Render a recap of a game.
+
+        Args:
+            game_data: Processed game data (summary, leaders, plays, result)
+            style: Narrative style (dramatic, analytical, humorous, casual)
+
+        Returns:
+            str: Recap narrative
+        """
+        templates = self.STYLES.get(style, self.STYLES['dramatic'])
+        summary = game_data.get('summary', {}) or {}
+        result = game_data.get('result')
+
+        home_team = summary.get('home_team') or 'the home team'
+        away_team = summary.get('away_team') or 'the visitors'
+        home_score = summary.get('home_score') or 0
+        away_score = summary.get('away_score') or 0
+
+        if home_score >= away_score:
+            winner, loser, winner_score, loser_score = home_team, away_team, home_score, away_score
+        else:
+            winner, loser, winner_score, loser_score = away_team, home_team, away_score, home_score
+
+        values = {
+            'venue': summary.get('venue') or 'the ballpark',
+            'home_team': home_team,
+            'away_team': away_team,
+            'home_score': home_score,
+            'away_score': away_score,
+            'winner': winner,
+            'loser': loser,
+            'winner_score': winner_score,
+            'loser_score': loser_score,
+            'margin': abs(home_score - away_score),
+        }
+
+        variant = zlib.crc32(f"{home_team}|{away_team}|{summary.get('game_date')}".encode('utf-8'))
+        paragraphs = []
+
+        if result:
+            openings = templates['opening']
+            paragraphs.append(" ".join([
+                openings[variant % len(openings)].format(**values),
+                templates['final'].format(**values),
+            ]))
+        else:
+            paragraphs.append(templates['in_progress'].format(**values))
+
+        play_lines = self._scoring_play_lines(game_data, templates)
+        if play_lines:
+            paragraphs.append(" ".join(play_lines))
+
+        leader_lines = self._leader_lines(game_data, templates)
+        pitcher_line = self._pitcher_line(result, templates)
+        if pitcher_line:
+            leader_lines.append(pitcher_line)
+        if leader_lines:
+            paragraphs.append(" ".join(leader_lines))
+
+        if result:
+            paragraphs.append(templates['closing'].format(**values))
+
+        return "\n\n".join(paragraphs)
+
+    def _scoring_play_lines(self, game_data: Dict, templates: Dict) -> List[str]:
+        scoring_plays = (game_data.get('plays') or {}).get('scoring_plays') or []
+        lines = []
+        for play in scoring_plays[:self.MAX_SCORING_PLAYS]:
+            if not isinstance(play, dict) or not play.get('description'):
+                continue
+            half = (play.get('half_inning') or '').lower() or 'top'
+            description = play['description'].strip()
+            lines.append(templates['play'].format(
+                half=half,
+                Half=half.title(),
+                inning=self._ordinal(play.get('inning')),
+                description=description,
+            ))
+        return lines
+
+    def _leader_lines(self, game_data: Dict, templates: Dict) -> List[str]:
+        leaders = game_data.get('leaders') or {}
+        standouts = (leaders.get('batting') or []) + (leaders.get('pitching') or [])
+        return [
+            templates['leaders'].format(name=leader['name'], highlight=leader.get('highlight', ''))
+            for leader in standouts[:self.MAX_LEADERS]
+            if leader.get('name')
+        ]
+
+    def _pitcher_line(self, result: Optional[Dict], templates: Dict) -> Optional[str]:
+        if not result:
+            return None
+        winning_pitcher = self._player_name(result.get('winning_pitcher'))
+        if not winning_pitcher:
+            return None
+        closer = self._player_name(result.get('save'))
+        save_clause = f", with {closer} closing it out for the save" if closer else ""
+        return templates['pitcher'].format(winning_pitcher=winning_pitcher, save_clause=save_clause)
+
+    @staticmethod
+    def _player_name(player: Optional[Dict]) -> Optional[str]:
+        if not player:
+            return None
+        return player.get('fullName') or player.get('name')
+
+    @staticmethod
+    def _ordinal(inning) -> str:
+        try:
+            n = int(inning)
+        except (TypeError, ValueError):
+            return "inning"
+        suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+        return f"{n}{suffix}"
@@ -0,0 +1,305 @@
+"""Tests for merging TTS audio chunks into one MP3 or Ogg Opus stream.
+
+MP3 frames and Ogg pages are built here byte by byte, shaped like Google
+TTS responses (ID3 tag and Info frame on every MP3, OpusHead and OpusTags
+on every Ogg file). Run with ``python -m pytest test_audio_assembly.py``.
+"""
+import struct
+
+import pytest
+
+from mlb_storyteller.services.audio_assembly import AudioAssembler, finalize_audio, media_type_for
+
+# --- MP3 ---------------------------------------------------------------------
+
+# MPEG-1 Layer III, 44.1 kHz, no CRC; the Xing/Info tag sits after 32 bytes of stereo side info
+TAG_OFFSET = 36
+BITRATES = {1: 32, 9: 128, 11: 192}
+
+
+def mp3_frame(fill: int = 1, bitrate_index: int = 9, padding: int = 0) -> bytes:
+    length = 144 * BITRATES[bitrate_index] * 1000 // 44100 + padding
+    return bytes([0xFF, 0xFB, (bitrate_index << 4) | (padding << 1), 0x00]) + bytes([fill]) * (length - 4)
+
+
+def info_frame(tag: bytes = b"Info") -> bytes:
+    frame = bytearray(mp3_frame(0))
+    frame[TAG_OFFSET:TAG_OFFSET + 16] = struct.pack(">4sIII", tag, 3, 99, 99999)
+    return bytes(frame)
+
+
+def id3v2(payload: bytes = b"TSSE\0\0\0\x05\0\0Lavf") -> bytes:
+    size = len(payload)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x04\x00\x00" + syncsafe + payload
+
+
+def tts_mp3(frames) -> bytes:
+    """An MP3 the way the TTS API returns it: ID3 tag, Info frame, then audio frames."""
+    return id3v2() + info_frame() + b"".join(frames)
+
+
+def split_frames(audio: bytes):
+    frames, pos = [], 0
+    while pos < len(audio):
+        bitrate_index, padding = audio[pos + 2] >> 4, (audio[pos + 2] >> 1) & 1
+        length = 144 * BITRATES[bitrate_index] * 1000 // 44100 + padding
+        frames.append(audio[pos:pos + length])
+        pos += length
+    return frames
+
+
+def test_mp3_chunks_lose_their_id3_tags_and_info_frames():
+    first = [mp3_frame(1), mp3_frame(2, padding=1)]
+    second = [mp3_frame(3), mp3_frame(4)]
+    assembler = AudioAssembler("mp3")
+
+    audio = assembler.add(tts_mp3(first)) + assembler.add(tts_mp3(second), last=True)
+
+    assert audio == b"".join(first + second)
+
+
+def test_mp3_id3v1_trailer_is_dropped():
+    frames = [mp3_frame(5), mp3_frame(6)]
+    trailer = b"TAG" + b"\0" * 125
+
+    assert AudioAssembler("mp3").add(tts_mp3(frames) + trailer) == b"".join(frames)
+
+
+def test_finalized_mp3_has_one_info_frame_counting_the_whole_narration():
+    chunks = [[mp3_frame(i) for i in range(1, 4)], [mp3_frame(i) for i in range(4, 9)]]
+    assembler = AudioAssembler("mp3")
+    assembled = b"".join(assembler.add(tts_mp3(frames)) for frames in chunks)
+
+    audio = finalize_audio(assembled, "mp3")
+
+    frames = split_frames(audio)
+    tag, flags, frame_count, byte_count = struct.unpack_from(">4sIII", frames[0], TAG_OFFSET)
+    assert (tag, flags) == (b"Info", 3)
+    assert frame_count == 8
+    assert byte_count == len(audio)
+    assert frames[1:] == [frame for chunk in chunks for frame in chunk]
+    assert sum(frame[TAG_OFFSET:TAG_OFFSET + 4] in (b"Info", b"Xing") for frame in frames) == 1
+
+
+def test_finalize_audio_is_idempotent():
+    once = finalize_audio(tts_mp3([mp3_frame(1), mp3_frame(2)]), "mp3")
+
+    assert finalize_audio(once, "mp3") == once
+
+
+def test_mixed_bitrates_get_a_xing_tag():
+    audio = finalize_audio(b"".join([mp3_frame(1), mp3_frame(2, bitrate_index=11)]), "mp3")
+
+    assert audio[TAG_OFFSET:TAG_OFFSET + 4] == b"Xing"
+
+
+def test_low_bitrate_info_frame_still_fits_its_tag():
+    audio = finalize_audio(b"".join(mp3_frame(i, bitrate_index=1) for i in range(1, 4)), "mp3")
+
+    frames = split_frames(audio)
+    assert struct.unpack_from(">4sIII", frames[0], TAG_OFFSET)[2:] == (3, len(audio))
+    assert frames[1:] == [mp3_frame(i, bitrate_index=1) for i in range(1, 4)]
+
+
+def test_junk_between_mp3_frames_is_skipped():
+    frames = [mp3_frame(1), mp3_frame(2)]
+
+    assert AudioAssembler("mp3").add(frames[0] + b"\0\0junk\0" + frames[1]) == b"".join(frames)
+
+
+def test_audio_that_is_not_mp3_passes_through():
+    assert AudioAssembler("mp3").add(b"not audio") == b"not audio"
+    assert finalize_audio(b"not audio", "mp3") == b"not audio"
+
+
+# --- Ogg Opus ----------------------------------------------------------------
+
+BOS, EOS, CONTINUED = 0x02, 0x04, 0x01
+NO_GRANULE = 0xFFFFFFFFFFFFFFFF
+# CELT fullband 20 ms, one frame per packet
+OPUS_TOC = 31 << 3
+SAMPLES_PER_PACKET = 960
+
+
+def ogg_crc(page: bytes) -> int:
+    """Ogg's CRC-32 (polynomial 0x04C11DB7, not reflected), bit by bit."""
+    crc = 0
+    for byte in page:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) & 0xFFFFFFFF if crc & 0x80000000 else (crc << 1) & 0xFFFFFFFF
+    return crc
+
+
+def lacing_for(packets, continues: bool = False) -> bytes:
+    lacing = []
+    for i, packet in enumerate(packets):
+        lacing += [255] * (len(packet) // 255)
+        if not (continues and i == len(packets) - 1):
+            lacing.append(len(packet) % 255)
+    return bytes(lacing)
+
+
+def ogg_page(serial: int, sequence: int, flags: int, granule: int, packets, continues: bool = False) -> bytes:
+    """A page holding packets; with continues, the last one carries on into the next page."""
+    lacing = lacing_for(packets, continues)
+    page = bytearray(struct.pack("<4sBBQIIIB", b"OggS", 0, flags, granule, serial, sequence, 0, len(lacing)))
+    page += lacing + b"".join(packets)
+    struct.pack_into("<I", page, 22, ogg_crc(page))
+    return bytes(page)
+
+
+def opus_packet(fill: int, size: int = 40) -> bytes:
+    return bytes([OPUS_TOC]) + bytes([fill]) * (size - 1)
+
+
+def tts_ogg(serial: int, audio_pages, trim: int = 0) -> bytes:
+    """An Ogg Opus file the way the TTS API returns it: its own serial, headers, then audio pages."""
+    pages = [
+        ogg_page(serial, 0, BOS, 0, [b"OpusHead\x01\x01\x38\x01\x80\xbb\0\0\0\0\0"]),
+        ogg_page(serial, 1, 0, 0, [b"OpusTags" + bytes(8)]),
+    ]
+    samples = 0
+    for i, packets in enumerate(audio_pages):
+        samples += SAMPLES_PER_PACKET * len(packets)
+        last = i == len(audio_pages) - 1
+        pages.append(ogg_page(serial, i + 2, EOS if last else 0, samples - (trim if last else 0), packets))
+    return b"".join(pages)
+
+
+def parse_pages(audio: bytes):
+    pages, pos = [], 0
+    while pos < len(audio):
+        assert audio[pos:pos + 4] == b"OggS"
+        _, _, flags, granule, serial, sequence, crc, count = struct.unpack_from("<4sBBQIIIB", audio, pos)
+        lacing = audio[pos + 27:pos + 27 + count]
+        end = pos + 27 + count + sum(lacing)
+        page = audio[pos:end]
+        pages.append({
+            'flags': flags, 'granule': granule, 'serial': serial, 'sequence': sequence,
+            'crc_ok': ogg_crc(page[:22] + b"\0\0\0\0" + page[26:]) == crc,
+            'lacing': lacing, 'body': page[27 + count:],
+        })
+        pos = end
+    return pages
+
+
+def packets_of(pages):
+    """Reassemble packets from pages, following lacing across page boundaries."""
+    packets, current = [], b""
+    for page in pages:
+        offset = 0
+        for value in page['lacing']:
+            current += page['body'][offset:offset + value]
+            offset += value
+            if value < 255:
+                packets.append(current)
+                current = b""
+    return packets
+
+
+def chunks():
+    first = [[opus_packet(1), opus_packet(2)], [opus_packet(3)]]
+    second = [[opus_packet(4)], [opus_packet(5), opus_packet(6)]]
+    return (first, tts_ogg(0x1111, first, trim=100)), (second, tts_ogg(0x2222, second, trim=200))
+
+
+def assemble(*files, finish: bool = False) -> bytes:
+    assembler = AudioAssembler("ogg_opus")
+    audio = b"".join(assembler.add(data, last=not finish and i == len(files) - 1) for i, data in enumerate(files))
+    return audio + (assembler.finish() if finish else b"")
+
+
+def test_ogg_chunks_become_one_logical_stream():
+    (first, first_file), (second, second_file) = chunks()
+
+    pages = parse_pages(assemble(first_file, second_file))
+
+    assert {page['serial'] for page in pages} == {0x1111}
+    assert [page['sequence'] for page in pages] == list(range(len(pages)))
+    assert all(page['crc_ok'] for page in pages)
+
+
+def test_ogg_headers_are_kept_once_and_bos_eos_mark_the_ends():
+    (_, first_file), (_, second_file) = chunks()
+
+    pages = parse_pages(assemble(first_file, second_file))
+
+    assert [page['flags'] & BOS for page in pages] == [BOS] + [0] * (len(pages) - 1)
+    assert [page['flags'] & EOS for page in pages] == [0] * (len(pages) - 1) + [EOS]
+    packets = packets_of(pages)
+    assert [packet[:8] for packet in packets[:2]] == [b"OpusHead", b"OpusTags"]
+    assert sum(packet.startswith((b"OpusHead", b"OpusTags")) for packet in packets) == 2
+
+
+def test_ogg_granules_run_on_from_earlier_chunks():
+    (first, first_file), (second, second_file) = chunks()
+
+    pages = parse_pages(assemble(first_file, second_file))
+
+    first_samples = SAMPLES_PER_PACKET * sum(len(packets) for packets in first)
+    assert [page['granule'] for page in pages] == [
+        0, 0,
+        2 * SAMPLES_PER_PACKET,
+        # Not the end of the narration, so the first chunk's end trim is dropped
+        first_samples,
+        first_samples + SAMPLES_PER_PACKET,
+        # The narration's own end trim is kept
+        first_samples + 3 * SAMPLES_PER_PACKET - 200,
+    ]
+
+
+def test_ogg_audio_packets_round_trip():
+    (first, first_file), (second, second_file) = chunks()
+
+    packets = packets_of(parse_pages(assemble(first_file, second_file)))
+
+    assert packets[2:] == [packet for page in first + second for packet in page]
+
+
+def test_ogg_packets_spanning_pages_keep_no_granule_until_they_complete():
+    long_packet = opus_packet(7, size=300)
+    serial = 0x3333
+    file = b"".join([
+        ogg_page(serial, 0, BOS, 0, [b"OpusHead" + bytes(11)]),
+        ogg_page(serial, 1, 0, 0, [b"OpusTags" + bytes(8)]),
+        ogg_page(serial, 2, 0, NO_GRANULE, [long_packet[:255]], continues=True),
+        ogg_page(serial, 3, CONTINUED | EOS, SAMPLES_PER_PACKET, [long_packet[255:]]),
+    ])
+    (_, first_file), _ = chunks()
+
+    pages = parse_pages(assemble(first_file, file))
+
+    first_samples = 3 * SAMPLES_PER_PACKET
+    assert [page['granule'] for page in pages[-2:]] == [NO_GRANULE, first_samples + SAMPLES_PER_PACKET]
+    assert pages[-1]['flags'] & CONTINUED
+    assert packets_of(pages)[-1] == long_packet
+
+
+def test_finish_ends_an_ogg_stream_whose_last_chunk_was_not_known():
+    (_, first_file), (_, second_file) = chunks()
+
+    pages = parse_pages(assemble(first_file, second_file, finish=True))
+
+    assert [page['flags'] & EOS for page in pages].count(EOS) == 1
+    assert pages[-1]['flags'] & EOS and pages[-1]['body'] == b""
+    assert pages[-1]['granule'] == pages[-2]['granule']
+    assert [page['sequence'] for page in pages] == list(range(len(pages)))
+    assert all(page['crc_ok'] for page in pages)
+
+
+def test_finalize_audio_leaves_ogg_unchanged():
+    (_, first_file), _ = chunks()
+    audio = assemble(first_file)
+
+    assert finalize_audio(audio, "ogg_opus") == audio
+
+
+@pytest.mark.parametrize("audio, media_type", [
+    (b"OggS\0\x02", "audio/ogg"),
+    (b"ID3\x04", "audio/mpeg"),
+    (b"\xff\xfb\x90\0", "audio/mpeg"),
+])
+def test_media_type_is_read_from_the_audio(audio, media_type):
+    assert media_type_for(audio) == media_type
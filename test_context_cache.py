@@ -0,0 +1,86 @@
+"""Tests that backend context handles stay usable while games are interleaved.
+
+Uses the stub backend with no latency and a small GAME_CONTEXT_CACHE_SIZE.
+Run with ``python -m pytest test_context_cache.py``.
+"""
+import asyncio
+
+import pytest
+
+from mlb_storyteller.story_engine import game_context, llm_backends, story_generator
+from mlb_storyteller.story_engine.game_context import GameContext
+from mlb_storyteller.story_engine.llm_backends import StubBackend
+from mlb_storyteller.story_engine.llm_queue import LLMQueue
+from mlb_storyteller.story_engine.single_flight import SingleFlight
+from mlb_storyteller.story_engine.story_generator import StoryGenerator
+
+CACHE_SIZE = 3
+
+
+@pytest.fixture(autouse=True)
+def small_caches(monkeypatch):
+    for module in (game_context, llm_backends, story_generator):
+        monkeypatch.setattr(module, "GAME_CONTEXT_CACHE_SIZE", CACHE_SIZE)
+    for registry in (GameContext._cache, StubBackend._contexts, StoryGenerator._context_handles):
+        registry.clear()
+    yield
+    for registry in (GameContext._cache, StubBackend._contexts, StoryGenerator._context_handles):
+        registry.clear()
+
+
+def game(pk: int) -> dict:
+    return {
+        'game_pk': pk,
+        'data_version': '20240621_213512',
+        'summary': {'home_team': f"Home {pk}", 'away_team': f"Away {pk}", 'home_score': pk, 'away_score': 1},
+    }
+
+
+def generator() -> StoryGenerator:
+    backend = StubBackend(latency_distribution="fixed", latency_ms=0, chunk_interval_ms=0)
+    return StoryGenerator(backend=backend, single_flight=SingleFlight(enabled=False), llm_queue=LLMQueue())
+
+
+async def tell(generator: StoryGenerator, game_data: dict) -> str:
+    context = generator._game_context(game_data)
+    return await generator._complete(context.text + "Write a recap.", "story", context=context)
+
+
+def test_a_busy_game_keeps_its_context_while_other_games_come_and_go():
+    async def run():
+        stories = generator()
+        told = []
+        # Game 1 between every other game, with more games than the caches hold
+        for pk in range(2, 3 * CACHE_SIZE + 2):
+            told.append(await tell(stories, game(1)))
+            told.append(await tell(stories, game(pk)))
+        return told
+
+    told = asyncio.run(run())
+    assert len(told) == 6 * CACHE_SIZE
+    assert len(StubBackend._contexts) <= CACHE_SIZE
+    assert len(StoryGenerator._context_handles) <= CACHE_SIZE
+
+
+def test_a_handle_the_backend_dropped_is_registered_again():
+    async def run():
+        stories = generator()
+        first = await tell(stories, game(1))
+        StubBackend._contexts.clear()
+        again = await tell(stories, game(1))
+        StubBackend._contexts.clear()
+        context = stories._game_context(game(1))
+        streamed = [chunk async for chunk in stories._stream(context.text + "Stream a recap.", "story", context=context)]
+        return first, again, streamed
+
+    first, again, streamed = asyncio.run(run())
+    assert again == first
+    assert streamed
+    assert len(StubBackend._contexts) == 1
+
+
+def test_fetched_feeds_are_versioned_without_hashing():
+    assert GameContext.version_of(game(7)) == "7:20240621_213512"
+    unversioned = {'summary': {'home_team': "Cubs"}}
+    assert GameContext.version_of(unversioned) == GameContext.version_of(dict(unversioned))
+    assert GameContext.version_of(unversioned) != GameContext.version_of({'summary': {'home_team': "Mets"}})
@@ -0,0 +1,139 @@
+"""Check that the preference, history and popularity queries are served by indexes.
+
+Needs a MongoDB at MONGODB_URI (``docker compose -f docker-compose.test.yml
+up mongodb``) and is skipped without one. Works in a scratch database that
+is dropped afterwards; run with ``python -m pytest test_db_indexes.py``.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+motor_asyncio = pytest.importorskip("motor.motor_asyncio")
+
+from mlb_storyteller.config import MONGODB_URI, MONGODB_DB_NAME
+from mlb_storyteller.preferences.db_service import DatabaseService
+from mlb_storyteller.preferences.models import UserPreferencesDB
+
+TEST_DB_NAME = f"{MONGODB_DB_NAME}_index_test"
+
+
+def plan_stages(plan: dict) -> list:
+    """Stage names of a winning plan, from the root down."""
+    stages = [plan["stage"]]
+    for child in plan.get("inputStages", []) + ([plan["inputStage"]] if "inputStage" in plan else []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def winning_plan(explain: dict) -> dict:
+    planner = explain["queryPlanner"]
+    # Newer servers nest the classic plan under queryPlan
+    return planner["winningPlan"].get("queryPlan", planner["winningPlan"])
+
+
+async def with_database(check):
+    client = motor_asyncio.AsyncIOMotorClient(MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        try:
+            await client.admin.command("ping")
+        except Exception as e:
+            pytest.skip(f"MongoDB is not reachable at {MONGODB_URI}: {e}")
+        service = DatabaseService(client, TEST_DB_NAME)
+        await client.drop_database(TEST_DB_NAME)
+        try:
+            await service.ensure_indexes()
+            return await check(service)
+        finally:
+            await client.drop_database(TEST_DB_NAME)
+    finally:
+        client.close()
+
+
+def test_preferences_lookup_uses_the_unique_user_index():
+    async def check(service):
+        await service.preferences_collection.insert_many(
+            [{"user_id": f"user-{i}", "favorite_team": "Cubs"} for i in range(200)]
+        )
+        return await service.preferences_collection.find({"user_id": "user-42"}).explain()
+
+    stages = plan_stages(winning_plan(asyncio.run(with_database(check))))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+
+def test_history_query_uses_the_compound_index_without_sorting_in_memory():
+    async def check(service):
+        start = datetime(2024, 4, 1)
+        await service.history_collection.insert_many([
+            {"user_id": f"user-{i % 20}", "game_id": str(i), "narrative_style": "dramatic",
+             "generated_at": start + timedelta(minutes=i)}
+            for i in range(400)
+        ])
+        cursor = service.history_collection.find({"user_id": "user-7"}).sort("generated_at", -1).limit(10)
+        return await cursor.explain()
+
+    stages = plan_stages(winning_plan(asyncio.run(with_database(check))))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert "SORT" not in stages
+
+
+def test_ensure_indexes_is_idempotent_and_preferences_are_saved_once_per_user():
+    async def check(service):
+        await service.ensure_indexes()
+        for team in ("Cubs", "Mets"):
+            await service.create_user_preferences("user-1", UserPreferencesDB(user_id="user-1", favorite_team=team))
+        names = [index["name"] async for index in service.preferences_collection.list_indexes()]
+        documents = await service.preferences_collection.count_documents({"user_id": "user-1"})
+        return names, documents, await service.get_user_preferences("user-1")
+
+    names, documents, preferences = asyncio.run(with_database(check))
+    assert sorted(names) == ["_id_", "user_id_1"]
+    assert documents == 1
+    assert preferences.favorite_team == "Mets"
+
+
+def test_popular_top_n_is_read_off_the_counter_index():
+    async def check(service):
+        await service.popularity_collection.insert_many(
+            [{"kind": "player", "name": f"player-{i}", "count": i % 50} for i in range(500)]
+        )
+        cursor = service.popularity_collection.find({"kind": "player", "count": {"$gt": 0}}).sort("count", -1).limit(5)
+        return await cursor.explain()
+
+    stages = plan_stages(winning_plan(asyncio.run(with_database(check))))
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert "SORT" not in stages
+
+
+def test_popularity_counters_follow_preference_changes_and_reconcile_fixes_drift():
+    async def check(service):
+        async def save(user_id, team, players):
+            await service.create_user_preferences(
+                user_id, UserPreferencesDB(user_id=user_id, favorite_team=team, favorite_players=players)
+            )
+
+        await save("user-1", "Cubs", ["Ian Happ", "Dansby Swanson"])
+        await save("user-2", "Cubs", ["Ian Happ"])
+        await save("user-3", "Mets", ["Pete Alonso", "Pete Alonso"])
+        # user-1 switches teams and drops a player
+        await save("user-1", "Mets", ["Ian Happ"])
+        incremental = (await service.get_popular_teams(), await service.get_popular_players())
+
+        # Counter writes lost after their preference writes went through
+        await service.popularity_collection.update_one({"kind": "team", "name": "Mets"}, {"$inc": {"count": 5}})
+        await service.popularity_collection.delete_one({"kind": "player", "name": "Pete Alonso"})
+        corrected = await service.reconcile_popularity()
+        reconciled = (await service.get_popular_teams(), await service.get_popular_players())
+        return incremental, corrected, reconciled
+
+    incremental, corrected, reconciled = asyncio.run(with_database(check))
+    expected = (
+        [{"team": "Mets", "count": 2}, {"team": "Cubs", "count": 1}],
+        [{"player": "Ian Happ", "count": 2}, {"player": "Pete Alonso", "count": 1}],
+    )
+    assert incremental == expected
+    assert corrected == 2
+    assert reconciled == expected
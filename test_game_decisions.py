@@ -0,0 +1,99 @@
+"""Tests that pitching decisions from the live feed reach the quiz and the recap.
+
+Uses a trimmed real feed: ``liveData.decisions`` entries carry ``id`` and
+``fullName`` directly, unlike roster entries which nest them under
+``person``. Run with ``python -m pytest test_game_decisions.py``.
+"""
+from mlb_storyteller.data.mlb_data_fetcher import MLBDataFetcher
+from mlb_storyteller.story_engine.quiz_engine import RuleBasedQuizEngine
+from mlb_storyteller.story_engine.template_narrator import TemplateNarrator
+
+FINAL_FEED = {
+    "gameData": {
+        "status": {"abstractGameState": "Final", "detailedState": "Final"},
+        "teams": {"home": {"name": "Chicago Cubs"}, "away": {"name": "New York Mets"}},
+        "venue": {"name": "Wrigley Field"},
+        "datetime": {"dateTime": "2024-06-21T18:20:00Z"},
+        "flags": {},
+        "gameInfo": {"gameDurationMinutes": 162},
+    },
+    "liveData": {
+        "linescore": {
+            "currentInning": 9,
+            "scheduledInnings": 9,
+            "teams": {"home": {"runs": 5, "hits": 9}, "away": {"runs": 3, "hits": 7}},
+        },
+        "boxscore": {"teams": {"home": {}, "away": {}}},
+        "plays": {
+            "allPlays": [
+                {
+                    "about": {"inning": 7, "halfInning": "top", "isScoringPlay": False},
+                    "result": {"event": "Strikeout", "description": "Pete Alonso strikes out swinging."},
+                    "matchup": {
+                        "batter": {"id": 624413, "fullName": "Pete Alonso", "link": "/api/v1/people/624413"},
+                        "pitcher": {"id": 643410, "fullName": "Mark Leiter Jr.", "link": "/api/v1/people/643410"},
+                    },
+                },
+                {
+                    "about": {"inning": 8, "halfInning": "bottom", "isScoringPlay": False},
+                    "result": {"event": "Groundout", "description": "Ian Happ grounds out to second."},
+                    "matchup": {
+                        "batter": {"id": 664023, "fullName": "Ian Happ", "link": "/api/v1/people/664023"},
+                        "pitcher": {"id": 502085, "fullName": "Adam Ottavino", "link": "/api/v1/people/502085"},
+                    },
+                },
+            ],
+            "scoringPlays": [],
+        },
+        "decisions": {
+            "winner": {"id": 543294, "fullName": "Kyle Hendricks", "link": "/api/v1/people/543294"},
+            "loser": {"id": 594798, "fullName": "Jacob deGrom", "link": "/api/v1/people/594798"},
+            "save": {"id": 664126, "fullName": "Héctor Neris", "link": "/api/v1/people/664126"},
+        },
+    },
+}
+
+
+def process(feed=FINAL_FEED):
+    return MLBDataFetcher()._process_game_data(feed)
+
+
+def test_decision_pitchers_are_extracted_from_the_feed():
+    result = process()["result"]
+
+    assert result["winning_pitcher"] == {"id": 543294, "fullName": "Kyle Hendricks"}
+    assert result["losing_pitcher"] == {"id": 594798, "fullName": "Jacob deGrom"}
+    assert result["save"] == {"id": 664126, "fullName": "Héctor Neris"}
+    assert result["winner"] == "Chicago Cubs"
+
+
+def test_play_matchups_keep_player_names():
+    plays = process()["plays"]["all_plays"]
+
+    assert [(play["batter"]["fullName"], play["pitcher"]["fullName"]) for play in plays] == [
+        ("Pete Alonso", "Mark Leiter Jr."),
+        ("Ian Happ", "Adam Ottavino"),
+    ]
+
+
+def test_no_save_is_none():
+    feed = {**FINAL_FEED, "liveData": {**FINAL_FEED["liveData"], "decisions": {
+        key: value for key, value in FINAL_FEED["liveData"]["decisions"].items() if key != "save"
+    }}}
+    assert process(feed)["result"]["save"] is None
+
+
+def test_quiz_asks_for_the_winning_pitcher():
+    questions = RuleBasedQuizEngine().build(process())
+    question = next(q for q in questions if q["question"] == "Which pitcher earned the win in this game?")
+
+    assert question["correct_answer"] == "Kyle Hendricks"
+    assert "Kyle Hendricks" in question["options"]
+    assert "Chicago Cubs" in question["explanation"]
+
+
+def test_recap_credits_the_decisions():
+    story = TemplateNarrator().render(process(), "casual")
+
+    assert "Kyle Hendricks picked up the win, with Héctor Neris closing it out for the save." in story
+    assert "Chicago Cubs" in story and "Home Team" not in story
@@ -0,0 +1,153 @@
+"""Tests for the write-behind story history writer, against a fake database.
+
+Run with ``python -m pytest test_history_writer.py``.
+"""
+import asyncio
+
+from mlb_storyteller.preferences.db_service import HistoryRecordsRejected
+from mlb_storyteller.preferences.history_writer import StoryHistoryWriter
+from mlb_storyteller.preferences.models import UserStoryHistory
+
+
+class FakeDatabaseService:
+    """Records insert_many batches; fails while ``down`` is set and always rejects ``invalid`` games."""
+
+    def __init__(self, latency: float = 0):
+        self.batches = []
+        self.down = False
+        self.invalid = set()
+        self.attempts = 0
+        self.latency = latency
+
+    async def add_story_histories(self, histories):
+        self.attempts += 1
+        await asyncio.sleep(self.latency)
+        if self.down:
+            raise ConnectionError("MongoDB is down")
+        rejected = [i for i, history in enumerate(histories) if history.game_id in self.invalid]
+        self.batches.append([history.game_id for history in histories if history.game_id not in self.invalid])
+        if rejected:
+            raise HistoryRecordsRejected(rejected, len(histories) - len(rejected), ["Document failed validation"])
+        return len(histories)
+
+
+def record(i: int) -> UserStoryHistory:
+    return UserStoryHistory(user_id="fan", game_id=str(i), narrative_style="dramatic")
+
+
+def test_full_batches_are_written_without_waiting_for_the_interval():
+    async def run():
+        db = FakeDatabaseService()
+        writer = StoryHistoryWriter(db, batch_size=10, flush_interval=60)
+        writer.start()
+        for i in range(20):
+            writer.add(record(i))
+        await asyncio.sleep(0.05)
+        for i in range(20, 25):
+            writer.add(record(i))
+        await asyncio.sleep(0.05)
+        early = list(db.batches)
+        await writer.stop()
+        return early, db.batches
+
+    early, batches = asyncio.run(run())
+    assert [len(batch) for batch in early] == [10, 10]
+    # The partial batch is drained on shutdown, and order is kept
+    assert [game for batch in batches for game in batch] == [str(i) for i in range(25)]
+
+
+def test_partial_batches_are_written_after_the_interval():
+    async def run():
+        db = FakeDatabaseService()
+        writer = StoryHistoryWriter(db, batch_size=100, flush_interval=0.05)
+        writer.start()
+        writer.add(record(1))
+        writer.add(record(2))
+        await asyncio.sleep(0.2)
+        batches = list(db.batches)
+        await writer.stop()
+        return batches
+
+    assert asyncio.run(run()) == [["1", "2"]]
+
+
+def test_add_does_not_wait_on_a_slow_database_and_shutdown_keeps_the_write_in_flight():
+    async def run():
+        slow = FakeDatabaseService(latency=10)
+        writer = StoryHistoryWriter(slow, batch_size=1, flush_interval=60)
+        writer.start()
+        writer.add(record(0))
+        await asyncio.sleep(0.01)  # the flush task is now stuck writing record 0
+        accepted = [writer.add(record(i)) for i in range(1, 50)]
+        fast = FakeDatabaseService()
+        writer._db_service = fast
+        await writer.stop()
+        return accepted, fast.batches
+
+    accepted, batches = asyncio.run(run())
+    assert all(accepted)
+    # Cancelling the stuck write put record 0 back at the front of the buffer
+    assert [game for batch in batches for game in batch] == [str(i) for i in range(50)]
+
+
+def test_failed_batches_are_retried_and_the_backlog_is_bounded():
+    async def run():
+        db = FakeDatabaseService()
+        db.down = True
+        writer = StoryHistoryWriter(db, batch_size=5, flush_interval=60, max_backlog=20)
+        accepted = [writer.add(record(i)) for i in range(30)]
+        assert await writer.flush() == 0
+        backlog = writer.backlog
+        db.down = False
+        written = await writer.flush()
+        return accepted, backlog, written, db.batches
+
+    accepted, backlog, written, batches = asyncio.run(run())
+    assert accepted == [True] * 20 + [False] * 10
+    assert backlog == 20
+    assert written == 20
+    assert [game for batch in batches for game in batch] == [str(i) for i in range(20)]
+
+
+def test_rejected_records_are_dropped_without_blocking_the_rest():
+    async def run():
+        db = FakeDatabaseService()
+        db.invalid = {"2", "7"}
+        writer = StoryHistoryWriter(db, batch_size=5, flush_interval=60)
+        for i in range(10):
+            writer.add(record(i))
+        written = await writer.flush()
+        backlog = writer.backlog
+        writer.add(record(10))
+        return written, backlog, await writer.flush(), db.batches
+
+    written, backlog, later, batches = asyncio.run(run())
+    assert (written, backlog, later) == (8, 0, 1)
+    assert batches == [["0", "1", "3", "4"], ["5", "6", "8", "9"], ["10"]]
+
+
+def test_retries_back_off_while_the_database_is_down():
+    async def run():
+        db = FakeDatabaseService()
+        db.down = True
+        writer = StoryHistoryWriter(db, batch_size=1, flush_interval=0.01, max_retry_delay=0.16)
+        writer.start()
+        for i in range(40):
+            writer.add(record(i))
+            await asyncio.sleep(0.01)
+        attempts = db.attempts
+        delay = writer.retry_delay
+        db.down = False
+        await asyncio.sleep(0.3)
+        # Recovered: back to flushing as soon as a batch is ready
+        writer.add(record(40))
+        await asyncio.sleep(0.05)
+        batches = list(db.batches)
+        await writer.stop()
+        return attempts, delay, batches
+
+    attempts, delay, batches = asyncio.run(run())
+    # 0.02 + 0.04 + 0.08 + 0.16 + ... seconds apart, rather than once per added record
+    assert attempts <= 8
+    assert delay == 0.16
+    assert [game for batch in batches for game in batch] == [str(i) for i in range(41)]
@@ -0,0 +1,85 @@
+"""Tests for callback URL checks and requeuing jobs whose worker died.
+
+Uses the in-memory job store. Run with ``python -m pytest test_jobs.py``.
+"""
+import asyncio
+import time
+
+import pytest
+
+from mlb_storyteller.jobs.manager import JobManager, check_callback_url
+from mlb_storyteller.jobs.store import InMemoryJobStore, Job
+
+
+async def echo(params):
+    return params
+
+
+def manager(store=None, running_timeout=60):
+    return JobManager(store or InMemoryJobStore(), handlers={"story": echo}, running_timeout=running_timeout)
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://10.1.2.3/hook",
+    "http://192.168.0.10/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+])
+def test_callbacks_to_internal_addresses_are_rejected(url):
+    with pytest.raises(ValueError):
+        asyncio.run(manager().submit("story", {}, callback_url=url))
+
+
+def test_callbacks_to_public_addresses_are_accepted():
+    asyncio.run(check_callback_url("https://93.184.216.34/hook"))
+
+
+def test_running_jobs_without_a_heartbeat_are_requeued():
+    async def run():
+        store = InMemoryJobStore()
+        # Left running by a worker process that was killed
+        job = Job("story", {"game_id": "1"})
+        job.status = Job.RUNNING
+        job.started_at = time.time() - 120
+        await store.save(job)
+
+        jobs = manager(store)
+        requeued = await jobs.requeue_stale()
+        again = await jobs.requeue_stale()
+        return requeued, again, await store.get(job.id), await store.dequeue("story", timeout=0.1), job.id
+
+    requeued, again, job, queued_id, job_id = asyncio.run(run())
+    assert (requeued, again) == (1, 0)
+    assert job.status == Job.QUEUED and job.started_at is None
+    assert queued_id == job_id
+
+
+def test_jobs_running_in_this_process_keep_their_heartbeat():
+    async def run():
+        store = InMemoryJobStore()
+        jobs = manager(store, running_timeout=60)
+        job = Job("story", {})
+        job.status = Job.RUNNING
+        job.started_at = time.time() - 120
+        await store.save(job)
+        jobs._running[job.id] = job
+        requeued = await jobs.requeue_stale()
+        return requeued, await store.stale_running(time.time() - 60), (await store.get(job.id)).status
+
+    assert asyncio.run(run()) == (0, [], Job.RUNNING)
+
+
+def test_finished_jobs_are_not_tracked_as_running():
+    async def run():
+        store = InMemoryJobStore()
+        jobs = manager(store, running_timeout=0)
+        job = await jobs.submit("story", {"game_id": "1"})
+        await jobs._run(await store.get(job.id))
+        return await store.stale_running(time.time()), (await store.get(job.id)).status
+
+    assert asyncio.run(run()) == ([], Job.SUCCEEDED)
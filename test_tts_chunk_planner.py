@@ -0,0 +1,136 @@
+"""Property tests for the TTS chunk planner.
+
+Texts are generated from a fixed seed (multi-byte characters, quotes,
+abbreviations, runaway words) so failures reproduce; run with
+``python -m pytest test_tts_chunk_planner.py``.
+"""
+import random
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from mlb_storyteller.services.tts_chunk_planner import plan_chunks, split_sentences
+
+WORDS = [
+    "the", "pitcher", "dealt", "from", "stretch", "runner", "broke", "for", "second", "Ohtani", "Acuña",
+    "Yoshinobu", "Rodríguez", "bases-loaded", "3-2", "count", "St.", "Louis", "J.D.", "Martinez", "vs.", "Cubs",
+    "R&B", "<ninth>", "‘clutch’", "外野手", "⚾", "🔥",
+]
+ENDINGS = [".", "!", "?", "...", "…", '."', '!"', "?”", ".)", "?!"]
+
+
+def make_text(rng: random.Random, sentences: int, runaway_words: bool = False) -> str:
+    parts = []
+    for _ in range(sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 40))]
+        if runaway_words and rng.random() < 0.05:
+            words.append("A" * rng.randint(100, 600))
+        words[0] = words[0].capitalize()
+        parts.append(" ".join(words) + rng.choice(ENDINGS))
+        parts.append(rng.choice([" ", "  ", "\n", "\n\n", " \t "]))
+    return "".join(parts)
+
+
+def make_case(seed: int, runaway_words: bool = False):
+    """A text and a byte budget, both drawn from the seed."""
+    rng = random.Random(seed)
+    return make_text(rng, rng.randint(1, 120), runaway_words), rng.choice([64, 100, 250, 1000, 5000])
+
+
+def squeeze(text: str) -> str:
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_plain_chunks_fit_and_preserve_text(seed):
+    text, max_bytes = make_case(seed)
+    chunks = plan_chunks(text, max_bytes)
+
+    assert chunks
+    assert all(0 < len(chunk.encode('utf-8')) <= max_bytes for chunk in chunks)
+    # Nothing added, dropped or reordered
+    assert " ".join(chunks) == " ".join(text.split())
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_chunks_are_whole_sentences_packed_greedily(seed):
+    text, max_bytes = make_case(seed)
+    sentences = split_sentences(text)
+    # Leave room for the longest sentence, so none has to be split
+    max_bytes = max(max_bytes, *(len(sentence.encode('utf-8')) for sentence in sentences))
+    chunks = plan_chunks(text, max_bytes)
+
+    # Every chunk is a run of whole sentences...
+    remaining = iter(sentences)
+    firsts = []
+    for chunk in chunks:
+        taken = [next(remaining)]
+        while len(" ".join(taken)) < len(chunk):
+            taken.append(next(remaining))
+        assert " ".join(taken) == chunk
+        firsts.append(taken[0])
+    # ...and the next chunk's first sentence would not have fit, so no two neighbours could share a request
+    for chunk, first in zip(chunks, firsts[1:]):
+        assert len(f"{chunk} {first}".encode('utf-8')) > max_bytes
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_runaway_words_are_split_without_losing_characters(seed):
+    text, max_bytes = make_case(seed, runaway_words=True)
+    chunks = plan_chunks(text, max_bytes)
+
+    assert all(len(chunk.encode('utf-8')) <= max_bytes for chunk in chunks)
+    assert squeeze("".join(chunks)) == squeeze(text)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_ssml_chunks_are_well_formed_and_fit(seed):
+    text, max_bytes = make_case(seed, runaway_words=True)
+    max_bytes += 200  # room for the markup
+    chunks = plan_chunks(text, max_bytes, ssml_break_ms=300)
+
+    spoken = []
+    for chunk in chunks:
+        assert len(chunk.encode('utf-8')) <= max_bytes
+        root = ElementTree.fromstring(chunk)
+        assert root.tag == "speak"
+        assert all(child.tag == "break" and child.get("time") == "300ms" for child in root)
+        spoken.append("".join(root.itertext()))
+    assert squeeze("".join(spoken)) == squeeze(text)
+
+
+def test_sentence_boundaries():
+    text = (
+        'What a game! Did you see that? "He is gone!" The crowd roared... '
+        'Then J.D. Martinez homered off the St. Louis closer. "Unbelievable," he said. '
+        '"Go!" yelled the coach.\nInning 9\nFinal score 5-4.'
+    )
+    assert split_sentences(text) == [
+        "What a game!",
+        "Did you see that?",
+        '"He is gone!"',
+        "The crowd roared...",
+        "Then J.D. Martinez homered off the St. Louis closer.",
+        '"Unbelievable," he said.',
+        '"Go!" yelled the coach.',
+        "Inning 9",
+        "Final score 5-4.",
+    ]
+
+
+def test_budget_is_measured_in_bytes_not_characters():
+    text = "Acuña lines one into the gap. " * 4  # 29 characters, 30 bytes per sentence
+    chunks = plan_chunks(text, max_bytes=60)
+
+    assert all(len(chunk.encode('utf-8')) <= 60 for chunk in chunks)
+    assert len(chunks) == 4
+
+
+def test_short_text_is_one_request_without_added_punctuation():
+    assert plan_chunks("  Strike three  called \n") == ["Strike three called"]
+    assert plan_chunks("") == []
+
+
+def test_budget_too_small_for_markup():
+    with pytest.raises(ValueError):
+        plan_chunks("Play ball.", max_bytes=20, ssml_break_ms=250)
@@ -0,0 +1,101 @@
+"""Tests for the TTS quota scheduler, using in-memory token buckets.
+
+Several TTSScheduler instances sharing one InMemoryTokenBuckets stand in
+for workers sharing the Redis buckets. Run with
+``python -m pytest test_tts_scheduler.py``.
+"""
+import asyncio
+import time
+
+import pytest
+
+from mlb_storyteller.services.tts_scheduler import InMemoryTokenBuckets, QuotaWaitExceeded, TTSScheduler, tts_priority
+
+
+def make_scheduler(buckets=None, **kwargs) -> TTSScheduler:
+    settings = dict(requests_per_second=0, characters_per_minute=0, burst_seconds=1, background_reserve=0.3, max_wait=10)
+    settings.update(kwargs)
+    return TTSScheduler(buckets or InMemoryTokenBuckets(), **settings)
+
+
+def test_workers_sharing_buckets_stay_within_the_request_budget():
+    async def run():
+        shared = InMemoryTokenBuckets()
+        workers = [make_scheduler(shared, requests_per_second=40, burst_seconds=0.25) for _ in range(4)]
+        start = time.monotonic()
+        await asyncio.gather(*(workers[i % 4].acquire(10) for i in range(50)))
+        return time.monotonic() - start
+
+    # 10 calls from the burst, then 40 more at 40 per second
+    assert 0.9 <= asyncio.run(run()) < 1.5
+
+
+def test_character_budget_paces_large_requests():
+    async def run():
+        scheduler = make_scheduler(characters_per_minute=600_000)  # 10,000 characters a second
+        start = time.monotonic()
+        for _ in range(4):
+            await scheduler.acquire(5000)
+        return time.monotonic() - start
+
+    # The first two fit the 10,000-character burst; the other two take half a second each
+    assert 0.9 <= asyncio.run(run()) < 1.4
+
+
+def test_background_calls_leave_the_reserve_for_interactive_ones():
+    async def run():
+        scheduler = make_scheduler(requests_per_second=1, burst_seconds=10, background_reserve=0.3, max_wait=0.1)
+        background = 0
+        with pytest.raises(QuotaWaitExceeded):
+            while True:
+                await scheduler.acquire(1, "background")
+                background += 1
+        interactive = 0
+        with pytest.raises(QuotaWaitExceeded):
+            while True:
+                await scheduler.acquire(1, "interactive")
+                interactive += 1
+        return background, interactive
+
+    assert asyncio.run(run()) == (7, 3)
+
+
+def test_interactive_calls_go_first_within_a_worker():
+    async def run():
+        scheduler = make_scheduler(requests_per_second=20, burst_seconds=0.05, background_reserve=0)
+        order = []
+
+        async def call(priority):
+            await scheduler.acquire(1, priority)
+            order.append(priority)
+
+        background = [asyncio.create_task(call("background")) for _ in range(5)]
+        await asyncio.sleep(0)
+        interactive = [asyncio.create_task(call("interactive")) for _ in range(5)]
+        await asyncio.gather(*background, *interactive)
+        return order
+
+    order = asyncio.run(run())
+    # After the one call the burst allows, every interactive call is served before the remaining background ones
+    assert order[1:6] == ["interactive"] * 5
+
+
+def test_priority_comes_from_the_context():
+    async def run():
+        scheduler = make_scheduler(requests_per_second=1, burst_seconds=2, background_reserve=0.5, max_wait=0)
+        tts_priority.set("background")
+        await scheduler.acquire(1)
+        # The last token is the interactive reserve
+        with pytest.raises(QuotaWaitExceeded):
+            await scheduler.acquire(1)
+        await scheduler.acquire(1, "interactive")
+
+    asyncio.run(run())
+
+
+def test_unlimited_when_no_budget_is_configured():
+    async def run():
+        scheduler = make_scheduler()
+        return await asyncio.gather(*(scheduler.acquire(5000) for _ in range(100)))
+
+    assert asyncio.run(run()) == [0.0] * 100